@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from core.models import JobResult, Segment
+from utils.subtitles import format_cue_times
+
+# Cues por trozo del stream: trozos grandes sin llegar a montar el fichero entero
+BATCH = 1000
+
+
+def _cue_times(segments: List[Segment], separator: str) -> List[str]:
+    starts = np.fromiter((segment.start for segment in segments), dtype=np.float64, count=len(segments))
+    ends = np.fromiter((segment.end for segment in segments), dtype=np.float64, count=len(segments))
+    return format_cue_times(starts, ends, separator)
+
+
+def iter_srt(result: JobResult) -> Iterator[str]:
+    segments = result.transcript.segments
+    for first in range(0, len(segments), BATCH):
+        batch = segments[first : first + BATCH]
+        cues = "\n".join(
+            f"{index}\n{times}\n{segment.speaker}: {segment.text}\n"
+            for index, (times, segment) in enumerate(zip(_cue_times(batch, ","), batch), start=first + 1)
+        )
+        # Los cues van separados por una línea en blanco, sin una al final
+        yield f"\n{cues}" if first else cues
+
+
+def iter_vtt(result: JobResult) -> Iterator[str]:
+    yield "WEBVTT\n"
+    segments = result.transcript.segments
+    for first in range(0, len(segments), BATCH):
+        batch = segments[first : first + BATCH]
+        yield "".join(
+            f"\n{times}\n{segment.speaker}: {segment.text}\n"
+            for times, segment in zip(_cue_times(batch, "."), batch)
+        )
+
+
+def iter_csv(result: JobResult) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["claim_id", "speaker", "start", "end", "text"])
+    claims = result.claims
+    for first in range(0, len(claims), BATCH):
+        writer.writerows(
+            [claim.id, claim.speaker, claim.start, claim.end, claim.text] for claim in claims[first : first + BATCH]
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_bytes(body: bytes, size: int = 1 << 16) -> Iterator[bytes]:
+    for offset in range(0, len(body), size):
+        yield body[offset : offset + size]
+
+
+class ExportFormat(NamedTuple):
+    filename: str
+    media_type: str
+    # None: se sirve el JSON ya serializado por la caché de resultados
+    render: Optional[Callable[[JobResult], Iterable[str]]]
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "json": ExportFormat("result.json", "application/json", None),
+    "srt": ExportFormat("transcript.srt", "application/x-subrip", iter_srt),
+    "vtt": ExportFormat("transcript.vtt", "text/vtt", iter_vtt),
+    "csv": ExportFormat("claims.csv", "text/csv", iter_csv),
+}
+
+
+def cached_export_path(export_dir: Path, filename: str, variant: str, tag: str) -> Path:
+    """Where the export of one result/edits version is kept: ``transcript-<variant>-<tag>.srt``.
+
+    ``variant`` tells apart exports of the same format that coexist, such as
+    the edited and the raw transcript; ``tag`` must not contain ``-``.
+    """
+    stem, _, suffix = filename.rpartition(".")
+    return export_dir / f"{stem}-{variant}-{tag}.{suffix}"
+
+
+def stream_to_cache(chunks: Iterable[bytes], path: Path) -> Iterator[bytes]:
+    """Yield ``chunks`` while writing them to ``path``.
+
+    The file only appears, atomically, once the whole export has been sent,
+    and replaces the cached exports of older versions of the same variant.
+    A download cut short leaves nothing behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    complete = False
+    try:
+        with tmp.open("wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+                yield chunk
+        os.replace(tmp, path)
+        complete = True
+    finally:
+        if not complete:
+            tmp.unlink(missing_ok=True)
+    # Solo versiones anteriores de la misma variante: "transcript-edited-*" no toca "transcript-raw-*"
+    prefix = path.name.rsplit("-", 1)[0]
+    for stale in path.parent.glob(f"{prefix}-*{path.suffix}"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
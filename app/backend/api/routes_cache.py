@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from pipeline.stage_cache import STAGE_CACHE
+
+router = APIRouter(prefix="/api/cache", tags=["cache"])
+
+
+@router.get("")
+async def list_cache() -> dict:
+    entries = STAGE_CACHE.entries()
+    return {
+        "entries": entries,
+        "total_bytes": sum(entry["size_bytes"] for entry in entries),
+        "max_bytes": STAGE_CACHE.max_bytes,
+    }
+
+
+@router.delete("")
+async def purge_cache(stage: Optional[str] = None) -> dict:
+    return {"removed": STAGE_CACHE.purge(stage=stage)}
+
+
+@router.delete("/{stage}/{key}")
+async def delete_cache_entry(stage: str, key: str) -> dict:
+    removed = STAGE_CACHE.purge(stage=stage, key=key)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    return {"removed": removed}
@@ -1,24 +1,30 @@
 from __future__ import annotations
 
-import csv
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
-from core.models import JobResult
+from api.exports import EXPORT_FORMATS, cached_export_path, iter_bytes, iter_csv, stream_to_cache
+from core.models import JobResult, Transcript
 from core.settings import SETTINGS
-from pipeline.job_manager import JOB_MANAGER
-from pipeline.steps.edits import apply_edits
-from utils.time import seconds_to_timestamp, seconds_to_vtt
+from pipeline.edit_log import EditLog
+from pipeline.job_manager import JOB_MANAGER, probe_duration
+from pipeline.partial import PartialTranscript, read_diarization
+from pipeline.result_cache import RESULT_CACHE, etag_for
+from pipeline.steps.claims import extract_claims
+from pipeline.steps.merge import merge_segments
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
 
 @router.post("")
 async def create_job(body: dict) -> dict:
+    # ffprobe fuera del event loop; la duración ordena la cola (shortest-job-first)
+    duration = await asyncio.to_thread(probe_duration, body["video_path"])
     try:
         job_id = JOB_MANAGER.submit(
             video_path=body["video_path"],
@@ -26,12 +32,24 @@ async def create_job(body: dict) -> dict:
             num_speakers=body.get("num_speakers"),
             pack_name=body.get("pack_name"),
             verify=bool(body.get("verify", False)),
+            priority=body.get("priority"),
+            duration=duration,
         )
         return {"job_id": job_id}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str) -> dict:
+    status = JOB_MANAGER.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if status in ("completed", "failed"):
+        raise HTTPException(status_code=409, detail=f"Job already {status}")
+    return {"status": status}
+
+
 @router.get("/{job_id}")
 async def get_job(job_id: str) -> dict:
     status = JOB_MANAGER.get_status(job_id)
@@ -41,91 +59,142 @@ async def get_job(job_id: str) -> dict:
         "status": status.status,
         "progress": status.progress,
         "current_step": status.current_step,
-        "logs": status.logs,
+        "logs": list(status.logs),
+    }
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """Server-Sent Events stream of the job's progress until it finishes."""
+    if not JOB_MANAGER.get_status(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    # EventSource reenvía el último id al reconectar: solo se mandan los eventos nuevos
+    last_event_id = request.headers.get("last-event-id", "0")
+    after = int(last_event_id) if last_event_id.isdigit() else 0
+
+    async def stream():
+        async for event in JOB_MANAGER.events(job_id, after=after, heartbeat=15.0):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}/partial")
+async def get_partial(job_id: str, after: int = 0) -> dict:
+    """Segments transcribed so far, from byte cursor ``after``, plus their claims."""
+    status = JOB_MANAGER.get_status(job_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job_dir = SETTINGS.data_dir / "jobs" / job_id
+    segments, cursor = PartialTranscript(job_dir / "partial.jsonl").read(after)
+    diarized = read_diarization(job_dir / "diarization.json")
+    if diarized is not None:
+        segments = merge_segments(diarized, segments)
+    segments.sort(key=lambda segment: segment.start)
+    claims = extract_claims(Transcript(segments=segments))
+    return {
+        "status": status.status,
+        "next": cursor,
+        "segments": [segment.model_dump() for segment in segments],
+        "claims": [claim.model_dump() for claim in claims],
     }
 
 
 @router.get("/{job_id}/result")
-async def get_result(job_id: str, apply_edits: bool = True) -> JSONResponse:
-    result = JOB_MANAGER.get_result(job_id)
-    if not result:
+async def get_result(job_id: str, request: Request, apply_edits: bool = True) -> Response:
+    status = JOB_MANAGER.get_status(job_id)
+    if not status or not status.result_path:
         raise HTTPException(status_code=404, detail="Result not found")
-    if apply_edits:
-        edits_path = SETTINGS.data_dir / "jobs" / job_id / "edits.json"
-        if edits_path.exists():
-            edits = json.loads(edits_path.read_text())
-            result = _apply_edits(result, edits)
-    return JSONResponse(result.model_dump())
+    edits = EditLog.for_job(job_id) if apply_edits else None
+    # La versión sale de dos stat: un 304 no lee ni parsea nada
+    version = RESULT_CACHE.version(status.result_path, edits)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    etag = etag_for(job_id, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    cached = await asyncio.to_thread(RESULT_CACHE.get, job_id, status.result_path, edits)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    return Response(cached.body, media_type="application/json", headers={**headers, "ETag": cached.etag})
 
 
 @router.patch("/{job_id}/edits")
 async def update_edits(job_id: str, body: dict) -> dict:
-    edits_path = SETTINGS.data_dir / "jobs" / job_id / "edits.json"
-    edits_path.parent.mkdir(parents=True, exist_ok=True)
-    edits_path.write_text(json.dumps(body.get("edits", []), indent=2))
-    return {"status": "saved"}
+    """Replace the whole edit log."""
+    count = EditLog.for_job(job_id).replace(_edit_list(body))
+    return {"status": "saved", "count": count}
+
+
+@router.post("/{job_id}/edits")
+async def append_edits(job_id: str, body: dict) -> dict:
+    """Append edits to the log; only they are applied on the next read of the result."""
+    count = EditLog.for_job(job_id).append(_edit_list(body))
+    return {"status": "saved", "count": count}
 
 
 @router.get("/{job_id}/export/{format}")
-async def export_result(job_id: str, format: str) -> FileResponse:
-    result = JOB_MANAGER.get_result(job_id)
-    if not result:
+async def export_result(job_id: str, format: str, request: Request, apply_edits: bool = True) -> Response:
+    """Stream an export; each result and edits version is rendered once and then served from disk."""
+    export = EXPORT_FORMATS.get(format)
+    if export is None:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    status = JOB_MANAGER.get_status(job_id)
+    if not status or not status.result_path:
+        raise HTTPException(status_code=404, detail="Result not found")
+    edits = EditLog.for_job(job_id) if apply_edits else None
+    version = RESULT_CACHE.version(status.result_path, edits)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    etag = etag_for(job_id, (format, *version))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{export.filename}"'
+    path = cached_export_path(
+        SETTINGS.data_dir / "jobs" / job_id / "exports",
+        export.filename,
+        "edited" if apply_edits else "raw",
+        etag.strip('"'),
+    )
+    if path.exists():
+        return FileResponse(path, media_type=export.media_type, headers=headers)
+
+    cached = await asyncio.to_thread(RESULT_CACHE.get, job_id, status.result_path, edits)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Result not found")
-    export_dir = SETTINGS.data_dir / "jobs" / job_id / "exports"
-    export_dir.mkdir(parents=True, exist_ok=True)
-    if format == "json":
-        path = export_dir / "result.json"
-        path.write_text(result.model_dump_json(indent=2))
-    elif format == "csv":
-        path = export_dir / "claims.csv"
-        _export_csv(path, result)
-    elif format == "srt":
-        path = export_dir / "transcript.srt"
-        _export_srt(path, result)
-    elif format == "vtt":
-        path = export_dir / "transcript.vtt"
-        _export_vtt(path, result)
+    if export.render is None:
+        chunks = iter_bytes(cached.body)
     else:
-        raise HTTPException(status_code=400, detail="Unsupported format")
-    return FileResponse(path)
+        chunks = (chunk.encode("utf-8") for chunk in export.render(cached.result))
+    return StreamingResponse(stream_to_cache(chunks, path), media_type=export.media_type, headers=headers)
 
 
 def _export_csv(path: Path, result: JobResult) -> None:
     with path.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(["claim_id", "speaker", "start", "end", "text"])
-        for claim in result.claims:
-            writer.writerow([claim.id, claim.speaker, claim.start, claim.end, claim.text])
-
-
-def _export_srt(path: Path, result: JobResult) -> None:
-    lines = []
-    for idx, segment in enumerate(result.transcript.segments, start=1):
-        lines.append(str(idx))
-        lines.append(
-            f"{seconds_to_timestamp(segment.start)} --> {seconds_to_timestamp(segment.end)}"
-        )
-        lines.append(f"{segment.speaker}: {segment.text}")
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+        handle.writelines(iter_csv(result))
 
 
-def _export_vtt(path: Path, result: JobResult) -> None:
-    lines = ["WEBVTT", ""]
-    for segment in result.transcript.segments:
-        lines.append(
-            f"{seconds_to_vtt(segment.start)} --> {seconds_to_vtt(segment.end)}"
-        )
-        lines.append(f"{segment.speaker}: {segment.text}")
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
-
-
-def _apply_edits(result: JobResult, edits: list[dict]) -> JobResult:
-    transcript = apply_edits(result.transcript, edits)
-    return JobResult(
-        metadata=result.metadata,
-        transcript=transcript,
-        claims=result.claims,
-        verifications=result.verifications,
-    )
+def _edit_list(body: dict) -> list[dict]:
+    edits = body.get("edits", [])
+    if not isinstance(edits, list) or not all(isinstance(edit, dict) for edit in edits):
+        raise HTTPException(status_code=400, detail="edits must be a list of objects")
+    return edits
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # If-None-Match usa comparación débil: W/"x" equivale a "x"
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
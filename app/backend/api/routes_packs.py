@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict
 from urllib.parse import urlparse
 
 import requests
@@ -12,13 +14,18 @@ from indexing.vectorstore import VectorStore
 
 router = APIRouter(prefix="/api/packs", tags=["packs"])
 
+# Un build por pack a la vez: comparten spool, manifest y ficheros temporales del índice
+_build_locks: Dict[str, asyncio.Lock] = {}
+
 
 @router.post("/index")
 async def index_pack(body: dict) -> dict:
     pack_name = body["pack_name"]
-    store = VectorStore.from_pack(pack_name)
-    store.build()
-    return {"status": "indexed", "pack": pack_name}
+    async with _build_locks.setdefault(pack_name, asyncio.Lock()):
+        store = VectorStore.from_pack(pack_name)
+        # Ingesta, embeddings y ensamblado del índice tardan minutos: fuera del event loop
+        stats = await asyncio.to_thread(store.build)
+    return {"status": "indexed", "pack": pack_name, "files": stats}
 
 
 @router.post("/snapshot")
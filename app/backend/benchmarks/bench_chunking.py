@@ -0,0 +1,66 @@
+"""Benchmark chunk_spans against the fixed-window chunk_text.
+
+Run from app/backend: ``python -m benchmarks.bench_chunking [megabytes]``
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+
+from indexing.chunking import chunk_spans, chunk_text
+
+WORDS = (
+    "el desempleo bajó un 3,5 % durante 2024 según el instituto nacional de estadística "
+    "mientras la inflación subió hasta 1.000 puntos básicos en algunas regiones del país"
+).split()
+
+
+def random_document(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + "."
+        if rng.random() < 0.1:
+            sentence += "\n\n"
+        parts.append(sentence)
+        total += len(sentence) + 1
+    return " ".join(parts)
+
+
+def cut_words(text: str, bounds) -> int:
+    """Number of chunk edges that fall inside a word."""
+    cuts = 0
+    for start, end in bounds:
+        if start > 0 and not text[start - 1].isspace() and not text[start].isspace():
+            cuts += 1
+        if end < len(text) and not text[end - 1].isspace() and not text[end].isspace():
+            cuts += 1
+    return cuts
+
+
+def main(megabytes: float = 4.0) -> None:
+    text = random_document(int(megabytes * 1024 * 1024), seed=1)
+
+    started = time.perf_counter()
+    windows = chunk_text(text)
+    window_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    spans = chunk_spans(text)
+    span_time = time.perf_counter() - started
+
+    # chunk_text no devuelve offsets: se reconstruyen con su paso fijo de 450
+    window_bounds = [(start, min(len(text), start + 500)) for start in range(0, len(text), 450)]
+    print(f"document: {len(text) / 1e6:.1f}M chars")
+    print(f"chunk_text:  {window_time:.3f}s  chunks={len(windows)}  words cut={cut_words(text, window_bounds)}")
+    print(
+        f"chunk_spans: {span_time:.3f}s  chunks={len(spans)}  "
+        f"words cut={cut_words(text, [(span.start, span.end) for span in spans])}"
+    )
+    print(f"throughput: {len(text) / span_time / 1e6:.1f}M chars/s vs {len(text) / window_time / 1e6:.1f}M chars/s")
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,125 @@
+"""Benchmark the columnar transcript against per-segment pydantic models.
+
+Times the non-ML part of a job (building the diarization and ASR outputs,
+the stage-cache round trip, merge, claim extraction and the final
+transcript) and the memory held by the ASR output.
+
+Run from app/backend: ``python -m benchmarks.bench_columnar [segments]``
+"""
+from __future__ import annotations
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, List, Tuple, TypeVar
+
+from core.columnar import SegmentRow, SegmentTable
+from core.models import Claim, Segment, Transcript
+from pipeline.steps.claims import CLAIM_PATTERN, extract_claims
+from pipeline.steps.merge import merge_segments, merge_tables
+
+WORDS = "el paro fue del doce por ciento según los datos que son de este año y no de otro".split()
+
+Row = Tuple[float, float, str, str]
+T = TypeVar("T")
+
+
+def timeline(count: int, speakers: int, seed: int) -> List[Row]:
+    """Back-to-back turns (``speakers`` > 1) or texted ASR segments (``speakers`` == 1)."""
+    rng = random.Random(seed)
+    rows: List[Row] = []
+    cursor = 0.0
+    for _ in range(count):
+        length = rng.uniform(0.5, 6.0)
+        speaker = f"SPEAKER_{rng.randrange(speakers):02}" if speakers > 1 else ""
+        text = " ".join(rng.choices(WORDS, k=rng.randint(4, 20))) if speakers == 1 else ""
+        rows.append((cursor, cursor + length, speaker, text))
+        cursor += length + rng.uniform(0.0, 0.5)
+    return rows
+
+
+def reference_claims(transcript: Transcript) -> List[Claim]:
+    """Original extractor: one validated Claim per matching segment."""
+    return [
+        Claim(
+            id=str(uuid.uuid4()),
+            speaker=segment.speaker,
+            start=segment.start,
+            end=segment.end,
+            text=segment.text,
+            type="statement",
+            confidence=0.55,
+        )
+        for segment in transcript.segments
+        if CLAIM_PATTERN.search(segment.text)
+    ]
+
+
+def pydantic_path(diarized_rows: List[Row], transcribed_rows: List[Row]) -> Tuple[Transcript, List[Claim]]:
+    diarized = [Segment(start=s, end=e, speaker=p, text=t) for s, e, p, t in diarized_rows]
+    transcribed = [Segment(start=s, end=e, speaker=p, text=t) for s, e, p, t in transcribed_rows]
+    cached = json.loads(json.dumps([segment.model_dump() for segment in transcribed]))
+    transcribed = [Segment.model_validate(item) for item in cached]
+    transcript = Transcript(segments=merge_segments(diarized, transcribed))
+    return transcript, reference_claims(transcript)
+
+
+def columnar_path(diarized_rows: List[Row], transcribed_rows: List[Row]) -> Tuple[Transcript, List[Claim]]:
+    diarized = SegmentTable.from_rows(diarized_rows)
+    transcribed = SegmentTable.from_rows(SegmentRow._make(row) for row in transcribed_rows)
+    transcribed = SegmentTable.from_records(json.loads(json.dumps(transcribed.to_records())))
+    merged = merge_tables(diarized, transcribed)
+    return merged.to_transcript(), extract_claims(merged)
+
+
+def timed(run: Callable[[], T]) -> Tuple[T, float]:
+    # Sin GC, como en bench_subtitles: sus pausas dependen del resto del proceso
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        value = run()
+        return value, time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def retained(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by ``build``'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del value
+    return size
+
+
+def main(segments: int = 100_000) -> None:
+    diarized_rows = timeline(segments // 3, speakers=4, seed=1)
+    transcribed_rows = timeline(segments, speakers=1, seed=2)
+
+    (expected, expected_claims), reference_time = timed(lambda: pydantic_path(diarized_rows, transcribed_rows))
+    (actual, actual_claims), columnar_time = timed(lambda: columnar_path(diarized_rows, transcribed_rows))
+
+    assert actual == expected, "transcript mismatch"
+    assert [claim.model_dump(exclude={"id"}) for claim in actual_claims] == [
+        claim.model_dump(exclude={"id"}) for claim in expected_claims
+    ], "claims mismatch"
+
+    models_size = retained(lambda: [Segment(start=s, end=e, speaker=p, text=t) for s, e, p, t in transcribed_rows])
+    table_size = retained(lambda: SegmentTable.from_rows(transcribed_rows))
+
+    print(f"segments={segments} claims={len(actual_claims)}")
+    print(f"pydantic: {reference_time:.3f}s  columnar: {columnar_time:.3f}s  speedup: {reference_time / columnar_time:.1f}x")
+    print(f"asr output: models {models_size / 2**20:.1f} MiB  table {table_size / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,93 @@
+"""Benchmark merge_segments against the original pairwise scan.
+
+Run from app/backend: ``python -m benchmarks.bench_merge [turns] [segments]``
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import List
+
+from core.models import Segment
+from pipeline.steps.merge import _overlap, merge_segments
+
+
+def reference_merge(diarized: List[Segment], transcribed: List[Segment]) -> List[Segment]:
+    """Original O(N·M) implementation, kept as the equivalence oracle."""
+    if not diarized:
+        return [
+            Segment(start=segment.start, end=segment.end, speaker="SPEAKER_00", text=segment.text)
+            for segment in transcribed
+        ]
+    merged: List[Segment] = []
+    for segment in transcribed:
+        best_speaker = diarized[0].speaker
+        best_overlap = 0.0
+        for diarized_segment in diarized:
+            overlap = _overlap(
+                segment.start, segment.end, diarized_segment.start, diarized_segment.end
+            )
+            if overlap > best_overlap:
+                best_overlap = overlap
+                best_speaker = diarized_segment.speaker
+        merged.append(
+            Segment(start=segment.start, end=segment.end, speaker=best_speaker, text=segment.text)
+        )
+    return merged
+
+
+def random_timeline(count: int, duration: float, speakers: int, seed: int) -> List[Segment]:
+    rng = random.Random(seed)
+    segments: List[Segment] = []
+    for _ in range(count):
+        start = round(rng.uniform(0.0, duration), 2)
+        length = round(rng.uniform(0.2, 15.0), 2)
+        segments.append(
+            Segment(start=start, end=start + length, speaker=f"SPEAKER_{rng.randrange(speakers):02}", text="")
+        )
+    return segments
+
+
+def nested_timeline(count: int, duration: float, seed: int) -> List[Segment]:
+    """Long turns nested around the middle: every span overlaps most of them, the sweep's worst case."""
+    rng = random.Random(seed)
+    middle = duration / 2
+    segments: List[Segment] = []
+    for index in range(count):
+        reach = rng.uniform(0.01, 1.0) * middle
+        segments.append(Segment(start=middle - reach, end=middle + reach, speaker=f"SPEAKER_{index % 4:02}", text=""))
+    return segments
+
+
+def main(turns: int = 4000, segments: int = 6000) -> None:
+    duration = 3 * 3600.0
+    diarized = random_timeline(turns, duration, speakers=4, seed=1)
+    transcribed = random_timeline(segments, duration, speakers=1, seed=2)
+
+    started = time.perf_counter()
+    expected = reference_merge(diarized, transcribed)
+    reference_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = merge_segments(diarized, transcribed)
+    sweep_time = time.perf_counter() - started
+
+    assert [s.speaker for s in actual] == [s.speaker for s in expected], "speaker mismatch"
+    print(f"turns={turns} segments={segments}")
+    print(f"pairwise: {reference_time:.3f}s  sweep: {sweep_time:.3f}s  speedup: {reference_time / sweep_time:.1f}x")
+
+    # Turnos largos anidados: el barrido recorrería casi todos por segmento, entra el índice
+    diarized = nested_timeline(turns, duration, seed=3)
+    started = time.perf_counter()
+    expected = reference_merge(diarized, transcribed)
+    reference_time = time.perf_counter() - started
+    started = time.perf_counter()
+    actual = merge_segments(diarized, transcribed)
+    indexed_time = time.perf_counter() - started
+    assert [s.speaker for s in actual] == [s.speaker for s in expected], "speaker mismatch on nested turns"
+    print(f"nested pairwise: {reference_time:.3f}s  indexed: {indexed_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,65 @@
+"""Benchmark PackIndex.search_many against one search call per query.
+
+The pack is stopword-heavy: every query pulls postings lists that cover
+most chunks, the case where batching has to pay off.
+
+Run from app/backend: ``python -m benchmarks.bench_search [chunks] [queries]``
+"""
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+from indexing.packfile import PackIndex, PackIndexWriter
+
+STOPWORDS = "de la que el en y a los se del las un por con no una su para es al".split()
+
+T = TypeVar("T")
+
+
+def best_of(runs: int, call: Callable[[], T]) -> Tuple[T, float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        value = call()
+        timings.append(time.perf_counter() - started)
+    return value, min(timings)
+
+
+def stopword_pack(path: Path, chunks: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(max(chunks, 1000))]
+    writer = PackIndexWriter(path)
+    for chunk in range(chunks):
+        vector = {term: rng.randint(1, 4) for term in rng.sample(STOPWORDS, 12)}
+        vector.update({term: rng.randint(1, 3) for term in rng.sample(vocabulary, 20)})
+        writer.add(f"pack-{chunk}", vector)
+    writer.close()
+    return vocabulary
+
+
+def main(chunks: int = 100_000, queries: int = 128) -> None:
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "pack_index.bin"
+        vocabulary = stopword_pack(path, chunks, seed=1)
+        index = PackIndex(path)
+        batch: List[Dict[str, int]] = [
+            {**{term: 1 for term in rng.sample(STOPWORDS, 4)}, **{term: 1 for term in rng.sample(vocabulary, 3)}}
+            for _ in range(queries)
+        ]
+        expected, loop_time = best_of(3, lambda: [index.search(query, 5) for query in batch])
+        actual, batch_time = best_of(3, lambda: index.search_many(batch, 5))
+        index.close()
+
+    assert actual == expected, "result mismatch"
+    print(f"chunks={chunks} queries={queries}")
+    print(f"per-query: {loop_time:.3f}s  search_many: {batch_time:.3f}s  speedup: {loop_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
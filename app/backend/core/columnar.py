@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.models import Segment, Transcript
+
+
+class SegmentRow(NamedTuple):
+    """One row of a :class:`SegmentTable`; reads like a :class:`Segment`."""
+
+    start: float
+    end: float
+    speaker: str
+    text: str
+
+
+class SegmentTable:
+    """Columnar transcript used inside the pipeline.
+
+    Times live in two float64 arrays, speakers as int32 codes into an
+    interned name table, and all texts in one string addressed by an
+    offsets array. A long recording is a handful of objects instead of one
+    pydantic model per segment. Steps work on the columns and convert to
+    :class:`Segment`/:class:`Transcript` only at the API boundary
+    (:meth:`to_segments`, :meth:`to_transcript`).
+
+    Tables are immutable: operations that change a column return a new
+    table that shares the other columns.
+
+    ASR output may carry word timestamps: ``words`` is then a table with one
+    row per word and ``word_offsets`` gives each segment's ``[first, last)``
+    word rows. Tables without words have both set to ``None``.
+    """
+
+    __slots__ = ("starts", "ends", "codes", "speakers", "_text", "_offsets", "words", "word_offsets")
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        codes: np.ndarray,
+        speakers: Sequence[str],
+        text: str,
+        offsets: np.ndarray,
+        words: Optional["SegmentTable"] = None,
+        word_offsets: Optional[np.ndarray] = None,
+    ) -> None:
+        self.starts = starts
+        self.ends = ends
+        self.codes = codes
+        self.speakers = list(speakers)
+        self._text = text
+        self._offsets = offsets
+        self.words = words
+        self.word_offsets = word_offsets
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[float, float, str, str]]) -> "SegmentTable":
+        starts: List[float] = []
+        ends: List[float] = []
+        codes: List[int] = []
+        texts: List[str] = []
+        interned: Dict[str, int] = {}
+        for start, end, speaker, text in rows:
+            starts.append(start)
+            ends.append(end)
+            code = interned.get(speaker)
+            if code is None:
+                code = interned[speaker] = len(interned)
+            codes.append(code)
+            texts.append(text)
+        return cls._build(starts, ends, np.asarray(codes, dtype=np.int32), list(interned), texts)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "SegmentTable":
+        """Build from :class:`Segment` objects or anything with the same attributes."""
+        return cls.from_rows((segment.start, segment.end, segment.speaker, segment.text) for segment in segments)
+
+    @classmethod
+    def from_records(cls, records: Union[dict, List[dict]]) -> "SegmentTable":
+        """Inverse of :meth:`to_records`; also accepts a list of segment dicts."""
+        if isinstance(records, list):
+            return cls.from_rows((item["start"], item["end"], item["speaker"], item["text"]) for item in records)
+        table = cls._build(
+            records["start"],
+            records["end"],
+            np.asarray(records["speaker"], dtype=np.int32),
+            records["speakers"],
+            records["text"],
+        )
+        if "words" in records:
+            table = table.with_words(cls.from_records(records["words"]), records["word_counts"])
+        return table
+
+    @classmethod
+    def concat(cls, tables: Sequence["SegmentTable"]) -> "SegmentTable":
+        speakers: Dict[str, int] = {}
+        codes = []
+        for table in tables:
+            # Cada tabla tiene su propia tabla de hablantes: se recodifican sobre la común
+            mapping = np.asarray([speakers.setdefault(name, len(speakers)) for name in table.speakers], dtype=np.int32)
+            codes.append(mapping[table.codes] if len(table) else table.codes)
+        starts = np.concatenate([table.starts for table in tables]) if tables else np.zeros(0)
+        ends = np.concatenate([table.ends for table in tables]) if tables else np.zeros(0)
+        texts = [text for table in tables for text in table.texts()]
+        merged = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int32)
+        table = cls._build(starts, ends, merged.astype(np.int32), list(speakers), texts)
+        if any(part.words is not None for part in tables):
+            # Los trozos sin palabras aportan segmentos con cero palabras
+            words = cls.concat([part.words for part in tables if part.words is not None])
+            counts = np.concatenate([part.word_counts() for part in tables])
+            table = table.with_words(words, counts)
+        return table
+
+    @classmethod
+    def _build(
+        cls, starts: Sequence[float], ends: Sequence[float], codes: np.ndarray, speakers: List[str], texts: List[str]
+    ) -> "SegmentTable":
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        if texts:
+            np.cumsum([len(text) for text in texts], out=offsets[1:])
+        return cls(
+            np.asarray(starts, dtype=np.float64),
+            np.asarray(ends, dtype=np.float64),
+            codes,
+            speakers,
+            "".join(texts),
+            offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> SegmentRow:
+        if index < 0:
+            index += len(self)
+        return SegmentRow(
+            float(self.starts[index]),
+            float(self.ends[index]),
+            self.speakers[self.codes[index]],
+            self.text(index),
+        )
+
+    def __iter__(self) -> Iterator[SegmentRow]:
+        return map(SegmentRow._make, self.columns())
+
+    def text(self, index: int) -> str:
+        return self._text[self._offsets[index] : self._offsets[index + 1]]
+
+    def texts(self) -> List[str]:
+        bounds = self._offsets.tolist()
+        text = self._text
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def speaker_names(self) -> List[str]:
+        speakers = self.speakers
+        return [speakers[code] for code in self.codes.tolist()]
+
+    def speaker_count(self) -> int:
+        return len(np.unique(self.codes))
+
+    def with_speakers(self, codes: np.ndarray, speakers: Sequence[str]) -> "SegmentTable":
+        """Same segments and texts, different speaker column."""
+        return SegmentTable(
+            self.starts,
+            self.ends,
+            codes.astype(np.int32),
+            speakers,
+            self._text,
+            self._offsets,
+            self.words,
+            self.word_offsets,
+        )
+
+    def with_words(self, words: "SegmentTable", counts: Sequence[int]) -> "SegmentTable":
+        """Same segments with ``counts[i]`` consecutive rows of ``words`` attached to segment ``i``."""
+        word_offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.asarray(counts, dtype=np.int64), out=word_offsets[1:])
+        if word_offsets[-1] != len(words):
+            raise ValueError(f"{word_offsets[-1]} word counts for {len(words)} words")
+        return SegmentTable(
+            self.starts, self.ends, self.codes, self.speakers, self._text, self._offsets, words, word_offsets
+        )
+
+    def word_counts(self) -> np.ndarray:
+        if self.word_offsets is None:
+            return np.zeros(len(self), dtype=np.int64)
+        return np.diff(self.word_offsets)
+
+    def to_records(self) -> dict:
+        """JSON-ready columns, for checkpoints and the stage cache."""
+        records = {
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "speakers": self.speakers,
+            "speaker": self.codes.tolist(),
+            "text": self.texts(),
+        }
+        if self.words is not None:
+            records["words"] = self.words.to_records()
+            records["word_counts"] = self.word_counts().tolist()
+        return records
+
+    def columns(self) -> Iterator[Tuple[float, float, str, str]]:
+        """Plain ``(start, end, speaker, text)`` tuples, cheaper than :meth:`__iter__`."""
+        return zip(self.starts.tolist(), self.ends.tolist(), self.speaker_names(), self.texts())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [
+            {"start": start, "end": end, "speaker": speaker, "text": text}
+            for start, end, speaker, text in self.columns()
+        ]
+
+    def to_segments(self) -> List[Segment]:
+        return self.to_transcript().segments
+
+    def to_transcript(self) -> Transcript:
+        # Una sola validación en pydantic-core para toda la lista: más barata que un modelo por fila
+        return Transcript.model_validate({"segments": self.to_dicts()})
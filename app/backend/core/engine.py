@@ -1,17 +1,162 @@
 from __future__ import annotations
 
+import json
+import os
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, List, Optional, Tuple
 
-from core.models import Claim, JobMetadata, JobResult, Transcript
+import numpy as np
+
+from core.columnar import SegmentRow, SegmentTable
+from core.models import Claim, JobMetadata, JobResult
 from core.settings import SETTINGS
 from indexing.vectorstore import VectorStore
+from pipeline.model_registry import MODEL_REGISTRY, ModelKey
+from pipeline.partial import PartialTranscript
+from pipeline.progress import ProgressTracker
+from pipeline.resources import RESOURCE_POOLS
+from pipeline.stage_cache import STAGE_CACHE
 from pipeline.steps.claims import extract_claims
-from pipeline.steps.diarize import diarize_audio
-from pipeline.steps.extract_audio import extract_audio
-from pipeline.steps.merge import merge_segments
-from pipeline.steps.transcribe import transcribe_audio
+from pipeline.steps.diarize import diarization_model_key, diarize_audio
+from pipeline.steps.extract_audio import (
+    SAMPLE_RATE,
+    decode_audio,
+    load_samples,
+    samples_duration,
+    save_samples,
+)
+from pipeline.steps.merge import merge_tables
+from pipeline.steps.transcribe import asr_model_key, transcribe_audio
+from pipeline.steps.vad import PLAN_VERSION
 from pipeline.steps.verify import verify_claims
+from utils.hash import file_hash
+
+
+def preload_models() -> List[ModelKey]:
+    keys = [key for key in (asr_model_key(), diarization_model_key()) if key is not None]
+    return MODEL_REGISTRY.preload(keys)
+
+
+def save_result(result: JobResult, path: Path) -> None:
+    """Write ``result.json`` atomically: readers never see a half-written result."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(result.model_dump_json(indent=2))
+    os.replace(tmp, path)
+
+
+def _extract_stage(video_path: Path, samples_path: Path, input_hash: Optional[str]) -> np.ndarray:
+    """Decode the job's audio once; diarization and ASR share the returned buffer."""
+    limit = SETTINGS.audio_memory_max_bytes
+    key = None
+    if input_hash:
+        key = STAGE_CACHE.key("extract", input_hash, sample_rate=SAMPLE_RATE, channels=1, format="f32le")
+    if key and STAGE_CACHE.get_file("extract", key, samples_path.name, samples_path):
+        return load_samples(samples_path, max_memory_bytes=limit)
+    with RESOURCE_POOLS.stage("extract"):
+        samples = decode_audio(video_path, samples_path, limit)
+    if key:
+        if not isinstance(samples, np.memmap):
+            save_samples(samples, samples_path)
+        STAGE_CACHE.put_file("extract", key, samples_path, input_hash=input_hash)
+    return samples
+
+
+def _diarize_stage(
+    samples: np.ndarray,
+    num_speakers: Optional[int],
+    input_hash: Optional[str],
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> SegmentTable:
+    model_key = diarization_model_key()
+    params = {
+        "num_speakers": num_speakers,
+        "model": model_key.name if model_key else None,
+    }
+
+    def compute() -> SegmentTable:
+        with RESOURCE_POOLS.stage("diarize"):
+            return diarize_audio(samples, num_speakers, on_progress=on_progress)
+
+    return _cached_segments("diarize", input_hash, params, compute)
+
+
+def _transcribe_stage(
+    samples: np.ndarray,
+    language: str,
+    input_hash: Optional[str],
+    checkpoint_dir: Path,
+    on_progress: Optional[Callable[[float], None]] = None,
+    on_segment: Optional[Callable[[SegmentRow], None]] = None,
+) -> SegmentTable:
+    model_key = asr_model_key()
+    params = {
+        "language": language,
+        "backend": model_key.backend if model_key else None,
+        "model": model_key.name if model_key else None,
+        "chunk_seconds": SETTINGS.asr_chunk_seconds,
+        "vad": SETTINGS.use_vad,
+        "plan": PLAN_VERSION,
+        "words": SETTINGS.asr_word_timestamps,
+    }
+
+    def compute() -> SegmentTable:
+        with RESOURCE_POOLS.stage("asr"):
+            return transcribe_audio(
+                samples,
+                language=language,
+                checkpoint_dir=checkpoint_dir,
+                on_progress=on_progress,
+                on_segment=on_segment,
+            )
+
+    return _cached_segments("asr", input_hash, params, compute)
+
+
+def _cached_segments(
+    stage: str,
+    input_hash: Optional[str],
+    params: dict,
+    compute: Callable[[], SegmentTable],
+) -> SegmentTable:
+    if not input_hash:
+        return compute()
+    key = STAGE_CACHE.key(stage, input_hash, **params)
+    cached = STAGE_CACHE.get_json(stage, key)
+    if cached is not None:
+        # Las entradas anteriores a las tablas guardan una lista de segmentos
+        return SegmentTable.from_records(cached)
+    segments = compute()
+    STAGE_CACHE.put_json(
+        stage,
+        key,
+        segments.to_records(),
+        input_hash=input_hash,
+        params=params,
+    )
+    return segments
+
+
+def _run_concurrently(*calls: Callable[[], Any], cancel: Optional[Callable[[], None]] = None) -> Tuple[Any, ...]:
+    """Run independent stages in threads and return their results in order.
+
+    On the first failure, stages that have not started yet are cancelled and
+    ``cancel`` asks the running ones to stop; the failure is re-raised once
+    they have all returned, so no stage outlives the job or keeps its pool slot.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="stage")
+    futures: List[Future] = [executor.submit(call) for call in calls]
+    try:
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                if cancel is not None:
+                    cancel()
+                raise future.exception()  # type: ignore[misc]
+        return tuple(future.result() for future in futures)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def run_pipeline(
@@ -21,22 +166,64 @@ def run_pipeline(
     num_speakers: Optional[int],
     pack_name: Optional[str],
     verify: bool,
+    progress: Optional[ProgressTracker] = None,
 ) -> JobResult:
+    progress = progress or ProgressTracker()
     data_dir = SETTINGS.data_dir / "jobs" / job_id
     data_dir.mkdir(parents=True, exist_ok=True)
-    audio_path = data_dir / "audio.wav"
+    samples_path = data_dir / "audio.f32"
+
+    input_hash = file_hash(Path(video_path)) if SETTINGS.stage_cache_enabled else None
+
+    progress.update("extract", 0.0, "Extracting audio")
+    samples = _extract_stage(Path(video_path), samples_path, input_hash)
+    duration = samples_duration(samples)
+    progress.update("extract", 1.0, f"Decoded {duration:.0f}s of audio", duration=duration)
+    partial = PartialTranscript(data_dir / "partial.jsonl")
+
+    def diarize() -> SegmentTable:
+        progress.update("diarize", 0.0, "Diarizing speakers")
+        segments = _diarize_stage(samples, num_speakers, input_hash, progress.reporter("diarize"))
+        # Con la diarización en disco los resultados parciales ya pueden llevar hablante
+        (data_dir / "diarization.json").write_text(json.dumps(segments.to_records()))
+        progress.update("diarize", 1.0, f"Found {segments.speaker_count()} speakers")
+        return segments
+
+    def transcribe() -> SegmentTable:
+        progress.update("asr", 0.0, "Transcribing")
+        partial.reset()
+        segments = _transcribe_stage(
+            samples, language, input_hash, data_dir / "asr", progress.reporter("asr"), partial.append
+        )
+        if not partial.count:
+            # Acierto de caché: el transcript parcial se completa de golpe
+            for row in segments:
+                partial.append(row)
+        progress.update("asr", 1.0, f"Transcribed {len(segments)} segments", segments=len(segments))
+        return segments
 
-    extract_audio(Path(video_path), audio_path)
-    diarized = diarize_audio(audio_path, num_speakers)
-    transcribed = transcribe_audio(audio_path, language=language)
-    merged = merge_segments(diarized, transcribed)
-    transcript = Transcript(segments=merged)
-    claims: List[Claim] = extract_claims(transcript)
+    # Diarización y ASR solo leen las muestras: se ejecutan en paralelo sobre el mismo buffer
+    diarized, transcribed = _run_concurrently(diarize, transcribe, cancel=progress.abort)
+    merged = merge_tables(diarized, transcribed)
+    progress.update("merge", 1.0)
+    claims: List[Claim] = extract_claims(merged)
+    progress.update("claims", 1.0, f"Extracted {len(claims)} claims", claims=len(claims))
 
     verifications = []
     if verify and pack_name:
+        progress.update("verify", 0.0, f"Verifying {len(claims)} claims against {pack_name}")
         store = VectorStore.from_pack(pack_name)
         verifications = verify_claims(claims, store)
+        supported = sum(1 for verification in verifications if verification.status == "supported")
+        progress.update(
+            "verify",
+            1.0,
+            f"{supported}/{len(verifications)} claims with citations",
+            supported=supported,
+            insufficient=len(verifications) - supported,
+        )
+    else:
+        progress.update("verify", 1.0)
 
     metadata = JobMetadata(
         job_id=job_id,
@@ -48,7 +235,8 @@ def run_pipeline(
     )
     return JobResult(
         metadata=metadata,
-        transcript=transcript,
+        # Frontera con la API: solo aquí el transcript pasa a modelos pydantic
+        transcript=merged.to_transcript(),
         claims=claims,
         verifications=verifications,
     )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
@@ -14,7 +15,42 @@ class Settings:
     default_num_speakers: Optional[int] = None
     asr_model: str = "small"
     use_vad: bool = True
+    # Tiempos por palabra en ASR: el hablante se asigna por palabra y los segmentos se parten donde cambia
+    asr_word_timestamps: bool = False
     licensing_enabled: bool = False
+    model_cache_max_bytes: int = 4 * 1024**3
+    model_idle_timeout: float = 1800.0
+    preload_models: bool = False
+    job_workers: int = 2
+    job_log_limit: int = 200
+    job_event_history: int = 500
+    job_status_cache: int = 1000
+    result_cache_entries: int = 32
+    interactive_max_duration: float = 900.0
+    # "thread": pipelines en hilos del proceso de la API; "process": pool de workers
+    pipeline_executor: str = "thread"
+    pipeline_worker_max_jobs: int = 50
+    pipeline_worker_max_rss_bytes: int = 8 * 1024**3
+    pipeline_health_interval: float = 30.0
+    pipeline_health_timeout: float = 10.0
+    pipeline_cancel_grace: float = 30.0
+    extract_concurrency: int = 4
+    asr_concurrency: int = 1
+    asr_chunk_seconds: float = 300.0
+    asr_chunk_workers: int = max(1, min(4, (os.cpu_count() or 2) // 2))
+    diarize_concurrency: int = 1
+    stage_cache_enabled: bool = True
+    stage_cache_max_bytes: int = 10 * 1024**3
+    retrieval_backend: str = "sparse"
+    embedding_backend: str = "auto"
+    embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    embedding_dim: int = 1024
+    embedding_batch_size: int = 64
+    ann_nprobe: int = 8
+    ingest_workers: int = max(1, (os.cpu_count() or 2) - 1)
+    ingest_timeout: float = 300.0
+    index_batch_chunks: int = 512
+    audio_memory_max_bytes: int = 256 * 1024**2
 
 
 SETTINGS = Settings()
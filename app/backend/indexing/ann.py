@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from indexing.packfile import top_k
+
+
+class DenseIndex:
+    """Inverted-file (IVF) approximate nearest-neighbour index over embeddings.
+
+    Vectors are clustered with spherical k-means; a query only scores the
+    members of its ``nprobe`` closest clusters. Raising ``nprobe`` trades
+    latency for recall, and ``nprobe >= nlist`` is an exact search.
+    Embeddings live in a ``.npy`` file loaded with ``mmap_mode="r"``.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        list_ptr: np.ndarray,
+        list_ids: np.ndarray,
+        embedder_name: str,
+    ) -> None:
+        self.keys = keys
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_ptr = list_ptr
+        self.list_ids = list_ids
+        self.embedder_name = embedder_name
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(
+        cls,
+        keys: List[str],
+        vectors: np.ndarray,
+        embedder_name: str,
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "DenseIndex":
+        count = len(vectors)
+        if nlist is None:
+            nlist = max(1, min(4096, int(math.sqrt(count))))
+        nlist = max(1, min(nlist, count)) if count else 1
+        rng = np.random.default_rng(seed)
+        if count == 0:
+            centroids = np.zeros((1, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32)
+            return cls(keys, vectors, centroids, np.zeros(2, dtype=np.int64), np.zeros(0, dtype=np.int64), embedder_name)
+
+        sample = vectors[rng.choice(count, size=min(count, 50_000), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].astype(np.float32)
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[cluster] = centroid / norm if norm else centroid
+
+        assignment = np.concatenate(
+            [np.argmax(vectors[start : start + 8192] @ centroids.T, axis=1) for start in range(0, count, 8192)]
+        )
+        list_ids = np.argsort(assignment, kind="stable").astype(np.int64)
+        list_ptr = np.zeros(nlist + 1, dtype=np.int64)
+        list_ptr[1:] = np.cumsum(np.bincount(assignment, minlength=nlist))
+        return cls(keys, vectors, centroids, list_ptr, list_ids, embedder_name)
+
+    def search_many(self, queries: np.ndarray, k: int, nprobe: int) -> List[List[Tuple[str, float]]]:
+        results: List[List[Tuple[str, float]]] = []
+        if len(self) == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        nprobe = max(1, min(nprobe, self.nlist))
+        closest = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        for query, clusters in zip(queries, closest):
+            candidates = np.concatenate(
+                [self.list_ids[self.list_ptr[c] : self.list_ptr[c + 1]] for c in clusters]
+            )
+            if not len(candidates):
+                results.append([])
+                continue
+            scores = np.asarray(self.vectors[candidates] @ query, dtype=np.float64)
+            results.append(
+                [
+                    (self.keys[int(candidates[i])], float(scores[i]))
+                    for i in top_k(scores, candidates, k)
+                    if scores[i] > 0
+                ]
+            )
+        return results
+
+    def save_ivf(self, ivf_path: Path) -> Path:
+        """Write the cluster lists next to ``ivf_path``; returns the temp file to rename."""
+        tmp_ivf = ivf_path.with_name(ivf_path.name + ".tmp")
+        with tmp_ivf.open("wb") as handle:
+            np.savez(
+                handle,
+                keys=np.asarray(self.keys, dtype=str),
+                centroids=self.centroids,
+                list_ptr=self.list_ptr,
+                list_ids=self.list_ids,
+                embedder=np.asarray(self.embedder_name),
+            )
+        return tmp_ivf
+
+    @classmethod
+    def load(cls, vectors_path: Path, ivf_path: Path) -> "DenseIndex":
+        vectors = np.load(vectors_path, mmap_mode="r")
+        with np.load(ivf_path) as data:
+            return cls(
+                keys=[str(key) for key in data["keys"]],
+                vectors=vectors,
+                centroids=data["centroids"],
+                list_ptr=data["list_ptr"],
+                list_ids=data["list_ids"],
+                embedder_name=str(data["embedder"]),
+            )
+
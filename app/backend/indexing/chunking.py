@@ -1,19 +1,137 @@
 from __future__ import annotations
 
-from typing import List
+import bisect
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
 
+# Fin de frase: puntuación (y cierres opcionales) seguida de espacio, o un
+# salto de párrafo. "3,5", "1.000" o "p.ej" no cortan porque no hay espacio.
+SENTENCE_MARKS = ".!?;…"
+CLOSERS = "\"'”’)]"
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+
+def chunk_windows(text: str, chunk_size: int = 500, overlap: int = 50) -> List[Tuple[int, str]]:
+    """Like :func:`chunk_text` but also returns the offset where each window starts."""
     if chunk_size <= 0:
         raise ValueError("chunk_size must be positive")
     if overlap >= chunk_size:
         raise ValueError("overlap must be smaller than chunk_size")
-    chunks: List[str] = []
+    chunks: List[Tuple[int, str]] = []
     start = 0
     while start < len(text):
         end = min(len(text), start + chunk_size)
-        chunks.append(text[start:end].strip())
+        chunks.append((start, text[start:end].strip()))
+        if end == len(text):
+            break
         start = end - overlap
         if start < 0:
             start = 0
-    return [chunk for chunk in chunks if chunk]
+    return [(offset, chunk) for offset, chunk in chunks if chunk]
+
+
+def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    return [chunk for _, chunk in chunk_windows(text, chunk_size, overlap)]
+
+
+@dataclass(frozen=True)
+class ChunkSpan:
+    """A chunk as ``[start, end)`` offsets into the source text plus its page."""
+
+    start: int
+    end: int
+    page: Optional[int] = None
+
+    def text(self, source: str) -> str:
+        return source[self.start : self.end]
+
+
+def page_at(pages: Optional[Sequence[int]], offset: int) -> Optional[int]:
+    """1-based page number containing ``offset``."""
+    if not pages:
+        return None
+    return max(1, bisect.bisect_right(pages, offset))
+
+
+def chunk_spans(
+    text: str,
+    chunk_size: int = 500,
+    overlap: int = 50,
+    pages: Optional[Sequence[int]] = None,
+) -> List[ChunkSpan]:
+    """Split ``text`` into windows of at most ``chunk_size`` characters.
+
+    Windows end at the last sentence boundary in their second half, else at
+    the last whitespace, and only cut inside a token when a single token is
+    longer than ``chunk_size``. Consecutive windows share up to ``overlap``
+    characters, starting on a token boundary. Leading and trailing
+    whitespace is excluded from the span; no substrings are copied.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    length = len(text)
+    spans: List[ChunkSpan] = []
+    start = _skip_space(text, 0, length)
+    while start < length:
+        limit = start + chunk_size
+        if limit >= length:
+            end = length
+        else:
+            end = _break_before(text, start, limit)
+        trimmed = end
+        while trimmed > start and text[trimmed - 1].isspace():
+            trimmed -= 1
+        if trimmed > start:
+            spans.append(ChunkSpan(start, trimmed, page_at(pages, start)))
+        if end >= length:
+            break
+        start = _skip_space(text, _overlap_start(text, start, end, overlap), length)
+    return spans
+
+
+def _break_before(text: str, start: int, limit: int) -> int:
+    # Se busca hacia atrás con str.rfind, sin recorrer el documento entero
+    sentence = _last_sentence_end(text, start + (limit - start) // 2, limit)
+    if sentence != -1:
+        return sentence
+    space = max(text.rfind(" ", start + 1, limit + 1), text.rfind("\n", start + 1, limit + 1))
+    if space > start:
+        return space
+    return limit
+
+
+def _last_sentence_end(text: str, low: int, limit: int) -> int:
+    best = text.rfind("\n\n", low, limit)
+    if best != -1:
+        best += 1
+    for mark in SENTENCE_MARKS:
+        position = text.rfind(mark, low, limit)
+        while position >= best and position != -1:
+            end = position + 1
+            while end < limit and text[end] in CLOSERS:
+                end += 1
+            if text[end].isspace():
+                best = end
+                break
+            position = text.rfind(mark, low, position)
+    return best
+
+
+def _overlap_start(text: str, start: int, end: int, overlap: int) -> int:
+    if overlap <= 0:
+        return end
+    candidate = max(start + 1, end - overlap)
+    hard_cut = not text[end - 1].isspace() and not text[end].isspace()
+    if hard_cut or text[candidate - 1].isspace():
+        # Un corte duro dentro de un token largo solapa por caracteres
+        return candidate
+    # No empezar a mitad de palabra: se salta hasta el siguiente espacio
+    spaces = [index for index in (text.find(" ", candidate, end), text.find("\n", candidate, end)) if index != -1]
+    return min(spaces) if spaces else end
+
+
+def _skip_space(text: str, position: int, length: int) -> int:
+    while position < length and text[position].isspace():
+        position += 1
+    return position
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import importlib.util
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+
+import numpy as np
+
+from core.settings import SETTINGS
+from pipeline.model_registry import MODEL_REGISTRY, ModelKey
+
+# Palabras y números completos: "3,5", "1.000" o "2024" son tokens, no se descartan
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:[.,][0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+class Embedder(ABC):
+    name: str
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Return an L2-normalised float32 matrix with one row per text."""
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature-hashing vectorizer; needs no model download."""
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                digest = zlib.crc32(token.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                matrix[row, digest % self.dim] += sign
+        return _normalize(matrix)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    def __init__(self, model_name: str) -> None:
+        self.model_name = model_name
+        self.name = f"st:{model_name}"
+        self._key = ModelKey("sentence-transformers", model_name, device="cpu")
+        with MODEL_REGISTRY.acquire(self._key) as model:
+            self.dim = int(model.get_sentence_embedding_dimension())
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        with MODEL_REGISTRY.acquire(self._key) as model:
+            matrix = model.encode(
+                list(texts),
+                batch_size=SETTINGS.embedding_batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+        return np.asarray(matrix, dtype=np.float32)
+
+
+def _load_sentence_transformer(key: ModelKey):
+    from sentence_transformers import SentenceTransformer  # type: ignore
+
+    return SentenceTransformer(key.name, device=key.device)
+
+
+MODEL_REGISTRY.register_loader("sentence-transformers", _load_sentence_transformer)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def get_embedder(backend: str = "") -> Embedder:
+    backend = backend or SETTINGS.embedding_backend
+    if backend == "auto":
+        has_model = importlib.util.find_spec("sentence_transformers") is not None
+        backend = "sentence-transformers" if has_model else "hashing"
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(SETTINGS.embedding_model)
+    if backend == "hashing":
+        return HashingEmbedder(SETTINGS.embedding_dim)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def embedder_from_name(name: str) -> Embedder:
+    """Rebuild the embedder an index was built with, so queries match it."""
+    if name.startswith("st:"):
+        return SentenceTransformerEmbedder(name[3:])
+    if name.startswith("hashing-"):
+        return HashingEmbedder(int(name.split("-", 1)[1]))
+    raise ValueError(f"Unknown embedder: {name}")
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
 from pathlib import Path
-from typing import List
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 import pdfplumber
 
+from core.settings import SETTINGS
 
-def _read_pdf(path: Path) -> str:
-    text = []
+SUPPORTED_EXTENSIONS = {".pdf", ".html", ".htm", ".txt", ".md"}
+
+
+def _read_pdf(path: Path) -> Tuple[str, List[int]]:
+    # Página a página: se guarda el offset donde empieza cada una
+    text: List[str] = []
+    page_starts: List[int] = []
+    offset = 0
     with pdfplumber.open(path) as pdf:
         for page in pdf.pages:
             page_text = page.extract_text() or ""
+            page.flush_cache()
+            page_starts.append(offset)
             text.append(page_text)
-    return "\n".join(text)
+            offset += len(page_text) + 1
+    return "\n".join(text), page_starts
 
 
 def _read_html(path: Path) -> str:
@@ -26,19 +40,139 @@ def _read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8", errors="ignore")
 
 
-def ingest_pack(pack_dir: Path) -> List[dict]:
-    docs: List[dict] = []
+def iter_pack_files(pack_dir: Path) -> Iterator[Path]:
     for path in pack_dir.rglob("*"):
         if path.is_dir():
             continue
-        ext = path.suffix.lower()
-        if ext in {".pdf"}:
-            content = _read_pdf(path)
-        elif ext in {".html", ".htm"}:
-            content = _read_html(path)
-        elif ext in {".txt", ".md"}:
-            content = _read_text(path)
-        else:
-            continue
-        docs.append({"path": path, "content": content})
-    return docs
+        if path.suffix.lower() in SUPPORTED_EXTENSIONS:
+            yield path
+
+
+def read_document(path: Path) -> dict:
+    """Parse one file into ``{"path", "content", "pages"}``.
+
+    ``pages`` holds the character offset where each PDF page starts and is
+    ``None`` for formats without pages.
+    """
+    ext = path.suffix.lower()
+    if ext in {".pdf"}:
+        content, pages = _read_pdf(path)
+        return {"path": path, "content": content, "pages": pages}
+    if ext in {".html", ".htm"}:
+        return {"path": path, "content": _read_html(path), "pages": None}
+    if ext in {".txt", ".md"}:
+        return {"path": path, "content": _read_text(path), "pages": None}
+    raise ValueError(f"Unsupported document type: {path}")
+
+
+def _parse_worker(connection: Connection) -> None:
+    """Entry point of an ingest worker process: parse paths until the pipe closes."""
+    while True:
+        try:
+            path = connection.recv()
+        except EOFError:
+            return
+        try:
+            reply = ("done", read_document(path))
+        except Exception as exc:  # noqa: BLE001 - isolate broken files
+            reply = ("error", str(exc))
+        connection.send(reply)
+
+
+class _ParseWorker:
+    """One worker process parsing one file at a time over a pipe."""
+
+    def __init__(self, context: Any) -> None:
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_parse_worker, args=(child,), name="ingest-worker", daemon=True)
+        self.process.start()
+        # Sin la copia del padre, la muerte del hijo se ve como EOF en la tubería
+        child.close()
+        self.path: Optional[Path] = None
+        self.started = 0.0
+        self.crashed = False
+
+    def submit(self, path: Path) -> None:
+        self.connection.send(path)
+        self.path = path
+        self.started = time.monotonic()
+
+    def result(self) -> dict:
+        path, self.path = self.path, None
+        try:
+            kind, payload = self.connection.recv()
+        except (EOFError, OSError):
+            # Un crash nativo (p. ej. en el parser de PDF) solo se lleva su fichero
+            self.crashed = True
+            self.process.join(1)
+            return {"path": path, "error": f"worker crashed (exit code {self.process.exitcode})"}
+        if kind == "error":
+            return {"path": path, "error": payload}
+        return payload
+
+    def terminate(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+def iter_documents(
+    paths: Iterable[Path],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[dict]:
+    """Parse files across worker processes, yielding documents as they finish.
+
+    A file that raises, crashes its worker or exceeds ``timeout`` seconds
+    yields ``{"path", "error"}`` instead of stopping the whole ingestion; only
+    the affected worker is replaced. Workers are spawned, never forked: this
+    runs inside the API process, whose model and event-loop threads a fork
+    could leave holding locks.
+    """
+    paths = list(paths)
+    workers = SETTINGS.ingest_workers if workers is None else workers
+    timeout = SETTINGS.ingest_timeout if timeout is None else timeout
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield read_document(path)
+            except Exception as exc:  # noqa: BLE001 - isolate broken files
+                yield {"path": path, "error": str(exc)}
+        return
+
+    context = multiprocessing.get_context("spawn")
+    pool = [_ParseWorker(context) for _ in range(min(workers, len(paths)))]
+    queue = deque(paths)
+    try:
+        while True:
+            # Como mucho un fichero en vuelo por worker: el plazo corre desde que arranca
+            for worker in pool:
+                if worker.path is None and queue:
+                    worker.submit(queue.popleft())
+            busy = [worker for worker in pool if worker.path is not None]
+            if not busy:
+                return
+            nearest = min(worker.started for worker in busy) + timeout - time.monotonic()
+            ready = wait([worker.connection for worker in busy], timeout=max(nearest, 0.0))
+            now = time.monotonic()
+            for worker in busy:
+                if worker.connection in ready:
+                    document = worker.result()
+                elif now - worker.started >= timeout:
+                    document = {"path": worker.path, "error": f"timed out after {timeout:.0f}s"}
+                    # Un worker colgado no se puede interrumpir: se sustituye solo ese
+                    worker.crashed = True
+                else:
+                    continue
+                if worker.crashed:
+                    worker.terminate()
+                    pool[pool.index(worker)] = _ParseWorker(context)
+                yield document
+    finally:
+        for worker in pool:
+            worker.terminate()
+
+
+def ingest_pack(pack_dir: Path) -> List[dict]:
+    return [doc for doc in iter_documents(iter_pack_files(pack_dir)) if "error" not in doc]
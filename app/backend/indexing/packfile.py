@@ -0,0 +1,476 @@
+"""Binary, memory-mappable on-disk format for pack indexes.
+
+Layout (little-endian), every section aligned to 8 bytes::
+
+    header      magic "FCIX", u32 version, u32 section count,
+                u64 n_chunks, u64 n_terms, u64 nnz, then (u64 offset, u64 length)
+                for each section
+    vocab       u64[n_terms + 1] offsets + UTF-8 blob, terms sorted by bytes
+    keys        u64[n_chunks + 1] offsets + UTF-8 blob of chunk keys
+    rows        CSR by chunk: u64[n_chunks + 1] pointers, u32 term ids, u32 weights
+    postings    CSC by term: u64[n_terms + 1] pointers, u32 chunk ids, u32 weights
+    norms       f64[n_chunks]
+
+Loading only maps the file and reads the header, so opening a pack costs the
+same regardless of its size and worker processes share the same pages.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"FCIX"
+VERSION = 1
+SECTIONS = (
+    "vocab_offsets",
+    "vocab_blob",
+    "key_offsets",
+    "key_blob",
+    "row_ptr",
+    "row_terms",
+    "row_weights",
+    "col_ptr",
+    "col_chunks",
+    "col_weights",
+    "norms",
+)
+_HEADER = struct.Struct("<4sII QQQ")
+# Tope del buffer denso de puntuaciones de search_many
+SCORE_BUFFER_BYTES = 64 << 20
+_SECTION = struct.Struct("<QQ")
+_DTYPES = {
+    "vocab_offsets": np.uint64,
+    "vocab_blob": np.uint8,
+    "key_offsets": np.uint64,
+    "key_blob": np.uint8,
+    "row_ptr": np.uint64,
+    "row_terms": np.uint32,
+    "row_weights": np.uint32,
+    "col_ptr": np.uint64,
+    "col_chunks": np.uint32,
+    "col_weights": np.uint32,
+    "norms": np.float64,
+}
+
+
+class PackFormatError(ValueError):
+    pass
+
+
+def _blob(strings: Sequence[str]) -> Tuple[np.ndarray, bytes]:
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.uint64)
+    return offsets, b"".join(encoded)
+
+
+def write_pack_index(path: Path, keys: Sequence[str], vectors: Sequence[Dict[str, int]]) -> None:
+    if len(keys) != len(vectors):
+        raise ValueError("keys and vectors must have the same length")
+    writer = PackIndexWriter(path)
+    try:
+        for key, vector in zip(keys, vectors):
+            writer.add(key, vector)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+class PackIndexWriter:
+    """Stream chunk rows into a pack index without holding them in memory.
+
+    Rows are appended to scratch files next to ``path`` as they arrive; only
+    the vocabulary stays in memory. ``close`` sorts the vocabulary and
+    writes the file section by section, reading the scratch files back in
+    blocks:
+
+    * rows: ``block_rows`` chunks at a time, each row sorted by term id;
+    * postings: one scan of the scratch files per range of terms holding at
+      most ``sort_entries`` postings, sorted and appended.
+
+    Memory is bounded by the block sizes plus O(vocabulary) for the term
+    counts and pointers, whatever the number of postings; a single term
+    with more than ``sort_entries`` postings is sorted on its own. Larger
+    packs cost extra scans of the scratch files instead of memory.
+    """
+
+    def __init__(
+        self, path: Path, buffer_rows: int = 4096, block_rows: int = 1 << 16, sort_entries: int = 1 << 22
+    ) -> None:
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.block_rows = block_rows
+        self.sort_entries = sort_entries
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._scratch = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        self._files = {
+            name: (self._scratch / name).open("wb")
+            for name in ("terms", "weights", "lengths", "norms", "key_lengths", "key_blob")
+        }
+        self._term_ids: Dict[str, int] = {}
+        self._vocabulary: List[str] = []
+        self._buffers = {
+            "terms": array("I"),
+            "weights": array("I"),
+            "lengths": array("Q"),
+            "norms": array("d"),
+            "key_lengths": array("Q"),
+        }
+        self._key_blob = bytearray()
+        self.n_chunks = 0
+        self.nnz = 0
+
+    def add(self, key: str, vector: Dict[str, int]) -> None:
+        buffers = self._buffers
+        # Igual que _cosine_similarity: norma sobre los valores en orden de inserción
+        buffers["norms"].append(math.sqrt(sum(value * value for value in vector.values())))
+        for term, weight in vector.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._vocabulary)
+                self._vocabulary.append(term)
+            buffers["terms"].append(term_id)
+            buffers["weights"].append(weight)
+        buffers["lengths"].append(len(vector))
+        encoded = key.encode("utf-8")
+        buffers["key_lengths"].append(len(encoded))
+        self._key_blob += encoded
+        self.n_chunks += 1
+        self.nnz += len(vector)
+        if len(buffers["lengths"]) >= self.buffer_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        for name, buffer in self._buffers.items():
+            buffer.tofile(self._files[name])
+            del buffer[:]
+        self._files["key_blob"].write(self._key_blob)
+        self._key_blob = bytearray()
+
+    def abort(self) -> None:
+        for handle in self._files.values():
+            handle.close()
+        shutil.rmtree(self._scratch, ignore_errors=True)
+
+    def close(self) -> None:
+        self._flush()
+        for handle in self._files.values():
+            handle.close()
+        try:
+            self._assemble()
+        finally:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+
+    def _row_blocks(self, remap: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yield ``(chunk ids, sorted term ids, weights)`` per entry, ``block_rows`` chunks at a time."""
+        with (self._scratch / "lengths").open("rb") as lengths_file, (self._scratch / "terms").open(
+            "rb"
+        ) as terms_file, (self._scratch / "weights").open("rb") as weights_file:
+            for first in range(0, self.n_chunks, self.block_rows):
+                lengths = np.fromfile(lengths_file, dtype=np.uint64, count=min(self.block_rows, self.n_chunks - first))
+                count = int(lengths.sum())
+                terms = remap[np.fromfile(terms_file, dtype=np.uint32, count=count)]
+                weights = np.fromfile(weights_file, dtype=np.uint32, count=count)
+                chunks = np.repeat(np.arange(first, first + len(lengths), dtype=np.uint32), lengths.astype(np.int64))
+                yield chunks, terms, weights
+
+    def _assemble(self) -> None:
+        vocabulary = self._vocabulary
+        order = sorted(range(len(vocabulary)), key=lambda term_id: vocabulary[term_id].encode("utf-8"))
+        remap = np.empty(len(vocabulary), dtype=np.uint32)
+        remap[np.asarray(order, dtype=np.int64)] = np.arange(len(vocabulary), dtype=np.uint32)
+        vocab_offsets, vocab_blob = _blob([vocabulary[term_id] for term_id in order])
+        sizes = {
+            "vocab_offsets": vocab_offsets.nbytes,
+            "vocab_blob": len(vocab_blob),
+            "key_offsets": 8 * (self.n_chunks + 1),
+            "key_blob": (self._scratch / "key_blob").stat().st_size,
+            "row_ptr": 8 * (self.n_chunks + 1),
+            "row_terms": 4 * self.nnz,
+            "row_weights": 4 * self.nnz,
+            "col_ptr": 8 * (len(vocabulary) + 1),
+            "col_chunks": 4 * self.nnz,
+            "col_weights": 4 * self.nnz,
+            "norms": 8 * self.n_chunks,
+        }
+
+        position = _align(_HEADER.size + _SECTION.size * len(SECTIONS))
+        table = {}
+        for name in SECTIONS:
+            table[name] = (position, sizes[name])
+            position = _align(position + sizes[name])
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+
+            def section(name: str) -> None:
+                handle.write(b"\0" * (table[name][0] - handle.tell()))
+
+            handle.write(
+                _HEADER.pack(MAGIC, VERSION, len(SECTIONS), self.n_chunks, len(vocabulary), self.nnz)
+            )
+            for name in SECTIONS:
+                handle.write(_SECTION.pack(*table[name]))
+            section("vocab_offsets")
+            vocab_offsets.tofile(handle)
+            section("vocab_blob")
+            handle.write(vocab_blob)
+            section("key_offsets")
+            self._write_offsets("key_lengths", handle)
+            section("key_blob")
+            self._copy("key_blob", handle)
+            section("row_ptr")
+            self._write_offsets("lengths", handle)
+
+            # Filas ordenadas por término, bloque a bloque; los pesos van a un fichero aparte
+            section("row_terms")
+            counts = np.zeros(len(vocabulary), dtype=np.uint64)
+            with (self._scratch / "row_weights").open("wb") as weights_file:
+                for chunks, terms, weights in self._row_blocks(remap):
+                    row_order = np.lexsort((terms, chunks))
+                    terms[row_order].tofile(handle)
+                    weights[row_order].tofile(weights_file)
+                    counts += np.bincount(terms, minlength=len(vocabulary)).astype(np.uint64)
+            section("row_weights")
+            self._copy("row_weights", handle)
+
+            section("col_ptr")
+            col_ptr = np.zeros(len(vocabulary) + 1, dtype=np.uint64)
+            np.cumsum(counts, out=col_ptr[1:])
+            col_ptr.tofile(handle)
+
+            # Postings por rangos de términos: cada pasada reúne, como mucho,
+            # sort_entries entradas, ya en orden de chunk dentro de cada término
+            section("col_chunks")
+            with (self._scratch / "col_weights").open("wb") as weights_file:
+                low = 0
+                while low < len(vocabulary):
+                    limit = col_ptr[low] + np.uint64(self.sort_entries)
+                    high = max(low + 1, int(np.searchsorted(col_ptr, limit, side="right")) - 1)
+                    parts = []
+                    for chunks, terms, weights in self._row_blocks(remap):
+                        keep = (terms >= low) & (terms < high)
+                        parts.append((chunks[keep], terms[keep], weights[keep]))
+                    chunks = np.concatenate([part[0] for part in parts])
+                    terms = np.concatenate([part[1] for part in parts])
+                    weights = np.concatenate([part[2] for part in parts])
+                    col_order = np.argsort(terms, kind="stable")
+                    chunks[col_order].tofile(handle)
+                    weights[col_order].tofile(weights_file)
+                    low = high
+            section("col_weights")
+            self._copy("col_weights", handle)
+            section("norms")
+            self._copy("norms", handle)
+        os.replace(tmp_path, self.path)
+
+    def _write_offsets(self, name: str, handle: BinaryIO) -> None:
+        """Write the u64 prefix sums of the lengths spooled in ``name``, block by block."""
+        total = np.zeros(1, dtype=np.uint64)
+        total.tofile(handle)
+        with (self._scratch / name).open("rb") as source:
+            while True:
+                lengths = np.fromfile(source, dtype=np.uint64, count=self.block_rows)
+                if not len(lengths):
+                    break
+                offsets = np.cumsum(lengths, dtype=np.uint64) + total[0]
+                offsets.tofile(handle)
+                total[0] = offsets[-1]
+
+    def _copy(self, name: str, handle: BinaryIO) -> None:
+        with (self._scratch / name).open("rb") as source:
+            shutil.copyfileobj(source, handle, 1 << 20)
+
+
+def _align(value: int) -> int:
+    return (value + 7) & ~7
+
+
+class PackIndex:
+    """Read-only, memory-mapped view over a pack index file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = path.open("rb")
+        try:
+            self._mmap = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:  # fichero vacío
+            self._handle.close()
+            raise PackFormatError(f"Empty pack index: {path}") from exc
+        magic, version, sections, n_chunks, n_terms, nnz = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise PackFormatError(f"Not a pack index: {path}")
+        if version != VERSION or sections != len(SECTIONS):
+            self.close()
+            raise PackFormatError(f"Unsupported pack index version {version}: {path}")
+        self.n_chunks = n_chunks
+        self.n_terms = n_terms
+        self.nnz = nnz
+        arrays = {}
+        for position, name in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + position * _SECTION.size)
+            dtype = np.dtype(_DTYPES[name])
+            arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+        self._arrays = arrays
+        self.norms = arrays["norms"]
+
+    def close(self) -> None:
+        # Las vistas numpy mantienen exportado el buffer: se liberan antes de cerrar
+        self._arrays = {}
+        self.norms = None
+        try:
+            self._mmap.close()
+        except (BufferError, AttributeError):
+            pass
+        self._handle.close()
+
+    def __len__(self) -> int:
+        return self.n_chunks
+
+    def key(self, chunk_id: int) -> str:
+        return self._string("key", chunk_id)
+
+    def keys(self) -> List[str]:
+        return [self.key(chunk_id) for chunk_id in range(self.n_chunks)]
+
+    def term(self, term_id: int) -> str:
+        return self._string("vocab", term_id)
+
+    def term_id(self, term: str) -> Optional[int]:
+        target = term.encode("utf-8")
+        offsets = self._arrays["vocab_offsets"]
+        blob = self._arrays["vocab_blob"]
+        low, high = 0, self.n_terms
+        while low < high:
+            middle = (low + high) // 2
+            value = blob[int(offsets[middle]) : int(offsets[middle + 1])].tobytes()
+            if value < target:
+                low = middle + 1
+            elif value > target:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        term_id = self.term_id(term)
+        if term_id is None:
+            empty = np.zeros(0, dtype=np.uint32)
+            return empty, empty
+        start, end = int(self._arrays["col_ptr"][term_id]), int(self._arrays["col_ptr"][term_id + 1])
+        return self._arrays["col_chunks"][start:end], self._arrays["col_weights"][start:end]
+
+    def vector(self, chunk_id: int) -> Dict[str, int]:
+        start, end = int(self._arrays["row_ptr"][chunk_id]), int(self._arrays["row_ptr"][chunk_id + 1])
+        terms = self._arrays["row_terms"][start:end]
+        weights = self._arrays["row_weights"][start:end]
+        return {self.term(int(term_id)): int(weight) for term_id, weight in zip(terms, weights)}
+
+    def search(self, query_vector: Dict[str, int], k: int) -> List[Tuple[str, float]]:
+        if not query_vector or k <= 0 or self.n_chunks == 0:
+            return []
+        query_norm = math.sqrt(sum(value * value for value in query_vector.values()))
+        if query_norm == 0:
+            return []
+        chunk_parts = []
+        weight_parts = []
+        for term, query_weight in query_vector.items():
+            chunks, weights = self.postings(term)
+            if len(chunks):
+                chunk_parts.append(chunks)
+                weight_parts.append(weights.astype(np.int64) * query_weight)
+        if not chunk_parts:
+            return []
+        candidates, inverse = np.unique(np.concatenate(chunk_parts), return_inverse=True)
+        dots = np.bincount(inverse, weights=np.concatenate(weight_parts))
+        norms = self.norms[candidates]
+        valid = (norms > 0) & (dots > 0)
+        candidates, dots, norms = candidates[valid], dots[valid], norms[valid]
+        scores = dots / (query_norm * norms)
+        return [(self.key(int(candidates[i])), float(scores[i])) for i in top_k(scores, candidates, k)]
+
+    def search_many(
+        self, query_vectors: Sequence[Dict[str, int]], k: int, batch_size: int = 64
+    ) -> List[List[Tuple[str, float]]]:
+        """Score queries in blocks of up to ``batch_size`` against a dense score buffer.
+
+        Each block accumulates its dot products into one ``(block, n_chunks)``
+        float64 buffer: every term's postings are read once per block and added
+        to the rows of the queries that contain it. Blocks shrink so the buffer
+        stays under ``SCORE_BUFFER_BYTES``; memory never grows with how common
+        the query terms are. When even one row would not fit (more than
+        ``SCORE_BUFFER_BYTES / 8`` chunks), each query goes through
+        :meth:`search` instead. Results are identical to :meth:`search`.
+        """
+        rows_per_block = min(batch_size, SCORE_BUFFER_BYTES // (8 * max(1, self.n_chunks)))
+        if rows_per_block < 1:
+            # Ni una fila cabe en el búfer: cada consulta solo ocupa sus candidatos
+            return [self.search(query_vector, k) for query_vector in query_vectors]
+        results: List[List[Tuple[str, float]]] = []
+        for start in range(0, len(query_vectors), rows_per_block):
+            results.extend(self._search_block(query_vectors[start : start + rows_per_block], k))
+        return results
+
+    def _search_block(self, query_vectors: Sequence[Dict[str, int]], k: int) -> List[List[Tuple[str, float]]]:
+        results: List[List[Tuple[str, float]]] = [[] for _ in query_vectors]
+        if k <= 0 or self.n_chunks == 0:
+            return results
+        query_norms = [math.sqrt(sum(value * value for value in vector.values())) for vector in query_vectors]
+        rows_by_term: Dict[str, List[Tuple[int, int]]] = {}
+        for row, vector in enumerate(query_vectors):
+            if query_norms[row] == 0:
+                continue
+            for term, weight in vector.items():
+                rows_by_term.setdefault(term, []).append((row, weight))
+
+        # Productos enteros sumados en float64: exactos, igual que el bincount de search
+        dots = np.zeros((len(query_vectors), self.n_chunks), dtype=np.float64)
+        touched = np.zeros(len(query_vectors), dtype=bool)
+        for term, query_rows in rows_by_term.items():
+            chunks, weights = self.postings(term)
+            if not len(chunks):
+                continue
+            rows = np.array([row for row, _ in query_rows], dtype=np.intp)
+            query_weights = np.array([weight for _, weight in query_rows], dtype=np.float64)
+            # Cada término aparece una vez por consulta y cada chunk una vez por posting: sin pares repetidos
+            dots[np.ix_(rows, chunks.astype(np.intp))] += query_weights[:, None] * weights.astype(np.float64)
+            touched[rows] = True
+
+        for row in np.flatnonzero(touched).tolist():
+            candidates = np.flatnonzero(dots[row] > 0)
+            norms = self.norms[candidates]
+            valid = norms > 0
+            candidates, norms = candidates[valid], norms[valid]
+            scores = dots[row, candidates] / (query_norms[row] * norms)
+            results[row] = [
+                (self.key(int(candidates[i])), float(scores[i])) for i in top_k(scores, candidates, k)
+            ]
+        return results
+
+    def _string(self, prefix: str, index: int) -> str:
+        offsets = self._arrays[f"{prefix}_offsets"]
+        blob = self._arrays[f"{prefix}_blob"]
+        return blob[int(offsets[index]) : int(offsets[index + 1])].tobytes().decode("utf-8")
+
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k best scores, ties broken by ascending id."""
+    if len(scores) > k:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = np.nonzero(scores >= threshold)[0]
+    else:
+        keep = np.arange(len(scores))
+    order = np.lexsort((ids[keep], -scores[keep]))
+    return keep[order[:k]]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, List, Sequence, Tuple
+
+Posting = Tuple[int, int]
+
+
+class SparseIndex:
+    """Inverted index over bag-of-words chunk vectors.
+
+    Postings map each term to ``(chunk_id, weight)`` pairs and chunk norms are
+    precomputed, so a query only touches chunks that share a term with it.
+    Scores are the same cosine similarity as ``_cosine_similarity``.
+    """
+
+    def __init__(self, keys: List[str], norms: List[float], postings: Dict[str, List[Posting]]) -> None:
+        self.keys = keys
+        self.norms = norms
+        self._postings = postings
+
+    @classmethod
+    def from_vectors(cls, vectors: Dict[str, Dict[str, int]]) -> "SparseIndex":
+        keys: List[str] = []
+        norms: List[float] = []
+        postings: Dict[str, List[Posting]] = {}
+        for chunk_id, (key, vector) in enumerate(vectors.items()):
+            keys.append(key)
+            norms.append(math.sqrt(sum(value * value for value in vector.values())))
+            for term, weight in vector.items():
+                postings.setdefault(term, []).append((chunk_id, weight))
+        return cls(keys, norms, postings)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def postings(self, term: str) -> Sequence[Posting]:
+        return self._postings.get(term, ())
+
+    def search(self, query_vector: Dict[str, int], k: int) -> List[Tuple[str, float]]:
+        if not query_vector or k <= 0:
+            return []
+        query_norm = math.sqrt(sum(value * value for value in query_vector.values()))
+        if query_norm == 0:
+            return []
+        dots: Dict[int, int] = {}
+        for term, query_weight in query_vector.items():
+            for chunk_id, weight in self.postings(term):
+                dots[chunk_id] = dots.get(chunk_id, 0) + query_weight * weight
+
+        scored = []
+        for chunk_id, dot in dots.items():
+            norm = self.norms[chunk_id]
+            if norm == 0 or dot <= 0:
+                continue
+            scored.append((dot / (query_norm * norm), -chunk_id))
+        # Empates en el orden de inserción, igual que el sort estable original
+        top = heapq.nlargest(k, scored)
+        return [(self.keys[-negative_id], score) for score, negative_id in top]
+
+    def search_many(self, query_vectors: Sequence[Dict[str, int]], k: int) -> List[List[Tuple[str, float]]]:
+        return [self.search(query_vector, k) for query_vector in query_vectors]
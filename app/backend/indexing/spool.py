@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+PROGRESS_FILE = "progress.json"
+CHUNKS_FILE = "chunks.jsonl"
+DENSE_FILE = "dense.f32"
+
+
+class BuildSpool:
+    """Append-only scratch area that makes ``VectorStore.build`` resumable.
+
+    Parsed chunks are flushed in bounded batches to ``chunks.jsonl`` (plus raw
+    float32 rows in ``dense.f32`` when embeddings are enabled) and
+    ``progress.json`` is rewritten after every flush with the files that are
+    fully spooled. An interrupted build picks up from the last flush; a spool
+    left by a different base index or embedder is discarded.
+    """
+
+    def __init__(self, root: Path, base: str, embedder: Optional[str], dim: int = 0) -> None:
+        self.root = root
+        self.base = base
+        self.embedder = embedder
+        self.dim = dim
+        self.completed: Dict[str, dict] = {}
+        self.chunk_count = 0
+        self._chunks_bytes = 0
+        self._batch_lines: List[bytes] = []
+        self._batch_bytes = 0
+        self._batch_texts: List[str] = []
+        self._batch_files: Dict[str, dict] = {}
+        self._open()
+
+    def _open(self) -> None:
+        progress = self._read_progress()
+        if progress is None or progress.get("base") != self.base or progress.get("embedder") != self.embedder:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._write_progress()
+            return
+        self.completed = progress["files"]
+        self.chunk_count = progress["chunk_count"]
+        self._chunks_bytes = progress["chunks_bytes"]
+        # Lo escrito después del último progress.json pertenece a un lote incompleto
+        _truncate(self.root / CHUNKS_FILE, self._chunks_bytes)
+        _truncate(self.root / DENSE_FILE, self.chunk_count * self.dim * 4)
+
+    @property
+    def pending(self) -> int:
+        return len(self._batch_lines)
+
+    def add_chunk(self, relative: str, key: str, metadata: dict, vector: Dict[str, int], text: str) -> None:
+        record = {"file": relative, "key": key, "metadata": metadata, "vector": vector}
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        self._batch_lines.append(line)
+        self._batch_bytes += len(line)
+        self._batch_texts.append(text)
+
+    def start_file(self) -> dict:
+        """Position where the next file's chunks start; store it in its entry."""
+        return {"row": self.chunk_count + len(self._batch_lines), "offset": self._chunks_bytes + self._batch_bytes}
+
+    def complete_file(self, relative: str, entry: dict) -> None:
+        self._batch_files[relative] = entry
+
+    def flush(self, embed=None) -> None:
+        if not self._batch_lines and not self._batch_files:
+            return
+        if embed is not None and self._batch_texts:
+            with (self.root / DENSE_FILE).open("ab") as handle:
+                np.asarray(embed(self._batch_texts), dtype=np.float32).tofile(handle)
+        data = b"".join(self._batch_lines)
+        with (self.root / CHUNKS_FILE).open("ab") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._chunks_bytes += len(data)
+        self.chunk_count += len(self._batch_lines)
+        self.completed.update(self._batch_files)
+        self._batch_lines = []
+        self._batch_bytes = 0
+        self._batch_texts = []
+        self._batch_files = {}
+        self._write_progress()
+
+    def read_file(self, position: dict, count: int) -> Iterator[Tuple[int, str, dict, Dict[str, int]]]:
+        """Yield ``(row, key, metadata, vector)`` for a file spooled at ``position``."""
+        with (self.root / CHUNKS_FILE).open("rb") as handle:
+            handle.seek(position["offset"])
+            for row in range(position["row"], position["row"] + count):
+                record = json.loads(handle.readline())
+                yield row, record["key"], record["metadata"], record["vector"]
+
+    def dense_rows(self) -> np.ndarray:
+        path = self.root / DENSE_FILE
+        if self.chunk_count == 0 or not path.exists():
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(path, dtype=np.float32, mode="r", shape=(self.chunk_count, self.dim))
+
+    def discard(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _read_progress(self) -> Optional[dict]:
+        try:
+            return json.loads((self.root / PROGRESS_FILE).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_progress(self) -> None:
+        payload = {
+            "base": self.base,
+            "embedder": self.embedder,
+            "files": self.completed,
+            "chunk_count": self.chunk_count,
+            "chunks_bytes": self._chunks_bytes,
+        }
+        tmp_path = self.root / (PROGRESS_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(payload))
+        os.replace(tmp_path, self.root / PROGRESS_FILE)
+
+
+def _truncate(path: Path, size: int) -> None:
+    if path.exists() and path.stat().st_size > size:
+        with path.open("r+b") as handle:
+            handle.truncate(size)
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+import os
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
+
+import numpy as np
 
 from core.settings import SETTINGS
-from indexing.chunking import chunk_text
-from indexing.ingest import ingest_pack
+from indexing.ann import DenseIndex
+from indexing.chunking import chunk_spans
+from indexing.embeddings import Embedder, embedder_from_name, get_embedder
+from indexing.ingest import iter_documents, iter_pack_files
+from indexing.packfile import PackFormatError, PackIndex, PackIndexWriter, write_pack_index
+from indexing.sparse_index import SparseIndex
+from indexing.spool import BuildSpool
+from utils.hash import file_hash
+
+# Se incrementa cuando cambia el troceado: los chunks anteriores dejan de reutilizarse
+MANIFEST_VERSION = 2
 
 
 class VectorStore:
@@ -16,62 +29,303 @@ class VectorStore:
         self.pack_name = pack_name
         self.db_path = db_path
         self.vector_path = vector_path
-        self._vectors: Dict[str, Dict[str, int]] = {}
+        self.legacy_vector_path = db_path.with_name(f"{pack_name}_vectors.json")
         self._metadata: Dict[str, dict] = {}
+        self._index: Optional[Union[PackIndex, SparseIndex]] = None
+        self._dense: Optional[DenseIndex] = None
+        self._embedder: Optional[Embedder] = None
+
+    @property
+    def dense_vectors_path(self) -> Path:
+        return self.db_path.with_name(f"{self.pack_name}_dense.npy")
+
+    @property
+    def dense_ivf_path(self) -> Path:
+        return self.db_path.with_name(f"{self.pack_name}_dense.npz")
 
     @classmethod
     def from_pack(cls, pack_name: str) -> "VectorStore":
         db_path = SETTINGS.data_dir / "db" / f"{pack_name}.json"
-        vector_path = SETTINGS.data_dir / "db" / f"{pack_name}_vectors.json"
+        vector_path = SETTINGS.data_dir / "db" / f"{pack_name}_index.bin"
         store = cls(pack_name, db_path, vector_path)
         store._load()
         return store
 
-    def build(self) -> None:
+    @property
+    def manifest_path(self) -> Path:
+        return self.db_path.with_name(f"{self.pack_name}_manifest.json")
+
+    def build(self) -> dict:
+        """Re-index the pack, only parsing files that were added or changed.
+
+        A manifest records each file's mtime, size, content hash and chunk
+        keys. Unchanged files reuse their stored vectors; chunks of deleted
+        files are dropped. Chunk keys derive from the file path, so they stay
+        stable across runs.
+
+        Parsed chunks are spooled to disk every ``index_batch_chunks`` chunks
+        and the final index is streamed from the spool, so memory does not grow
+        with the pack; an interrupted build resumes from the last batch.
+        """
         pack_dir = SETTINGS.packs_dir / self.pack_name
-        docs = ingest_pack(pack_dir)
-        chunk_id = 0
-        for doc in docs:
-            chunks = chunk_text(doc["content"])
-            for chunk in chunks:
-                chunk_id += 1
-                chunk_key = f"{self.pack_name}-{chunk_id}"
-                self._metadata[chunk_key] = {
-                    "title": doc["path"].name,
-                    "source": str(doc["path"]),
+        embedder = get_embedder() if SETTINGS.retrieval_backend == "dense" else None
+        reusable_dense = self._reusable_dense(embedder)
+        reusable = self._index if isinstance(self._index, PackIndex) else None
+        if embedder is not None and reusable_dense is None:
+            # Sin embeddings previos compatibles hay que re-procesar todo
+            reusable = None
+        previous = self._read_manifest() if reusable is not None else {}
+        existing_ids = {key: chunk_id for chunk_id, key in enumerate(reusable.keys())} if reusable else {}
+        if reusable_dense is not None:
+            existing_ids = {key: chunk_id for key, chunk_id in existing_ids.items() if key in reusable_dense}
+
+        files: Dict[str, dict] = {}
+        changed: Dict[str, Path] = {}
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        for path in iter_pack_files(pack_dir):
+            relative = path.relative_to(pack_dir).as_posix()
+            stat = path.stat()
+            entry = previous.get(relative)
+            reusable_entry = entry is not None and all(key in existing_ids for key in entry["chunks"])
+            if reusable_entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                files[relative] = entry
+                stats["unchanged"] += 1
+                continue
+            digest = file_hash(path)
+            if reusable_entry and entry["hash"] == digest:
+                files[relative] = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                stats["unchanged"] += 1
+                continue
+            files[relative] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": digest, "chunks": []}
+            changed[relative] = path
+            stats["updated" if entry is not None else "added"] += 1
+        stats["removed"] = sum(1 for relative in previous if relative not in files)
+
+        if reusable is not None and not changed and not stats["removed"]:
+            self._write_manifest(files)
+            return stats
+
+        base = "fresh"
+        if reusable is not None and self.manifest_path.exists():
+            base = hashlib.sha1(self.manifest_path.read_bytes()).hexdigest()
+        spool = BuildSpool(
+            self.db_path.with_name(f"{self.pack_name}_build"),
+            base,
+            embedder.name if embedder is not None else None,
+            embedder.dim if embedder is not None else 0,
+        )
+        # Reanudación: los ficheros ya volcados por una ejecución interrumpida no se parsean
+        for relative in list(changed):
+            done = spool.completed.get(relative)
+            if done is not None and done["hash"] == files[relative]["hash"]:
+                files[relative] = {**done, "mtime_ns": files[relative]["mtime_ns"], "size": files[relative]["size"]}
+                del changed[relative]
+
+        # Los ficheros se parsean en paralelo y se vuelcan al spool por lotes acotados
+        embed = embedder.embed if embedder is not None else None
+        relative_by_path = {path: relative for relative, path in changed.items()}
+        for doc in iter_documents(changed.values()):
+            relative = relative_by_path[doc["path"]]
+            if "error" in doc:
+                print(f"Warning: skipping {doc['path']}: {doc['error']}")
+                del files[relative]
+                stats["failed"] += 1
+                continue
+            entry = files[relative]
+            entry["spool"] = spool.start_file()
+            path = doc["path"]
+            content = doc["content"]
+            prefix = hashlib.sha1(relative.encode("utf-8")).hexdigest()[:12]
+            for position, span in enumerate(chunk_spans(content, pages=doc["pages"])):
+                key = f"{self.pack_name}-{prefix}-{position}"
+                entry["chunks"].append(key)
+                chunk = span.text(content)
+                metadata = {
+                    "title": path.name,
+                    "source": str(path),
                     "excerpt": chunk[:300],
+                    "start": span.start,
+                    "end": span.end,
                 }
-                self._vectors[chunk_key] = _embed_text(chunk)
-        self._save()
+                if span.page is not None:
+                    metadata["page"] = span.page
+                spool.add_chunk(relative, key, metadata, _embed_text(chunk), chunk)
+            spool.complete_file(relative, entry)
+            # Solo se vuelca entre ficheros, así el spool nunca guarda uno a medias
+            if spool.pending >= SETTINGS.index_batch_chunks:
+                spool.flush(embed)
+        spool.flush(embed)
+
+        self._assemble(files, spool, reusable, existing_ids, reusable_dense, embedder)
+        for entry in files.values():
+            entry.pop("spool", None)
+        self._write_manifest(files)
+        spool.discard()
+        return stats
+
+    def _assemble(
+        self,
+        files: Dict[str, dict],
+        spool: BuildSpool,
+        reusable: Optional[PackIndex],
+        existing_ids: Dict[str, int],
+        reusable_dense: Optional[Dict[str, int]],
+        embedder: Optional[Embedder],
+    ) -> None:
+        """Stream reused and spooled chunks, in file order, into the new index files."""
+        metadata: Dict[str, dict] = {}
+        keys: List[str] = []
+        writer = PackIndexWriter(self.vector_path)
+        dense_tmp = self.dense_vectors_path.with_name(self.dense_vectors_path.name + ".tmp")
+        embeddings = None
+        if embedder is not None:
+            total = sum(len(entry["chunks"]) for entry in files.values())
+            dense_tmp.parent.mkdir(parents=True, exist_ok=True)
+            embeddings = np.lib.format.open_memmap(dense_tmp, mode="w+", dtype=np.float32, shape=(total, embedder.dim))
+            spooled_dense = spool.dense_rows()
+        try:
+            for entry in files.values():
+                if "spool" in entry:
+                    for row, key, chunk_metadata, vector in spool.read_file(entry["spool"], len(entry["chunks"])):
+                        if embeddings is not None:
+                            embeddings[len(keys)] = spooled_dense[row]
+                        writer.add(key, vector)
+                        metadata[key] = chunk_metadata
+                        keys.append(key)
+                    continue
+                for key in entry["chunks"]:
+                    if embeddings is not None:
+                        embeddings[len(keys)] = self._dense.vectors[reusable_dense[key]]
+                    writer.add(key, reusable.vector(existing_ids[key]))
+                    metadata[key] = self._metadata[key]
+                    keys.append(key)
+        except BaseException:
+            writer.abort()
+            embeddings = None
+            dense_tmp.unlink(missing_ok=True)
+            raise
+
+        self._metadata = metadata
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path.write_text(json.dumps(self._metadata, indent=2))
+        # En Windows no se puede reemplazar un fichero mapeado en memoria
+        self.close()
+        writer.close()
+        self._index = PackIndex(self.vector_path)
+        if embeddings is None:
+            return
+        embeddings.flush()
+        dense = DenseIndex.train(keys, embeddings, embedder.name)
+        tmp_ivf = dense.save_ivf(self.dense_ivf_path)
+        del dense, embeddings, spooled_dense
+        self._dense = None
+        os.replace(dense_tmp, self.dense_vectors_path)
+        os.replace(tmp_ivf, self.dense_ivf_path)
+        self._dense = DenseIndex.load(self.dense_vectors_path, self.dense_ivf_path)
+        self._embedder = embedder
+
+    def _reusable_dense(self, embedder: Optional[Embedder]) -> Optional[Dict[str, int]]:
+        if embedder is None or self._dense is None or self._dense.embedder_name != embedder.name:
+            return None
+        return {key: row for row, key in enumerate(self._dense.keys)}
+
+    def _read_manifest(self) -> Dict[str, dict]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except ValueError:
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def _write_manifest(self, files: Dict[str, dict]) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps({"version": MANIFEST_VERSION, "files": files}, indent=2))
 
     def search(self, query: str, k: int = 5) -> List[dict]:
-        if not self._vectors:
+        if self._use_dense():
+            return self.search_many([query], k)[0]
+        if self._index is None or len(self._index) == 0:
             return []
-        query_vector = _embed_text(query)
-        scored: List[tuple[str, float]] = []
-        for key, vector in self._vectors.items():
-            score = _cosine_similarity(query_vector, vector)
-            scored.append((key, score))
-        scored.sort(key=lambda item: item[1], reverse=True)
         results = []
-        for key, score in scored[:k]:
-            if score <= 0:
-                continue
+        for key, score in self._index.search(_embed_text(query), k):
             data = dict(self._metadata[key])
             data["score"] = score
             results.append(data)
         return results
 
-    def _save(self) -> None:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.db_path.write_text(json.dumps(self._metadata, indent=2))
-        self.vector_path.write_text(json.dumps(self._vectors, indent=2))
+    def search_many(self, queries: List[str], k: int = 5) -> List[List[dict]]:
+        """Batch version of :meth:`search`; identical queries are scored once."""
+        unique = list(dict.fromkeys(queries))
+        if self._use_dense():
+            scored = self._dense.search_many(self._embedder.embed(unique), k, SETTINGS.ann_nprobe)
+        elif self._index is None or len(self._index) == 0:
+            return [[] for _ in queries]
+        else:
+            scored = self._index.search_many([_embed_text(query) for query in unique], k)
+        by_query: Dict[str, List[dict]] = {}
+        for query, matches in zip(unique, scored):
+            results = []
+            for key, score in matches:
+                data = dict(self._metadata[key])
+                data["score"] = score
+                results.append(data)
+            by_query[query] = results
+        return [by_query[query] for query in queries]
+
+    def _use_dense(self) -> bool:
+        return (
+            SETTINGS.retrieval_backend == "dense"
+            and self._dense is not None
+            and self._embedder is not None
+            and len(self._dense) > 0
+        )
+
+    def close(self) -> None:
+        if isinstance(self._index, PackIndex):
+            self._index.close()
+        self._index = None
 
     def _load(self) -> None:
         if self.db_path.exists():
             self._metadata = json.loads(self.db_path.read_text())
+        self.close()
         if self.vector_path.exists():
-            self._vectors = json.loads(self.vector_path.read_text())
+            try:
+                self._index = PackIndex(self.vector_path)
+            except PackFormatError as exc:
+                print(f"Warning: ignoring unreadable pack index {self.vector_path}: {exc}")
+        if self._index is None and self.legacy_vector_path.exists():
+            self._migrate_legacy_vectors()
+        if SETTINGS.retrieval_backend == "dense":
+            self._load_dense()
+
+    def _load_dense(self) -> None:
+        self._dense = None
+        self._embedder = None
+        if not (self.dense_vectors_path.exists() and self.dense_ivf_path.exists()):
+            return
+        dense = DenseIndex.load(self.dense_vectors_path, self.dense_ivf_path)
+        try:
+            self._embedder = embedder_from_name(dense.embedder_name)
+        except Exception as exc:  # noqa: BLE001 - fall back to sparse retrieval
+            print(f"Warning: dense index for {self.pack_name} unavailable: {exc}")
+            return
+        self._dense = dense
+
+    def _migrate_legacy_vectors(self) -> None:
+        """Convert a pre-binary ``{pack}_vectors.json`` into the mmap index."""
+        vectors: Dict[str, Dict[str, int]] = json.loads(self.legacy_vector_path.read_text())
+        try:
+            write_pack_index(self.vector_path, list(vectors), list(vectors.values()))
+        except OSError as exc:
+            print(f"Warning: could not migrate {self.legacy_vector_path}: {exc}")
+            self._index = SparseIndex.from_vectors(vectors)
+            return
+        self.legacy_vector_path.unlink()
+        self._index = PackIndex(self.vector_path)
 
 
 def _embed_text(text: str) -> Dict[str, int]:
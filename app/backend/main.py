@@ -54,19 +54,39 @@ except ImportError:
 except Exception as e:
     print(f"Warning: Failed to patch dependencies: {e}")
 
+import asyncio
+
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.routes_cache import router as cache_router
 from api.routes_jobs import router as jobs_router
 from api.routes_packs import router as packs_router
 from api.routes_utils import router as utils_router
+from core.engine import preload_models
+from core.settings import SETTINGS
 from pipeline.job_manager import JOB_MANAGER
+from pipeline.model_registry import MODEL_REGISTRY
+
+
+async def _evict_idle_models() -> None:
+    interval = max(SETTINGS.model_idle_timeout / 4, 10.0)
+    while True:
+        await asyncio.sleep(interval)
+        MODEL_REGISTRY.evict_idle()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager para inicializar y limpiar recursos."""
+    # En modo proceso son los workers del pool quienes cargan los modelos
+    if SETTINGS.preload_models and SETTINGS.pipeline_executor != "process":
+        await asyncio.to_thread(preload_models)
     JOB_MANAGER.start()
+    reaper = asyncio.create_task(_evict_idle_models())
     yield
+    reaper.cancel()
+    JOB_MANAGER.close()
+    MODEL_REGISTRY.clear()
 
 
 app = FastAPI(title="FastCheck Local", lifespan=lifespan)
@@ -80,5 +100,6 @@ app.add_middleware(
 )
 
 app.include_router(jobs_router)
+app.include_router(cache_router)
 app.include_router(packs_router)
 app.include_router(utils_router)
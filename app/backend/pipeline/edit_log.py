@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from core.settings import SETTINGS
+
+
+class EditLog:
+    """Append-only JSONL log of a job's transcript edits.
+
+    Each line is one edit in application order. Appending writes only the
+    new lines, and its version (mtime and size) changes on every write, so
+    caches keyed by it pick up new edits. Jobs edited before the log
+    existed keep their ``edits.json`` list until the next write migrates it.
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None) -> None:
+        self.path = path
+        self.legacy_path = legacy_path
+
+    @classmethod
+    def for_job(cls, job_id: str) -> "EditLog":
+        job_dir = SETTINGS.data_dir / "jobs" / job_id
+        return cls(job_dir / "edits.jsonl", job_dir / "edits.json")
+
+    def version(self) -> Optional[Tuple[str, int, int]]:
+        for path in (self.path, self.legacy_path):
+            if path is None:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            return path.name, stat.st_mtime_ns, stat.st_size
+        return None
+
+    def read(self) -> List[dict]:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            if self.legacy_path is not None and self.legacy_path.exists():
+                return json.loads(self.legacy_path.read_text())
+            return []
+        # Una línea a medio escribir todavía no forma parte del log
+        complete = data[: data.rfind(b"\n") + 1]
+        return [json.loads(line) for line in complete.splitlines() if line]
+
+    def append(self, edits: List[dict]) -> int:
+        """Add ``edits`` at the end of the log and return its new length."""
+        if not self.path.exists():
+            self.replace(self.read())
+        with self.path.open("ab") as handle:
+            handle.write(b"".join(_line(edit) for edit in edits))
+        return len(self.read())
+
+    def replace(self, edits: List[dict]) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(b"".join(_line(edit) for edit in edits))
+        os.replace(tmp, self.path)
+        if self.legacy_path is not None and self.legacy_path.exists():
+            self.legacy_path.unlink()
+        return len(edits)
+
+
+def _line(edit: dict) -> bytes:
+    return (json.dumps(edit, ensure_ascii=False) + "\n").encode("utf-8")
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
+import itertools
+import math
+import threading
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
 
-from core.engine import run_pipeline
+from core.engine import run_pipeline, save_result
 from core.models import JobResult
 from core.settings import SETTINGS
+from pipeline.job_store import JobStore
+from pipeline.process_pool import PipelineProcessPool
+from pipeline.result_cache import RESULT_CACHE
+from pipeline.progress import JobCancelled, ProgressTracker
+from utils.ffmpeg import get_audio_duration
+
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+# Las clases de menor rango salen antes; dentro de cada clase, el job más corto
+PRIORITY_CLASSES = {"interactive": 0, "batch": 1}
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """Media duration in seconds via ffprobe, or ``None`` when it cannot be read."""
+    try:
+        duration = get_audio_duration(Path(video_path))
+    except (OSError, ValueError):
+        return None
+    return duration if duration > 0 else None
 
 
 @dataclass
@@ -18,19 +41,80 @@ class JobStatus:
     status: str = "queued"
     progress: float = 0.0
     current_step: str = "queued"
-    logs: list[str] = field(default_factory=list)
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=SETTINGS.job_log_limit))
     result_path: Optional[Path] = None
+    # Últimos eventos de progreso, numerados para reanudar con Last-Event-ID
+    events: Deque[dict] = field(default_factory=lambda: deque(maxlen=SETTINGS.job_event_history))
+    last_event_id: int = 0
 
 
 class JobManager:
-    def __init__(self) -> None:
-        self._queue: asyncio.Queue[dict] = asyncio.Queue()
+    def __init__(self, store: Optional[JobStore] = None) -> None:
+        # (clase, duración, orden de llegada, job_id): prioridad y shortest-job-first
+        self._queue: asyncio.PriorityQueue[Tuple[int, float, int, str]] = asyncio.PriorityQueue()
+        self._pending: Dict[str, dict] = {}
+        self._order = itertools.count()
+        self._cancel_events: Dict[str, threading.Event] = {}
+        # Solo los jobs activos y los últimos terminados; el resto se lee del JobStore
         self._jobs: Dict[str, JobStatus] = {}
-        self._worker_task: Optional[asyncio.Task] = None
+        self._finished: Deque[str] = deque()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._pool: Optional[PipelineProcessPool] = None
+        self._signals: Dict[str, asyncio.Event] = {}
+        self._store = store or JobStore()
 
-    def start(self) -> None:
-        if self._worker_task is None:
-            self._worker_task = asyncio.create_task(self._worker())
+    def start(self, workers: Optional[int] = None) -> None:
+        if self._worker_tasks:
+            return
+        self._recover()
+        count = max(1, workers or SETTINGS.job_workers)
+        if SETTINGS.pipeline_executor == "process":
+            # Un proceso por worker: la cola ya limita cuántos jobs corren a la vez
+            self._pool = PipelineProcessPool(
+                count, SETTINGS.pipeline_worker_max_jobs, SETTINGS.pipeline_worker_max_rss_bytes
+            )
+            self._pool.start()
+            self._worker_tasks.append(asyncio.create_task(self._monitor_pool(self._pool)))
+        self._worker_tasks += [asyncio.create_task(self._worker()) for _ in range(count)]
+
+    def close(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        self._worker_tasks = []
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        self._store.close()
+
+    async def _monitor_pool(self, pool: PipelineProcessPool) -> None:
+        while True:
+            await asyncio.sleep(SETTINGS.pipeline_health_interval)
+            await asyncio.to_thread(pool.check)
+
+    def _recover(self) -> None:
+        """Re-queue the jobs a previous process left queued or running."""
+        for row in self._store.unfinished():
+            job_id = row["job_id"]
+            if job_id in self._jobs:
+                continue
+            result_path = SETTINGS.data_dir / "jobs" / job_id / "result.json"
+            if result_path.exists():
+                # Se cayó justo después de guardar el resultado
+                self._store.update(
+                    job_id, status="completed", current_step="done", progress=1.0, result_path=result_path
+                )
+                continue
+            status = JobStatus(job_id=job_id)
+            status.logs.append("Re-queued after restart")
+            self._jobs[job_id] = status
+            self._store.update(job_id, status="queued", current_step="queued", progress=0.0)
+            self._enqueue(job_id, row["params"], row["priority"], row["duration"])
+
+    def _enqueue(self, job_id: str, params: dict, priority: str, duration: Optional[float]) -> None:
+        self._pending[job_id] = params
+        # Sin duración conocida el job va al final de su clase
+        key = duration if duration is not None else math.inf
+        self._queue.put_nowait((PRIORITY_CLASSES[priority], key, next(self._order), job_id))
 
     def submit(
         self,
@@ -39,64 +123,179 @@ class JobManager:
         num_speakers: Optional[int],
         pack_name: Optional[str],
         verify: bool,
+        priority: Optional[str] = None,
+        duration: Optional[float] = None,
     ) -> str:
+        """Queue a job; ``priority`` defaults by duration (``interactive_max_duration``).
+
+        ``duration`` is probed with ffprobe when not given; callers on the
+        event loop should probe it in a thread first.
+        """
         if not Path(video_path).exists():
             raise ValueError(f"Video file not found: {video_path}")
         if Path(video_path).stat().st_size == 0:
             raise ValueError(f"Video file is empty (0 bytes): {video_path}")
+        if priority is not None and priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if duration is None:
+            duration = probe_duration(video_path)
+        if priority is None:
+            short = duration is not None and duration <= SETTINGS.interactive_max_duration
+            priority = "interactive" if short else "batch"
 
         job_id = str(uuid.uuid4())
-        status = JobStatus(job_id=job_id)
-        self._jobs[job_id] = status
-        self._queue.put_nowait(
-            {
-                "job_id": job_id,
-                "video_path": video_path,
-                "language": language,
-                "num_speakers": num_speakers,
-                "pack_name": pack_name,
-                "verify": verify,
-            }
-        )
+        params = {
+            "video_path": video_path,
+            "language": language,
+            "num_speakers": num_speakers,
+            "pack_name": pack_name,
+            "verify": verify,
+        }
+        self._store.add(job_id, params, priority=priority, duration=duration)
+        self._jobs[job_id] = JobStatus(job_id=job_id)
+        self._enqueue(job_id, params, priority, duration)
         return job_id
 
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job or ask a running one to stop at its next checkpoint.
+
+        Returns the resulting status, or ``None`` for unknown jobs.
+        """
+        status = self.get_status(job_id)
+        if status is None:
+            return None
+        event = self._cancel_events.get(job_id)
+        if status.status == "running" and event is not None:
+            event.set()
+            status.logs.append("Cancellation requested")
+            return "cancelling"
+        if status.status in ("queued", "running"):
+            # Si está en la cola se queda ahí; el worker lo descarta al sacarlo
+            self._pending.pop(job_id, None)
+            status.status = "cancelled"
+            self._store.update(job_id, status="cancelled", current_step="cancelled")
+            self._publish(status, {"stage": "cancelled", "message": "Cancelled before start"})
+            self._retire(job_id)
+        return status.status
+
     def get_status(self, job_id: str) -> Optional[JobStatus]:
-        return self._jobs.get(job_id)
+        status = self._jobs.get(job_id)
+        if status is not None:
+            return status
+        row = self._store.get(job_id)
+        if row is None:
+            return None
+        status = JobStatus(
+            job_id=job_id,
+            status=row["status"],
+            progress=row["progress"],
+            current_step=row["current_step"],
+            result_path=row["result_path"],
+        )
+        if row["error"]:
+            status.logs.append(f"Error: {row['error']}")
+        return status
 
     def get_result(self, job_id: str) -> Optional[JobResult]:
-        status = self._jobs.get(job_id)
-        if not status or not status.result_path or not status.result_path.exists():
+        status = self.get_status(job_id)
+        if not status or not status.result_path:
             return None
-        data = json.loads(status.result_path.read_text())
-        return JobResult.model_validate(data)
+        cached = RESULT_CACHE.get(job_id, status.result_path)
+        return cached.result if cached is not None else None
+
+    async def events(
+        self, job_id: str, after: int = 0, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[dict]]:
+        """Yield the job's progress events after ``after`` until it finishes.
+
+        With ``heartbeat`` set, ``None`` is yielded after that many idle
+        seconds so streaming responses can keep the connection alive.
+        """
+        status = self.get_status(job_id)
+        while True:
+            for event in list(status.events):
+                if event["id"] > after:
+                    after = event["id"]
+                    yield event
+            if status.status in TERMINAL_STATUSES:
+                return
+            signal = self._signals.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(signal.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    def _publish(self, status: JobStatus, event: dict) -> None:
+        """Record an event on the loop thread and wake the job's subscribers."""
+        status.last_event_id += 1
+        event = {"id": status.last_event_id, "status": status.status, **event}
+        status.progress = event.get("progress", status.progress)
+        status.current_step = event.get("stage", status.current_step)
+        if "message" in event:
+            status.logs.append(event["message"])
+        status.events.append(event)
+        signal = self._signals.pop(status.job_id, None)
+        if signal is not None:
+            signal.set()
 
     async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
         while True:
-            job = await self._queue.get()
-            job_id = job["job_id"]
+            _, _, _, job_id = await self._queue.get()
+            params = self._pending.pop(job_id, None)
+            if params is None:
+                # Cancelado mientras esperaba en la cola
+                self._queue.task_done()
+                continue
             status = self._jobs[job_id]
             status.status = "running"
-            status.current_step = "pipeline"
-            status.progress = 0.1
-            status.logs.append("Starting pipeline")
+            self._store.update(job_id, status="running", current_step="pipeline")
+            self._publish(status, {"stage": "pipeline", "progress": 0.0, "message": "Starting pipeline"})
+            cancelled = self._cancel_events[job_id] = threading.Event()
+            # El pipeline corre en otro hilo o proceso: sus eventos se reenvían al event loop
+            emit = functools.partial(loop.call_soon_threadsafe, self._publish, status)
             try:
-                # Ejecutar pipeline en thread separado para no bloquear el event loop
-                result = await asyncio.to_thread(run_pipeline, **job)
-                status.progress = 0.9
-                status.current_step = "saving"
-                result_path = SETTINGS.data_dir / "jobs" / job_id / "result.json"
-                result_path.write_text(result.model_dump_json(indent=2))
+                if self._pool is not None:
+                    # El worker guarda result.json y solo devuelve la ruta
+                    result_path = await asyncio.to_thread(self._pool.run, job_id, params, emit, cancelled)
+                else:
+                    # Ejecutar pipeline en thread separado para no bloquear el event loop
+                    tracker = ProgressTracker(emit, cancelled=cancelled)
+                    result_path = await asyncio.to_thread(self._run_in_thread, job_id, params, tracker)
                 status.result_path = result_path
-                status.progress = 1.0
                 status.status = "completed"
-                status.current_step = "done"
-                status.logs.append("Completed pipeline")
+                self._store.update(
+                    job_id, status="completed", current_step="done", progress=1.0, result_path=result_path
+                )
+                self._publish(status, {"stage": "done", "progress": 1.0, "message": "Completed pipeline"})
+            except JobCancelled as exc:
+                status.status = "cancelled"
+                self._store.update(job_id, status="cancelled", current_step="cancelled", progress=status.progress)
+                self._publish(status, {"stage": "cancelled", "message": f"Cancelled: {exc}"})
             except Exception as exc:  # noqa: BLE001 - job failure
                 status.status = "failed"
-                status.current_step = "error"
-                status.logs.append(f"Error: {exc}")
+                self._store.update(
+                    job_id, status="failed", current_step="error", progress=status.progress, error=str(exc)
+                )
+                self._publish(status, {"stage": "error", "message": f"Error: {exc}"})
             finally:
+                self._cancel_events.pop(job_id, None)
+                self._retire(job_id)
                 self._queue.task_done()
 
+    @staticmethod
+    def _run_in_thread(job_id: str, params: dict, tracker: ProgressTracker) -> Path:
+        result = run_pipeline(job_id=job_id, **params, progress=tracker)
+        tracker.update("save", 0.0, "Saving result")
+        result_path = SETTINGS.data_dir / "jobs" / job_id / "result.json"
+        save_result(result, result_path)
+        return result_path
+
+    def _retire(self, job_id: str) -> None:
+        # Los jobs terminados siguen en memoria un tiempo para sus suscriptores SSE
+        self._finished.append(job_id)
+        while len(self._finished) > SETTINGS.job_status_cache:
+            self._jobs.pop(self._finished.popleft(), None)
+
 
 JOB_MANAGER = JobManager()
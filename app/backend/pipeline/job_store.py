@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from core.settings import SETTINGS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    current_step TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    params TEXT NOT NULL,
+    result_path TEXT,
+    error TEXT,
+    priority TEXT NOT NULL DEFAULT 'interactive',
+    duration REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_unfinished ON jobs (status, created_at)
+    WHERE status IN ('queued', 'running');
+"""
+
+
+class JobStore:
+    """Durable job table in SQLite under ``data_dir``.
+
+    Rows are looked up by primary key, so status queries stay fast with any
+    number of historical jobs; a partial index covers the unfinished jobs
+    that are re-queued on startup. When the database is first created, jobs
+    that already have a ``result.json`` on disk are imported as completed.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else SETTINGS.data_dir / "jobs.db"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            created = not self.path.exists()
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            _add_missing_columns(connection)
+            self._connection = connection
+            if created:
+                self._import_results()
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def add(self, job_id: str, params: dict, priority: str = "interactive", duration: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (job_id, status, current_step, params, priority, duration, created_at, updated_at)"
+                " VALUES (?, 'queued', 'queued', ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(params), priority, duration, now, now),
+            )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result_path" in fields and fields["result_path"] is not None:
+            fields["result_path"] = str(fields["result_path"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._connect().execute(
+                f"UPDATE jobs SET {columns}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _row(row) if row is not None else None
+
+    def unfinished(self) -> List[dict]:
+        """Queued and running jobs in submission order."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    def _import_results(self) -> None:
+        jobs_dir = self.path.parent / "jobs"
+        if not jobs_dir.exists():
+            return
+        rows = []
+        for result_path in jobs_dir.glob("*/result.json"):
+            try:
+                metadata = json.loads(result_path.read_text())["metadata"]
+            except (OSError, ValueError, KeyError):
+                continue
+            params = {
+                name: metadata.get(name)
+                for name in ("video_path", "language", "num_speakers", "pack_name", "verify")
+            }
+            mtime = result_path.stat().st_mtime
+            rows.append(
+                (result_path.parent.name, json.dumps(params), str(result_path), mtime, mtime)
+            )
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO jobs (job_id, status, current_step, progress, params, result_path,"
+            " created_at, updated_at) VALUES (?, 'completed', 'done', 1.0, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _add_missing_columns(connection: sqlite3.Connection) -> None:
+    # Bases creadas antes de existir la planificación por prioridad
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(jobs)")}
+    if "priority" not in columns:
+        connection.execute("ALTER TABLE jobs ADD COLUMN priority TEXT NOT NULL DEFAULT 'interactive'")
+    if "duration" not in columns:
+        connection.execute("ALTER TABLE jobs ADD COLUMN duration REAL")
+
+
+def _row(row: sqlite3.Row) -> dict:
+    data = dict(row)
+    data["params"] = json.loads(data["params"])
+    data["result_path"] = Path(data["result_path"]) if data["result_path"] else None
+    return data
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.settings import SETTINGS
+
+
+@dataclass(frozen=True)
+class ModelKey:
+    backend: str
+    name: str
+    device: str = "cpu"
+    compute_type: str = "default"
+
+
+@dataclass
+class _Entry:
+    model: Any
+    size_bytes: int
+    last_used: float
+    in_use: int = 0
+
+
+Loader = Callable[[ModelKey], Any]
+
+# Tamaños aproximados en memoria, usados para el presupuesto de la caché.
+MODEL_SIZE_HINTS: Dict[tuple[str, str], int] = {
+    ("faster-whisper", "tiny"): 80 * 1024**2,
+    ("faster-whisper", "base"): 150 * 1024**2,
+    ("faster-whisper", "small"): 500 * 1024**2,
+    ("faster-whisper", "medium"): 1500 * 1024**2,
+    ("faster-whisper", "large-v3"): 3100 * 1024**2,
+    ("whisper", "small"): 1000 * 1024**2,
+    ("pyannote", "pyannote/speaker-diarization-3.1"): 300 * 1024**2,
+}
+DEFAULT_SIZE_HINT = 500 * 1024**2
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models shared by every job.
+
+    Each model is loaded once per key, reused across jobs, evicted in LRU
+    order when the memory budget is exceeded and unloaded after sitting idle.
+    Models currently acquired by a job are never evicted.
+    """
+
+    def __init__(self, max_bytes: int, idle_timeout: float) -> None:
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._loaders: Dict[str, Loader] = {}
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.RLock()
+
+    def register_loader(self, backend: str, loader: Loader) -> None:
+        with self._lock:
+            self._loaders[backend] = loader
+
+    @contextmanager
+    def acquire(self, key: ModelKey) -> Iterator[Any]:
+        model = self._get(key, pin=True)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.in_use -= 1
+                    entry.last_used = time.monotonic()
+            self._enforce_budget()
+
+    def get(self, key: ModelKey) -> Any:
+        return self._get(key, pin=False)
+
+    def preload(self, keys: Iterable[ModelKey]) -> List[ModelKey]:
+        loaded: List[ModelKey] = []
+        for key in keys:
+            try:
+                self.get(key)
+            except Exception as exc:  # noqa: BLE001 - preload is best effort
+                print(f"Warning: could not preload {key}: {exc}")
+                continue
+            loaded.append(key)
+        return loaded
+
+    def evict_idle(self, now: Optional[float] = None) -> List[ModelKey]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [
+                key
+                for key, entry in self._entries.items()
+                if entry.in_use == 0 and now - entry.last_used >= self.idle_timeout
+            ]
+            for key in expired:
+                del self._entries[key]
+        if expired:
+            gc.collect()
+        return expired
+
+    def unload(self, key: ModelKey) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.in_use:
+                return False
+            del self._entries[key]
+        gc.collect()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if not entry.in_use]:
+                del self._entries[key]
+        gc.collect()
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "backend": key.backend,
+                    "name": key.name,
+                    "device": key.device,
+                    "compute_type": key.compute_type,
+                    "size_bytes": entry.size_bytes,
+                    "in_use": entry.in_use,
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def _get(self, key: ModelKey, pin: bool) -> Any:
+        with self._lock:
+            entry = self._hit(key, pin)
+            if entry is not None:
+                return entry.model
+            loader = self._loaders.get(key.backend)
+            if loader is None:
+                raise KeyError(f"No loader registered for backend '{key.backend}'")
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Cargar fuera del lock global: otros modelos siguen disponibles mientras tanto.
+        with key_lock:
+            with self._lock:
+                entry = self._hit(key, pin)
+                if entry is not None:
+                    return entry.model
+            model = loader(key)
+            size = MODEL_SIZE_HINTS.get((key.backend, key.name), DEFAULT_SIZE_HINT)
+            with self._lock:
+                entry = _Entry(model=model, size_bytes=size, last_used=time.monotonic())
+                if pin:
+                    entry.in_use = 1
+                self._entries[key] = entry
+        self._enforce_budget()
+        return model
+
+    def _hit(self, key: ModelKey, pin: bool) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        entry.last_used = time.monotonic()
+        if pin:
+            entry.in_use += 1
+        return entry
+
+    def _enforce_budget(self) -> None:
+        evicted = False
+        with self._lock:
+            total = sum(entry.size_bytes for entry in self._entries.values())
+            for key in list(self._entries):
+                if total <= self.max_bytes:
+                    break
+                entry = self._entries[key]
+                if entry.in_use:
+                    continue
+                total -= entry.size_bytes
+                del self._entries[key]
+                evicted = True
+        if evicted:
+            gc.collect()
+
+
+MODEL_REGISTRY = ModelRegistry(
+    max_bytes=SETTINGS.model_cache_max_bytes,
+    idle_timeout=SETTINGS.model_idle_timeout,
+)
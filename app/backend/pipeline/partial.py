@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from core.columnar import SegmentRow, SegmentTable
+from core.models import Segment
+
+
+class PartialTranscript:
+    """Append-only JSONL of transcript segments, written while ASR runs.
+
+    Segments land in decoding order; parallel chunks interleave, so readers
+    sort what they get. Reads take a byte cursor and only parse lines added
+    since, which keeps polling a long job cheap.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(b"")
+            self.count = 0
+
+    def append(self, segment: Union[Segment, SegmentRow]) -> None:
+        # Mismo JSON que model_dump_json, sin construir un Segment por fila
+        record = {"start": segment.start, "end": segment.end, "speaker": segment.speaker, "text": segment.text}
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            # Una sola escritura por línea: un lector concurrente nunca ve media línea como completa
+            with self.path.open("ab") as handle:
+                handle.write(line)
+            self.count += 1
+
+    def read(self, after: int = 0) -> Tuple[List[Segment], int]:
+        """Segments appended from byte offset ``after`` and the cursor for the next read."""
+        try:
+            with self.path.open("rb") as handle:
+                handle.seek(after)
+                data = handle.read()
+        except FileNotFoundError:
+            return [], 0
+        # La última línea puede estar a medio escribir: se deja para la próxima lectura
+        complete = data[: data.rfind(b"\n") + 1]
+        segments = [Segment.model_validate_json(line) for line in complete.splitlines() if line]
+        return segments, after + len(complete)
+
+
+def read_diarization(path: Path) -> Optional[List[Segment]]:
+    try:
+        return SegmentTable.from_records(json.loads(path.read_text())).to_segments()
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
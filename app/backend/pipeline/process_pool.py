@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from dataclasses import fields
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from core.engine import preload_models, run_pipeline, save_result
+from core.settings import SETTINGS
+from pipeline.model_registry import MODEL_REGISTRY
+from pipeline.progress import JobCancelled, ProgressTracker
+
+# Cada cuánto comprueba un worker ocioso los modelos inactivos y el pool la cancelación
+POLL_INTERVAL = 0.2
+IDLE_EVICT_INTERVAL = 60.0
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process running a job died before replying."""
+
+
+def _rss_bytes() -> int:
+    """Resident memory of the current process, or 0 where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Pico, no actual: suficiente para decidir un reciclado
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _worker_main(connection: Connection, cancelled: Any, settings: Dict[str, Any]) -> None:
+    """Entry point of a pipeline worker process: warm up, then run jobs until told to stop."""
+    for name, value in settings.items():
+        setattr(SETTINGS, name, value)
+    send_lock = threading.Lock()
+
+    def send(message: tuple) -> None:
+        # Diarización y ASR informan desde hilos distintos
+        with send_lock:
+            connection.send(message)
+
+    if SETTINGS.preload_models:
+        preload_models()
+    send(("ready", os.getpid()))
+    last_evict = time.monotonic()
+    while True:
+        if not connection.poll(IDLE_EVICT_INTERVAL):
+            MODEL_REGISTRY.evict_idle()
+            last_evict = time.monotonic()
+            continue
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        kind = message[0]
+        if kind == "stop":
+            return
+        if kind == "ping":
+            send(("pong", _rss_bytes()))
+            continue
+        _, job_id, params = message
+        cancelled.clear()
+        tracker = ProgressTracker(lambda event: send(("event", event)), cancelled=cancelled)
+        try:
+            result = run_pipeline(job_id=job_id, **params, progress=tracker)
+            tracker.update("save", 0.0, "Saving result")
+            result_path = SETTINGS.data_dir / "jobs" / job_id / "result.json"
+            save_result(result, result_path)
+            reply = ("done", str(result_path))
+        except JobCancelled as exc:
+            reply = ("cancelled", str(exc))
+        except Exception as exc:  # noqa: BLE001 - job failure, the worker survives it
+            reply = ("error", str(exc))
+        send((*reply, _rss_bytes()))
+        if time.monotonic() - last_evict > IDLE_EVICT_INTERVAL:
+            MODEL_REGISTRY.evict_idle()
+            last_evict = time.monotonic()
+
+
+class _Worker:
+    def __init__(self, context: Any, settings: Dict[str, Any]) -> None:
+        self.connection, child = context.Pipe()
+        self.cancelled = context.Event()
+        self.process = context.Process(
+            target=_worker_main, args=(child, self.cancelled, settings), name="pipeline-worker", daemon=True
+        )
+        self.process.start()
+        # Sin la copia del padre, la muerte del hijo se ve como EOF en la tubería
+        child.close()
+        self.jobs = 0
+        self.ready = False
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def _recv(self, timeout: Optional[float]) -> Optional[tuple]:
+        if not self.connection.poll(timeout):
+            return None
+        try:
+            message = self.connection.recv()
+        except (EOFError, OSError):
+            raise WorkerCrashed(f"Pipeline worker crashed (exit code {self.process.exitcode})") from None
+        if message[0] == "ready":
+            self.ready = True
+            return self._recv(0)
+        return message
+
+    def ping(self, timeout: float) -> bool:
+        if not self.ready:
+            # Aún cargando modelos: basta con que siga vivo
+            try:
+                self._recv(0)
+            except WorkerCrashed:
+                return False
+            return self.alive
+        try:
+            self.connection.send(("ping",))
+            deadline = time.monotonic() + timeout
+            while True:
+                message = self._recv(max(0.0, deadline - time.monotonic()))
+                if message is None:
+                    return False
+                if message[0] == "pong":
+                    return True
+        except (WorkerCrashed, OSError):
+            return False
+
+    def run(
+        self, job_id: str, params: dict, emit: Callable[[dict], None], cancelled: Optional[threading.Event]
+    ) -> tuple:
+        try:
+            self.connection.send(("run", job_id, params))
+        except OSError:
+            raise WorkerCrashed(f"Pipeline worker crashed (exit code {self.process.exitcode})") from None
+        cancel_deadline = None
+        while True:
+            if cancelled is not None and cancelled.is_set() and cancel_deadline is None:
+                self.cancelled.set()
+                cancel_deadline = time.monotonic() + SETTINGS.pipeline_cancel_grace
+            elif cancel_deadline is not None and time.monotonic() > cancel_deadline:
+                # Atascado en código nativo sin pasar por un punto de cancelación
+                self.stop(timeout=0)
+                raise JobCancelled("worker terminated after the cancellation grace period")
+            message = self._recv(POLL_INTERVAL)
+            if message is None:
+                continue
+            if message[0] == "event":
+                emit(message[1])
+                continue
+            self.jobs += 1
+            return message
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.connection.send(("stop",))
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5.0)
+        self.connection.close()
+
+
+class PipelineProcessPool:
+    """Long-lived worker processes that run pipelines outside the API process.
+
+    Each worker keeps its own model registry warm across jobs, so a job pays
+    no model load once its worker is up. A native crash in torch or
+    ctranslate2 only takes down the worker; the job fails and a fresh worker
+    replaces it. Workers are recycled after ``max_jobs`` jobs or once their
+    resident memory passes ``max_rss_bytes``. The worker writes
+    ``result.json`` itself and hands back only its path, so a large
+    transcript is never pickled through the pipe.
+
+    ``run`` blocks until the job ends and is meant to be called from a
+    thread, like ``run_pipeline`` in thread mode.
+    """
+
+    def __init__(self, size: int, max_jobs: int = 0, max_rss_bytes: int = 0) -> None:
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_bytes
+        # spawn: fork con hilos y CUDA/torch ya inicializados no es seguro
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self) -> None:
+        with self._lock:
+            while len(self._workers) < self.size:
+                self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        # El hijo arranca con Settings por defecto: se le pasan los valores vigentes
+        settings = {item.name: getattr(SETTINGS, item.name) for item in fields(SETTINGS)}
+        worker = _Worker(self._context, settings)
+        self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.stop(timeout=1.0)
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if not self._closed:
+                self._idle.put(self._spawn())
+
+    def _acquire(self) -> _Worker:
+        while True:
+            if self._closed:
+                raise RuntimeError("Pipeline process pool is closed")
+            try:
+                worker = self._idle.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if worker.alive:
+                return worker
+            self._replace(worker)
+
+    def run(
+        self,
+        job_id: str,
+        params: dict,
+        emit: Callable[[dict], None],
+        cancelled: Optional[threading.Event] = None,
+    ) -> Path:
+        """Run one job in a worker and return the path of its ``result.json``."""
+        worker = self._acquire()
+        try:
+            kind, payload, rss = worker.run(job_id, params, emit, cancelled)
+        except (WorkerCrashed, JobCancelled):
+            self._replace(worker)
+            raise
+        if (self.max_jobs and worker.jobs >= self.max_jobs) or (self.max_rss_bytes and rss > self.max_rss_bytes):
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        if kind == "cancelled":
+            raise JobCancelled(payload)
+        if kind == "error":
+            raise RuntimeError(payload)
+        return Path(payload)
+
+    def check(self, timeout: Optional[float] = None) -> int:
+        """Ping the idle workers and replace the unresponsive ones; returns how many were replaced."""
+        timeout = SETTINGS.pipeline_health_timeout if timeout is None else timeout
+        idle: List[_Worker] = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        replaced = 0
+        for worker in idle:
+            if worker.ping(timeout):
+                self._idle.put(worker)
+            else:
+                replaced += 1
+                self._replace(worker)
+        return replaced
+
+    def pids(self) -> List[int]:
+        with self._lock:
+            return [worker.process.pid for worker in self._workers]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Peso de cada etapa en el progreso global; ASR domina el tiempo de un job
+STAGE_WEIGHTS: Dict[str, float] = {
+    "extract": 0.10,
+    "diarize": 0.20,
+    "asr": 0.50,
+    "merge": 0.05,
+    "claims": 0.05,
+    "verify": 0.05,
+    "save": 0.05,
+}
+
+
+class JobCancelled(Exception):
+    """Raised from a progress report once the job has been cancelled."""
+
+
+class ProgressTracker:
+    """Turn per-stage fractions into overall job progress events.
+
+    Stages report ``update(stage, fraction)`` from whichever thread runs
+    them; diarization and ASR report concurrently. Events go to ``emit`` as
+    dicts, throttled to one per ``min_interval`` seconds per stage unless the
+    stage starts, finishes or carries a message. Without ``emit`` the
+    tracker is a no-op, so stages can report unconditionally.
+
+    Every report is also a cancellation point: once ``cancelled`` is set,
+    or :meth:`abort` has been called, ``update`` raises :class:`JobCancelled`
+    in the reporting stage.
+    """
+
+    def __init__(
+        self,
+        emit: Optional[Callable[[dict], None]] = None,
+        min_interval: float = 0.5,
+        cancelled: Optional[threading.Event] = None,
+    ) -> None:
+        self._emit = emit
+        self._cancelled = cancelled
+        self._aborted = threading.Event()
+        self._min_interval = min_interval
+        self._fractions: Dict[str, float] = {}
+        self._last_emit: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def overall(self) -> float:
+        with self._lock:
+            return self._overall()
+
+    def _overall(self) -> float:
+        return sum(STAGE_WEIGHTS.get(stage, 0.0) * fraction for stage, fraction in self._fractions.items())
+
+    def update(self, stage: str, fraction: float, message: Optional[str] = None, **data) -> None:
+        if self._aborted.is_set():
+            raise JobCancelled(f"aborted during {stage}")
+        if self._cancelled is not None and self._cancelled.is_set():
+            raise JobCancelled(f"cancelled during {stage}")
+        fraction = min(1.0, max(0.0, fraction))
+        now = time.monotonic()
+        with self._lock:
+            # El progreso nunca retrocede aunque una etapa informe fuera de orden
+            fraction = max(fraction, self._fractions.get(stage, 0.0))
+            self._fractions[stage] = fraction
+            boundary = fraction in (0.0, 1.0) or message is not None
+            if not boundary and now - self._last_emit.get(stage, 0.0) < self._min_interval:
+                return
+            self._last_emit[stage] = now
+            event = {"stage": stage, "stage_progress": round(fraction, 4), "progress": round(self._overall(), 4)}
+        if message is not None:
+            event["message"] = message
+        event.update(data)
+        if self._emit is not None:
+            self._emit(event)
+
+    def abort(self) -> None:
+        """Stop every stage of this run at its next report, e.g. after a sibling stage failed."""
+        self._aborted.set()
+
+    def reporter(self, stage: str) -> Callable[[float], None]:
+        """A ``fraction -> None`` callback for step functions that know nothing of jobs."""
+        return lambda fraction: self.update(stage, fraction)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from core.settings import SETTINGS
+
+
+class ResourcePools:
+    """Per-stage concurrency limits shared by every pipeline worker.
+
+    Extraction is cheap I/O and can run wide, while ASR and diarization
+    are CPU heavy and get their own, much smaller, limits.
+    """
+
+    def __init__(self, limits: Dict[str, int]) -> None:
+        self._limits = {name: max(1, limit) for name, limit in limits.items()}
+        self._semaphores = {
+            name: threading.BoundedSemaphore(limit) for name, limit in self._limits.items()
+        }
+        self._active = {name: 0 for name in self._limits}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+        with semaphore:
+            with self._lock:
+                self._active[name] += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._active[name] -= 1
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {"limit": self._limits[name], "active": self._active[name]}
+                for name in self._limits
+            }
+
+
+RESOURCE_POOLS = ResourcePools(
+    {
+        "extract": SETTINGS.extract_concurrency,
+        "asr": SETTINGS.asr_concurrency,
+        "diarize": SETTINGS.diarize_concurrency,
+    }
+)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Hashable, Optional, Tuple
+
+from core.models import JobResult
+from core.settings import SETTINGS
+from pipeline.edit_log import EditLog
+from pipeline.steps.edits import EditedTranscript
+
+Version = Tuple[Hashable, ...]
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    result: JobResult
+    body: bytes
+    etag: str
+
+
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def etag_for(job_id: str, version: Version) -> str:
+    digest = hashlib.sha1(repr((job_id, version)).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+class ResultCache:
+    """LRU of parsed job results and their serialized JSON.
+
+    Entries are keyed by the job, the ``result.json`` version and the edit
+    log version (file mtime and size), so rewriting either file invalidates
+    them without explicit bookkeeping. The unedited result is cached on its
+    own and shared by every edited variant, and each result keeps an
+    :class:`EditedTranscript`, so edits appended to the log are applied on
+    top of the previous edited transcript. Cached results are shared
+    between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, CachedResult]" = OrderedDict()
+        self._editors: "OrderedDict[tuple, EditedTranscript]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def version(result_path: Path, edits: Optional[EditLog] = None) -> Optional[Version]:
+        """Cheap version of a result (two ``stat`` calls), or ``None`` if it is missing."""
+        result_version = _file_version(result_path)
+        if result_version is None:
+            return None
+        edits_version = edits.version() if edits is not None else None
+        return result_version, edits_version
+
+    def get(self, job_id: str, result_path: Path, edits: Optional[EditLog] = None) -> Optional[CachedResult]:
+        version = self.version(result_path, edits)
+        if version is None:
+            return None
+        result_version, edits_version = version
+
+        def edited() -> JobResult:
+            base = self._get_or_load((job_id, result_version, None), lambda: self._load(result_path))
+            editor = self._editor((job_id, result_version), base.result)
+            return base.result.model_copy(update={"transcript": editor.update(edits.read())})
+
+        try:
+            if edits_version is None:
+                return self._get_or_load((job_id, result_version, None), lambda: self._load(result_path))
+            return self._get_or_load((job_id, result_version, edits_version), edited)
+        except FileNotFoundError:
+            # Borrado entre el stat y la lectura
+            return None
+
+    def _editor(self, key: tuple, result: JobResult) -> EditedTranscript:
+        # Estado incremental por resultado: una edición añadida al log solo aplica esa edición
+        with self._lock:
+            editor = self._editors.get(key)
+            if editor is None:
+                editor = self._editors[key] = EditedTranscript(result.transcript)
+            self._editors.move_to_end(key)
+            while len(self._editors) > self.max_entries:
+                self._editors.popitem(last=False)
+            return editor
+
+    def invalidate(self, job_id: str) -> None:
+        with self._lock:
+            for entries in (self._entries, self._editors):
+                for key in [key for key in entries if key[0] == job_id]:
+                    del entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._editors.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _get_or_load(self, key: tuple, load: Callable[[], JobResult]) -> CachedResult:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        # Parseo fuera del lock: dos peticiones simultáneas pueden cargarlo dos veces
+        result = load()
+        body = result.model_dump_json().encode("utf-8")
+        entry = CachedResult(result=result, body=body, etag=etag_for(key[0], key[1:]))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def _load(result_path: Path) -> JobResult:
+        return JobResult.model_validate_json(result_path.read_bytes())
+
+
+RESULT_CACHE = ResultCache(SETTINGS.result_cache_entries)
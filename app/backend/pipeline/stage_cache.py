@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, List, Optional
+
+from core.settings import SETTINGS
+
+META_FILE = "meta.json"
+DATA_FILE = "data.json"
+
+
+class StageCache:
+    """Content-addressed cache of pipeline stage artifacts.
+
+    Entries live under ``{root}/{stage}/{key}`` where the key hashes the input
+    file digest together with the stage parameters, so re-running a job on
+    the same video reuses every stage whose parameters did not change.
+    """
+
+    def __init__(self, max_bytes: int, root: Optional[Path] = None) -> None:
+        self.max_bytes = max_bytes
+        self._root = root
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else SETTINGS.data_dir / "cache"
+
+    @staticmethod
+    def key(stage: str, input_hash: str, **params: Any) -> str:
+        payload = json.dumps(
+            {"stage": stage, "input": input_hash, "params": params}, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_json(self, stage: str, key: str) -> Optional[Any]:
+        entry = self._entry_dir(stage, key)
+        path = entry / DATA_FILE
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._touch(entry)
+        return data
+
+    def put_json(self, stage: str, key: str, data: Any, **meta: Any) -> None:
+        def write(tmp_dir: Path) -> None:
+            (tmp_dir / DATA_FILE).write_text(json.dumps(data), encoding="utf-8")
+
+        self._store(stage, key, write, meta)
+
+    def get_file(self, stage: str, key: str, name: str, target: Path) -> bool:
+        entry = self._entry_dir(stage, key)
+        source = entry / name
+        if not source.exists():
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target.unlink()
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        self._touch(entry)
+        return True
+
+    def put_file(self, stage: str, key: str, source: Path, **meta: Any) -> None:
+        def write(tmp_dir: Path) -> None:
+            shutil.copy2(source, tmp_dir / source.name)
+
+        self._store(stage, key, write, meta)
+
+    def entries(self) -> List[dict]:
+        if not self.root.exists():
+            return []
+        items: List[dict] = []
+        for stage_dir in sorted(self.root.iterdir()):
+            if not stage_dir.is_dir():
+                continue
+            for entry in stage_dir.iterdir():
+                meta_path = entry / META_FILE
+                if not meta_path.exists():
+                    continue
+                try:
+                    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                meta["key"] = entry.name
+                meta["stage"] = stage_dir.name
+                meta["size_bytes"] = _dir_size(entry)
+                meta["last_used"] = meta_path.stat().st_mtime
+                items.append(meta)
+        return items
+
+    def total_size(self) -> int:
+        return sum(entry["size_bytes"] for entry in self.entries())
+
+    def purge(self, stage: Optional[str] = None, key: Optional[str] = None) -> int:
+        removed = 0
+        with self._lock:
+            for entry in self.entries():
+                if stage is not None and entry["stage"] != stage:
+                    continue
+                if key is not None and entry["key"] != key:
+                    continue
+                shutil.rmtree(self._entry_dir(entry["stage"], entry["key"]), ignore_errors=True)
+                removed += 1
+        return removed
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda entry: entry["last_used"])
+            total = sum(entry["size_bytes"] for entry in entries)
+            for entry in entries:
+                if total <= budget:
+                    break
+                shutil.rmtree(self._entry_dir(entry["stage"], entry["key"]), ignore_errors=True)
+                total -= entry["size_bytes"]
+                removed += 1
+        return removed
+
+    def _store(self, stage: str, key: str, write, meta: dict) -> None:
+        entry = self._entry_dir(stage, key)
+        if (entry / META_FILE).exists():
+            return
+        tmp_dir = self.root / stage / f".tmp-{uuid.uuid4().hex}"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            write(tmp_dir)
+            (tmp_dir / META_FILE).write_text(
+                json.dumps({"created": time.time(), **meta}, default=str), encoding="utf-8"
+            )
+            # Otro worker pudo escribir la misma entrada: se conserva la primera
+            try:
+                tmp_dir.rename(entry)
+            except OSError:
+                pass
+        finally:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict()
+
+    def _entry_dir(self, stage: str, key: str) -> Path:
+        return self.root / stage / key
+
+    @staticmethod
+    def _touch(entry: Path) -> None:
+        try:
+            os.utime(entry / META_FILE)
+        except OSError:
+            pass
+
+
+def _dir_size(path: Path) -> int:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file())
+
+
+STAGE_CACHE = StageCache(SETTINGS.stage_cache_max_bytes)
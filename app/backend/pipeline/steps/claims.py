@@ -2,26 +2,35 @@ from __future__ import annotations
 
 import re
 import uuid
-from typing import List
+from typing import List, Union
 
+from pydantic import TypeAdapter
+
+from core.columnar import SegmentTable
 from core.models import Claim, Transcript
 
 CLAIM_PATTERN = re.compile(r"\b(\d+|porcentaje|millones|miles|es|son|fue|eran|será)\b", re.IGNORECASE)
 
+_CLAIMS = TypeAdapter(List[Claim])
+
 
-def extract_claims(transcript: Transcript) -> List[Claim]:
-    claims: List[Claim] = []
-    for segment in transcript.segments:
-        if CLAIM_PATTERN.search(segment.text):
-            claims.append(
-                Claim(
-                    id=str(uuid.uuid4()),
-                    speaker=segment.speaker,
-                    start=segment.start,
-                    end=segment.end,
-                    text=segment.text,
-                    type="statement",
-                    confidence=0.55,
-                )
-            )
-    return claims
+def extract_claims(transcript: Union[Transcript, SegmentTable]) -> List[Claim]:
+    if isinstance(transcript, SegmentTable):
+        rows = transcript.columns()
+    else:
+        rows = ((segment.start, segment.end, segment.speaker, segment.text) for segment in transcript.segments)
+    records = [
+        {
+            "id": str(uuid.uuid4()),
+            "speaker": speaker,
+            "start": start,
+            "end": end,
+            "text": text,
+            "type": "statement",
+            "confidence": 0.55,
+        }
+        for start, end, speaker, text in rows
+        if CLAIM_PATTERN.search(text)
+    ]
+    # Los claims se validan de una vez al final, no uno a uno
+    return _CLAIMS.validate_python(records)
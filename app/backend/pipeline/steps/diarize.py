@@ -5,38 +5,30 @@ import importlib.util
 from dotenv import load_dotenv
 
 load_dotenv()
-from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Optional
 
-from core.models import Segment
-from utils.ffmpeg import get_audio_duration
+import numpy as np
 
+from core.columnar import SegmentRow, SegmentTable
+from pipeline.model_registry import MODEL_REGISTRY, ModelKey
+from pipeline.steps.extract_audio import SAMPLE_RATE, samples_duration
 
-def _load_audio_as_tensor(audio_path: Path):
-    """Carga audio usando soundfile y lo convierte a tensor para pyannote."""
+
+def _samples_as_tensor(samples: np.ndarray):
+    """Envuelve las muestras decodificadas en el formato de entrada de pyannote."""
     import torch
-    import soundfile as sf
-    
-    # Leer audio con soundfile (evita torchcodec)
-    waveform, sample_rate = sf.read(str(audio_path), dtype='float32')
-    
-    # Convertir a tensor de PyTorch
-    # soundfile devuelve (samples,) para mono o (samples, channels) para stereo
-    if waveform.ndim == 1:
-        waveform = waveform.reshape(1, -1)  # (1, samples) para mono
-    else:
-        waveform = waveform.T  # (channels, samples)
-    
-    waveform_tensor = torch.from_numpy(waveform)
-    
-    return {"waveform": waveform_tensor, "sample_rate": sample_rate}
 
+    waveform = np.asarray(samples, dtype=np.float32)
+    if not waveform.flags.writeable:
+        # torch no admite arrays de solo lectura (memmap): pyannote los necesita en RAM
+        waveform = np.array(waveform)
+    return {"waveform": torch.from_numpy(waveform.reshape(1, -1)), "sample_rate": SAMPLE_RATE}
 
-def diarize_audio(audio_path: Path, num_speakers: Optional[int]) -> List[Segment]:
-    duration = get_audio_duration(audio_path)
-    if importlib.util.find_spec("pyannote.audio") is None:
-        return [Segment(start=0.0, end=duration, speaker="SPEAKER_00", text="")]
 
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+
+
+def _load_pyannote(key: ModelKey):
     from pyannote.audio import Pipeline  # type: ignore
 
     # Try loading with explicit token (pyannote.audio 4.x uses 'token', older uses 'use_auth_token')
@@ -45,18 +37,18 @@ def diarize_audio(audio_path: Path, num_speakers: Optional[int]) -> List[Segment
 
     try:
         # First try modern signature
-        pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", token=token)
+        pipeline = Pipeline.from_pretrained(key.name, token=token)
     except TypeError:
         # Fallback for older versions
         try:
-            pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1", use_auth_token=token)
+            pipeline = Pipeline.from_pretrained(key.name, use_auth_token=token)
         except Exception as e:
             auth_error = str(e)
-            print(f"Error loading pyannote/speaker-diarization-3.1 (legacy auth): {e}")
+            print(f"Error loading {key.name} (legacy auth): {e}")
             pipeline = None
     except Exception as e:
         auth_error = str(e)
-        print(f"Error loading pyannote/speaker-diarization-3.1: {e}")
+        print(f"Error loading {key.name}: {e}")
         pipeline = None
 
     if pipeline is None:
@@ -76,19 +68,59 @@ def diarize_audio(audio_path: Path, num_speakers: Optional[int]) -> List[Segment
             "Check that your HF_TOKEN in .env is correct."
         )
         raise RuntimeError(error_msg)
-    
-    # Cargar audio usando soundfile (evita problemas con torchcodec)
-    audio_input = _load_audio_as_tensor(audio_path)
+    return pipeline
+
+
+MODEL_REGISTRY.register_loader("pyannote", _load_pyannote)
+
+
+def diarization_model_key() -> Optional[ModelKey]:
+    if importlib.util.find_spec("pyannote.audio") is None:
+        return None
+    return ModelKey("pyannote", DIARIZATION_MODEL, device="cpu")
+
+
+# Tramo del progreso de diarización que ocupa cada paso del pipeline de pyannote
+DIARIZATION_STEPS = {
+    "segmentation": (0.0, 0.3),
+    "speaker_counting": (0.3, 0.35),
+    "embeddings": (0.35, 0.95),
+    "discrete_diarization": (0.95, 1.0),
+}
+
+
+def _progress_hook(on_progress: Callable[[float], None]):
+    def hook(step_name, step_artefact, file=None, total=None, completed=None):
+        low, high = DIARIZATION_STEPS.get(step_name, (0.0, 0.0))
+        done = completed / total if total and completed is not None else 1.0
+        if high:
+            on_progress(low + (high - low) * done)
+
+    return hook
+
+
+def diarize_audio(
+    samples: np.ndarray,
+    num_speakers: Optional[int],
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> SegmentTable:
+    key = diarization_model_key()
+    if key is None:
+        return SegmentTable.from_rows([SegmentRow(0.0, samples_duration(samples), "SPEAKER_00", "")])
+
+    # Las muestras ya decodificadas se pasan en memoria (evita torchcodec y releer el audio)
+    audio_input = _samples_as_tensor(samples)
     
     # Ejecutar diarización con número de speakers opcional
+    options = {}
     if num_speakers is not None and num_speakers > 0:
-        diarization = pipeline(audio_input, num_speakers=num_speakers)
-    else:
-        diarization = pipeline(audio_input)
+        options["num_speakers"] = num_speakers
+    if on_progress is not None:
+        options["hook"] = _progress_hook(on_progress)
+    with MODEL_REGISTRY.acquire(key) as pipeline:
+        diarization = pipeline(audio_input, **options)
     
-    segments: List[Segment] = []
-    for turn, _, speaker in diarization.itertracks(yield_label=True):
-        segments.append(
-            Segment(start=float(turn.start), end=float(turn.end), speaker=speaker, text="")
-        )
-    return segments
+    return SegmentTable.from_rows(
+        (float(turn.start), float(turn.end), speaker, "")
+        for turn, _, speaker in diarization.itertracks(yield_label=True)
+    )
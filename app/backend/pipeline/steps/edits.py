@@ -1,12 +1,25 @@
 from __future__ import annotations
 
-from typing import List
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
 
 from core.models import Segment, Transcript
 
+# Campos temporales que cada acción necesita para usar el índice
+_TIME_FIELDS = {"assign": ("start", "end"), "merge": ("start", "end"), "split": ("time",)}
+
 
 def apply_edits(transcript: Transcript, edits: List[dict]) -> Transcript:
-    segments = [segment.model_copy() for segment in transcript.segments]
+    return EditedTranscript(transcript).update(edits)
+
+
+def replay_edits(transcript: Transcript, edits: List[dict]) -> Transcript:
+    """Reference implementation: apply every edit with a linear scan of the transcript."""
+    return Transcript(segments=_replay([segment.model_copy() for segment in transcript.segments], edits))
+
+
+def _replay(segments: List[Segment], edits: List[dict]) -> List[Segment]:
     for edit in edits:
         action = edit.get("action")
         if action == "rename":
@@ -63,7 +76,7 @@ def apply_edits(transcript: Transcript, edits: List[dict]) -> Transcript:
             if buffer:
                 merged.append(_merge_buffer(buffer))
             segments = merged
-    return Transcript(segments=segments)
+    return segments
 
 
 def _merge_buffer(buffer: List[Segment]) -> Segment:
@@ -77,3 +90,131 @@ def _merge_buffer(buffer: List[Segment]) -> Segment:
         speaker=speaker,
         text=text,
     )
+
+
+def _is_ordered(segments: List[Segment]) -> bool:
+    if len({id(segment) for segment in segments}) != len(segments):
+        return False
+    return all(segment.start <= segment.end for segment in segments) and all(
+        previous.end <= segment.start for previous, segment in zip(segments, segments[1:])
+    )
+
+
+class EditedTranscript:
+    """A transcript with an edit log applied incrementally.
+
+    ``update(edits)`` takes the whole log; when it extends the log applied
+    so far, only the new edits run. Any other log is replayed from the base
+    transcript. The result is identical to :func:`replay_edits` on the full
+    log.
+
+    When segments are sorted and do not overlap (the shape the pipeline
+    produces), every edit keeps them that way, so starts and ends are both
+    sorted. Then ``assign`` and ``merge`` find their segments with two
+    bisections, ``split`` with one, and ``rename`` through a speaker index.
+    Each edit touches only the segments it affects. Other transcripts fall
+    back to the linear replay.
+
+    Segments are never mutated: edits swap in new ones, so transcripts
+    returned earlier stay valid while the log grows.
+    """
+
+    def __init__(self, transcript: Transcript) -> None:
+        self._base = transcript
+        self._lock = threading.Lock()
+        self._reset(list(transcript.segments))
+        self.edits: List[dict] = []
+
+    def update(self, edits: List[dict]) -> Transcript:
+        with self._lock:
+            applied = len(self.edits)
+            if edits[:applied] != self.edits:
+                self._reset(list(self._base.segments))
+                self.edits = []
+                applied = 0
+            try:
+                for edit in edits[applied:]:
+                    self._apply(edit)
+                    self.edits.append(edit)
+            except Exception:
+                # Una edición a medias deja el índice inconsistente: se vuelve a la base
+                self._reset(list(self._base.segments))
+                self.edits = []
+                raise
+            return Transcript.model_construct(segments=list(self._segments))
+
+    def _reset(self, segments: List[Segment]) -> None:
+        self._segments = segments
+        self._indexed = _is_ordered(segments)
+        if not self._indexed:
+            return
+        self._starts = [segment.start for segment in segments]
+        self._ends = [segment.end for segment in segments]
+        self._speakers: Dict[Optional[str], Dict[int, Segment]] = {}
+        for segment in segments:
+            self._speakers.setdefault(segment.speaker, {})[id(segment)] = segment
+
+    def _apply(self, edit: dict) -> None:
+        action = edit.get("action")
+        fields = _TIME_FIELDS.get(action, ())
+        if not self._indexed or not all(isinstance(edit.get(name), (int, float)) for name in fields):
+            # Sin índice o con una edición mal formada: la réplica lineal decide (y falla igual)
+            copies = [segment.model_copy() for segment in self._segments]
+            self._reset(_replay(copies, [edit]))
+            return
+        if action == "rename":
+            self._rename(edit.get("old"), edit.get("new"))
+        elif action == "assign":
+            first, last = self._within(edit["start"], edit["end"])
+            speaker = edit.get("speaker")
+            for position in range(first, last):
+                segment = self._segments[position]
+                if segment.speaker != speaker:
+                    self._replace(position, position + 1, [segment.model_copy(update={"speaker": speaker})])
+        elif action == "split":
+            time = edit["time"]
+            # Sin solapes, solo el último segmento que empieza antes de ``time`` puede contenerlo
+            position = bisect_left(self._starts, time) - 1
+            if position >= 0 and self._ends[position] > time:
+                segment = self._segments[position]
+                self._replace(
+                    position,
+                    position + 1,
+                    [
+                        Segment(start=segment.start, end=time, speaker=segment.speaker, text=segment.text),
+                        Segment(
+                            start=time,
+                            end=segment.end,
+                            speaker=edit.get("speaker") or segment.speaker,
+                            text=segment.text,
+                        ),
+                    ],
+                )
+        elif action == "merge":
+            first, last = self._within(edit["start"], edit["end"])
+            if first < last:
+                self._replace(first, last, [_merge_buffer(self._segments[first:last])])
+
+    def _within(self, start: float, end: float) -> Tuple[int, int]:
+        # Inicios y finales ordenados: los segmentos dentro de [start, end] son contiguos
+        return bisect_left(self._starts, start), bisect_right(self._ends, end)
+
+    def _rename(self, old: Optional[str], new: Optional[str]) -> None:
+        if old == new:
+            return
+        for segment in list(self._speakers.get(old, {}).values()):
+            position = bisect_left(self._starts, segment.start)
+            while self._segments[position] is not segment:
+                position += 1
+            self._replace(position, position + 1, [segment.model_copy(update={"speaker": new})])
+
+    def _replace(self, first: int, last: int, segments: List[Segment]) -> None:
+        for segment in self._segments[first:last]:
+            del self._speakers[segment.speaker][id(segment)]
+            if not self._speakers[segment.speaker]:
+                del self._speakers[segment.speaker]
+        for segment in segments:
+            self._speakers.setdefault(segment.speaker, {})[id(segment)] = segment
+        self._segments[first:last] = segments
+        self._starts[first:last] = [segment.start for segment in segments]
+        self._ends[first:last] = [segment.end for segment in segments]
@@ -1,21 +1,95 @@
 from __future__ import annotations
 
+import subprocess
+import tempfile
 from pathlib import Path
+from typing import Optional
 
-from utils.ffmpeg import run_ffmpeg
+import numpy as np
 
+SAMPLE_RATE = 16000
+READ_SIZE = 1 << 20
 
-def extract_audio(video_path: Path, output_path: Path) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+def decode_audio(video_path: Path, spill_path: Optional[Path] = None, max_memory_bytes: int = 0) -> np.ndarray:
+    """Decode ``video_path`` to 16 kHz mono float32 samples through an ffmpeg pipe.
+
+    Samples accumulate in memory until they exceed ``max_memory_bytes``; past
+    that they are written to ``spill_path`` and returned as a read-only
+    memory map, so long inputs never have to fit in RAM.
+    """
     command = [
         "ffmpeg",
-        "-y",
+        "-nostdin",
+        "-v",
+        "error",
         "-i",
         str(video_path),
+        "-f",
+        "f32le",
         "-ac",
         "1",
         "-ar",
-        "16000",
-        str(output_path),
+        str(SAMPLE_RATE),
+        "-",
     ]
-    run_ffmpeg(command)
+    buffer = bytearray()
+    spill = None
+    written = 0
+    # stderr va a un fichero: una tubería llena bloquearía a ffmpeg
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+        try:
+            while True:
+                block = process.stdout.read(READ_SIZE)
+                if not block:
+                    break
+                if spill is None and spill_path is not None and len(buffer) + len(block) > max_memory_bytes:
+                    spill_path.parent.mkdir(parents=True, exist_ok=True)
+                    spill = spill_path.open("wb")
+                    spill.write(buffer)
+                    written = len(buffer)
+                    buffer = bytearray()
+                if spill is not None:
+                    spill.write(block)
+                    written += len(block)
+                else:
+                    buffer += block
+            returncode = process.wait()
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            if spill is not None:
+                spill.close()
+        if returncode != 0:
+            errors.seek(0)
+            message = errors.read().decode("utf-8", errors="ignore").strip()
+            raise RuntimeError(message or "ffmpeg failed")
+
+    if spill is not None:
+        return load_samples(spill_path, count=written // 4)
+    # Un float32 incompleto al final (no debería ocurrir) se descarta
+    del buffer[len(buffer) - len(buffer) % 4 :]
+    return np.frombuffer(buffer, dtype=np.float32)
+
+
+def save_samples(samples: np.ndarray, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.asarray(samples, dtype=np.float32).tofile(path)
+
+
+def load_samples(path: Path, count: Optional[int] = None, max_memory_bytes: Optional[int] = None) -> np.ndarray:
+    """Read raw float32 samples, memory-mapping files over ``max_memory_bytes``."""
+    if count is None:
+        count = path.stat().st_size // 4
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    if max_memory_bytes is not None and count * 4 <= max_memory_bytes:
+        return np.fromfile(path, dtype=np.float32, count=count)
+    return np.memmap(path, dtype=np.float32, mode="r", shape=(count,))
+
+
+def samples_duration(samples: np.ndarray) -> float:
+    return len(samples) / SAMPLE_RATE
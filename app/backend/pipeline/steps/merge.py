@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from typing import List
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence, Tuple
 
+import numpy as np
+
+from core.columnar import SegmentTable
 from core.models import Segment
 
 
@@ -9,35 +15,242 @@ def _overlap(a_start: float, a_end: float, b_start: float, b_end: float) -> floa
     return max(0.0, min(a_end, b_end) - max(a_start, b_start))
 
 
-def merge_segments(diarized: List[Segment], transcribed: List[Segment]) -> List[Segment]:
-    if not diarized:
-        return [
-            Segment(
-                start=segment.start,
-                end=segment.end,
-                speaker="SPEAKER_00",
-                text=segment.text,
-            )
-            for segment in transcribed
-        ]
+# Trabajo del barrido por encima del cual compensa el índice: factor sobre (N + M)·log N
+SWEEP_WORK_FACTOR = 4
+
+
+def _best_turns(starts: Sequence[float], ends: Sequence[float], spans: Sequence[Tuple[float, float]]) -> List[int]:
+    """Index of the turn with the largest overlap for every span, 0 when none overlaps.
+
+    The heap sweep scans every turn overlapping a span, which is cheap for
+    diarization turns but degrades to O(N·M) when many long turns overlap.
+    The number of turns it would scan is counted up front with two binary
+    searches per span; above ``SWEEP_WORK_FACTOR·(N + M)·log N`` the
+    indexed join runs instead, so the whole call stays O((N + M) log N).
+    Both give the same result.
+    """
+    if not len(starts) or not len(spans):
+        return [0] * len(spans)
+    query_starts = np.fromiter((span[0] for span in spans), dtype=np.float64, count=len(spans))
+    query_ends = np.fromiter((span[1] for span in spans), dtype=np.float64, count=len(spans))
+    # Turnos activos de cada span: empiezan antes de su fin menos los que acaban antes de su inicio
+    entered = np.searchsorted(np.sort(np.asarray(starts, dtype=np.float64)), query_ends, side="left")
+    left = np.searchsorted(np.sort(np.asarray(ends, dtype=np.float64)), query_starts, side="right")
+    work = int(np.maximum(entered - left, 0).sum())
+    budget = SWEEP_WORK_FACTOR * (len(starts) + len(spans)) * max(1, int(len(starts)).bit_length())
+    if work <= budget:
+        return _sweep_turns(starts, ends, spans)
+    return _indexed_turns(starts, ends, spans)
+
+
+def _sweep_turns(starts: Sequence[float], ends: Sequence[float], spans: Sequence[Tuple[float, float]]) -> List[int]:
+    turns = sorted(range(len(starts)), key=starts.__getitem__)
+    queries = sorted(range(len(spans)), key=lambda index: spans[index][0])
+    best = [0] * len(spans)
+    active: List[Tuple[float, int]] = []
+    cursor = 0
+
+    for query in queries:
+        start, end = spans[query]
+        while cursor < len(turns) and starts[turns[cursor]] < end:
+            index = turns[cursor]
+            heapq.heappush(active, (ends[index], index))
+            cursor += 1
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
 
-    merged: List[Segment] = []
-    for segment in transcribed:
-        best_speaker = diarized[0].speaker
+        best_index = -1
         best_overlap = 0.0
-        for diarized_segment in diarized:
-            overlap = _overlap(
-                segment.start, segment.end, diarized_segment.start, diarized_segment.end
-            )
-            if overlap > best_overlap:
+        for _, index in active:
+            overlap = _overlap(start, end, starts[index], ends[index])
+            if overlap > best_overlap or (
+                overlap == best_overlap and best_index != -1 and index < best_index
+            ):
                 best_overlap = overlap
-                best_speaker = diarized_segment.speaker
-        merged.append(
-            Segment(
-                start=segment.start,
-                end=segment.end,
-                speaker=best_speaker,
-                text=segment.text,
-            )
+                best_index = index
+        if best_index != -1:
+            best[query] = best_index
+    return best
+
+
+_NOTHING = (-math.inf, -math.inf)
+
+
+class _PrefixMax:
+    """Fenwick tree of tuples: insert at a position, read the maximum over a prefix."""
+
+    def __init__(self, size: int) -> None:
+        self._tree = [_NOTHING] * (size + 1)
+
+    def insert(self, position: int, value: Tuple[float, float]) -> None:
+        tree = self._tree
+        position += 1
+        while position < len(tree):
+            if value > tree[position]:
+                tree[position] = value
+            position += position & -position
+
+    def best(self, count: int) -> Tuple[float, float]:
+        """Maximum over positions ``[0, count)``."""
+        tree = self._tree
+        best = _NOTHING
+        while count > 0:
+            if tree[count] > best:
+                best = tree[count]
+            count -= count & -count
+        return best
+
+
+def _indexed_turns(starts: Sequence[float], ends: Sequence[float], spans: Sequence[Tuple[float, float]]) -> List[int]:
+    """Offline O((N + M) log N) version of :func:`_sweep_turns`.
+
+    A turn ``[a, b]`` overlapping a span ``[s, e]`` falls in exactly one case:
+    it covers the span (``a <= s``, ``b >= e``: overlap ``e - s``), sticks out
+    on the left (``a <= s``, ``b < e``: ``b - s``), on the right (``a > s``,
+    ``b >= e``: ``e - a``) or lies inside (``a > s``, ``b < e``: ``b - a``).
+    Each case is a prefix-maximum query over turns inserted in start or end
+    order, with keys that pick the smallest turn index among equal overlaps.
+    Overlaps are computed with the same float operations as ``_overlap``.
+    """
+    count = len(starts)
+    by_start = sorted(range(count), key=starts.__getitem__)
+    by_end = sorted(range(count), key=ends.__getitem__)
+    sorted_starts = [starts[index] for index in by_start]
+    sorted_ends = [ends[index] for index in by_end]
+    start_rank = {index: rank for rank, index in enumerate(by_start)}
+    end_rank = {index: rank for rank, index in enumerate(by_end)}
+    candidates: List[List[Tuple[float, int]]] = [[] for _ in spans]
+
+    # Turnos con a <= s, insertados por inicio a medida que avanza s
+    covering = _PrefixMax(count)  # por fin descendente: índice mínimo con b >= e
+    trailing = _PrefixMax(count)  # por fin ascendente: mayor b < e
+    cursor = 0
+    for query in sorted(range(len(spans)), key=lambda index: spans[index][0]):
+        start, end = spans[query]
+        while cursor < count and sorted_starts[cursor] <= start:
+            index = by_start[cursor]
+            covering.insert(count - 1 - end_rank[index], (-index, 0.0))
+            trailing.insert(end_rank[index], (ends[index], -index))
+            cursor += 1
+        reaching = bisect_left(sorted_ends, end)
+        found = covering.best(count - reaching)
+        if found is not _NOTHING and end - start > 0:
+            candidates[query].append((end - start, -int(found[0])))
+        found = trailing.best(reaching)
+        if found is not _NOTHING and found[0] - start > 0:
+            candidates[query].append((found[0] - start, -int(found[1])))
+
+    # Turnos con b >= e, insertados por fin descendente a medida que baja e
+    leading = _PrefixMax(count)  # por inicio descendente: menor a > s
+    cursor = count - 1
+    for query in sorted(range(len(spans)), key=lambda index: spans[index][1], reverse=True):
+        start, end = spans[query]
+        while cursor >= 0 and sorted_ends[cursor] >= end:
+            index = by_end[cursor]
+            leading.insert(count - 1 - start_rank[index], (-starts[index], -index))
+            cursor -= 1
+        found = leading.best(count - bisect_right(sorted_starts, start))
+        if found is not _NOTHING and end + found[0] > 0:
+            candidates[query].append((end - -found[0], -int(found[1])))
+
+    # Turnos con b < e, insertados por fin ascendente a medida que sube e
+    inside = _PrefixMax(count)  # por inicio descendente: mayor b - a con a > s
+    cursor = 0
+    for query in sorted(range(len(spans)), key=lambda index: spans[index][1]):
+        start, end = spans[query]
+        while cursor < count and sorted_ends[cursor] < end:
+            index = by_end[cursor]
+            inside.insert(count - 1 - start_rank[index], (ends[index] - starts[index], -index))
+            cursor += 1
+        found = inside.best(count - bisect_right(sorted_starts, start))
+        if found is not _NOTHING and found[0] > 0:
+            candidates[query].append((found[0], -int(found[1])))
+
+    # Mayor solape y, a igualdad, el turno anterior en el orden de entrada
+    return [max(options, key=lambda option: (option[0], -option[1]))[1] if options else 0 for options in candidates]
+
+
+def assign_speakers(diarized: List[Segment], spans: Sequence[Tuple[float, float]]) -> List[str]:
+    """Return the speaker with the largest overlap for every (start, end) span.
+
+    Two joins give the same answer. The sweep line walks both inputs sorted
+    by start: diarized turns enter an active heap once they start before the
+    span ends and leave it once they end before the span starts. That is
+    cheap for ordinary diarization but scans every overlapping turn, so many
+    long nested turns make it O(N·M). The indexed join keeps Fenwick
+    prefix-max trees over turn starts and ends, one per way a turn can
+    overlap a span, and answers each span in O(log N). ``_best_turns``
+    counts the sweep's work with binary searches first and switches to the
+    index above ``SWEEP_WORK_FACTOR·(N + M)·log N``.
+
+    Ties go to the earliest diarized turn in input order and spans without
+    overlap fall back to ``diarized[0].speaker``, exactly like the pairwise
+    scan. Works for segment and word timestamps.
+    """
+    if not diarized:
+        return ["SPEAKER_00"] * len(spans)
+    best = _best_turns([turn.start for turn in diarized], [turn.end for turn in diarized], spans)
+    return [diarized[index].speaker for index in best]
+
+
+def merge_segments(diarized: List[Segment], transcribed: List[Segment]) -> List[Segment]:
+    speakers = assign_speakers(diarized, [(segment.start, segment.end) for segment in transcribed])
+    return [
+        Segment(
+            start=segment.start,
+            end=segment.end,
+            speaker=speaker,
+            text=segment.text,
         )
-    return merged
+        for segment, speaker in zip(transcribed, speakers)
+    ]
+
+
+def merge_tables(diarized: SegmentTable, transcribed: SegmentTable) -> SegmentTable:
+    """:func:`merge_segments` on columnar transcripts: only the speaker column changes.
+
+    When ASR carried word timestamps, each word gets its own speaker and a
+    segment is split wherever the speaker changes between its words; the
+    pieces still tile the segment's time span.
+    """
+    if not len(diarized):
+        return transcribed.with_speakers(np.zeros(len(transcribed), dtype=np.int32), ["SPEAKER_00"])
+    turn_starts, turn_ends = diarized.starts.tolist(), diarized.ends.tolist()
+    spans = list(zip(transcribed.starts.tolist(), transcribed.ends.tolist()))
+    best = _best_turns(turn_starts, turn_ends, spans)
+    merged = transcribed.with_speakers(diarized.codes[np.asarray(best, dtype=np.intp)], diarized.speakers)
+    words = transcribed.words
+    if words is None or not len(words):
+        return merged
+    word_best = _best_turns(turn_starts, turn_ends, list(zip(words.starts.tolist(), words.ends.tolist())))
+    return _split_by_word_speakers(merged, diarized.codes[np.asarray(word_best, dtype=np.intp)])
+
+
+def _split_by_word_speakers(merged: SegmentTable, word_codes: np.ndarray) -> SegmentTable:
+    words = merged.words
+    names = merged.speakers
+    offsets = merged.word_offsets.tolist()
+    codes = word_codes.tolist()
+    word_starts = words.starts.tolist()
+    word_texts = words.texts()
+    rows: List[Tuple[float, float, str, str]] = []
+    for index, (start, end, speaker, text) in enumerate(merged.columns()):
+        first, last = offsets[index], offsets[index + 1]
+        if first == last:
+            rows.append((start, end, speaker, text))
+            continue
+        # Tramos de palabras consecutivas con el mismo hablante
+        cuts = [first] + [word for word in range(first + 1, last) if codes[word] != codes[word - 1]] + [last]
+        if len(cuts) == 2:
+            rows.append((start, end, names[codes[first]], text))
+            continue
+        for run, (run_first, run_last) in enumerate(zip(cuts, cuts[1:])):
+            rows.append(
+                (
+                    start if run == 0 else word_starts[run_first],
+                    end if run_last == last else word_starts[run_last],
+                    names[codes[run_first]],
+                    "".join(word_texts[run_first:run_last]).strip(),
+                )
+            )
+    return SegmentTable.from_rows(rows)
@@ -1,49 +1,251 @@
 from __future__ import annotations
 
 import importlib.util
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-from core.models import Segment
-from utils.ffmpeg import get_audio_duration
+import numpy as np
 
+from core.columnar import SegmentRow, SegmentTable
+from core.settings import SETTINGS
+from pipeline.model_registry import MODEL_REGISTRY, ModelKey
+from pipeline.steps.extract_audio import SAMPLE_RATE, samples_duration
+from pipeline.steps.vad import plan_chunks
 
-def transcribe_audio(audio_path: Path, language: str) -> List[Segment]:
+
+def _load_faster_whisper(key: ModelKey):
+    from faster_whisper import WhisperModel  # type: ignore
+
+    # num_workers permite transcripciones concurrentes sobre el mismo modelo:
+    # una por trozo en paralelo de cada job, repartiendo los núcleos entre ellas
+    workers = max(1, SETTINGS.asr_concurrency) * max(1, SETTINGS.asr_chunk_workers)
+    return WhisperModel(
+        key.name,
+        device=key.device,
+        compute_type=key.compute_type,
+        num_workers=workers,
+        cpu_threads=max(1, (os.cpu_count() or 1) // workers),
+    )
+
+
+def _load_whisper(key: ModelKey):
+    import whisper  # type: ignore
+
+    return whisper.load_model(key.name, device=key.device)
+
+
+MODEL_REGISTRY.register_loader("faster-whisper", _load_faster_whisper)
+MODEL_REGISTRY.register_loader("whisper", _load_whisper)
+
+
+def asr_model_key() -> Optional[ModelKey]:
     if importlib.util.find_spec("faster_whisper") is not None:
-        from faster_whisper import WhisperModel  # type: ignore
-
-        model = WhisperModel("small", device="cpu", compute_type="int8")
-        segments, _ = model.transcribe(str(audio_path), language=language if language != "auto" else None)
-        return [
-            Segment(
-                start=float(segment.start),
-                end=float(segment.end),
-                speaker="",
-                text=segment.text.strip(),
-            )
-            for segment in segments
-        ]
+        return ModelKey("faster-whisper", SETTINGS.asr_model, device="cpu", compute_type="int8")
     if importlib.util.find_spec("whisper") is not None:
-        import whisper  # type: ignore
-
-        model = whisper.load_model("small")
-        result = model.transcribe(str(audio_path), language=None if language == "auto" else language)
-        return [
-            Segment(
-                start=float(segment["start"]),
-                end=float(segment["end"]),
-                speaker="",
-                text=segment["text"].strip(),
+        return ModelKey("whisper", SETTINGS.asr_model, device="cpu")
+    return None
+
+
+class DecodedSegment(NamedTuple):
+    """A segment as the decoder returns it, relative to its chunk, with its words if requested."""
+
+    start: float
+    end: float
+    text: str
+    words: Tuple[SegmentRow, ...] = ()
+
+
+def transcribe_audio(
+    samples: np.ndarray,
+    language: str,
+    checkpoint_dir: Optional[Path] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+    on_segment: Optional[Callable[[SegmentRow], None]] = None,
+) -> SegmentTable:
+    """Transcribe 16 kHz mono float32 samples in VAD-aligned chunks.
+
+    Chunks are decoded in parallel on the shared model and, when
+    ``checkpoint_dir`` is given, checkpointed so an interrupted job resumes
+    from the last finished chunk. ``on_segment`` sees every segment as soon
+    as it is decoded, with its final timestamps. With
+    ``SETTINGS.asr_word_timestamps`` the table also carries word timestamps.
+    """
+    key = asr_model_key()
+    if key is None:
+        return SegmentTable.from_rows(
+            [SegmentRow(0.0, samples_duration(samples), "", "[transcription unavailable - install faster-whisper]")]
+        )
+
+    language = None if language == "auto" else language
+    chunks = plan_chunks(samples, SETTINGS.asr_chunk_seconds, SETTINGS.use_vad)
+    # openai-whisper no es seguro entre hilos: sus trozos se decodifican de uno en uno
+    workers = SETTINGS.asr_chunk_workers if key.backend == "faster-whisper" else 1
+    words = SETTINGS.asr_word_timestamps
+    params = {
+        "backend": key.backend,
+        "model": key.name,
+        "language": language,
+        "vad": SETTINGS.use_vad,
+        "words": words,
+    }
+    with MODEL_REGISTRY.acquire(key) as model:
+        return transcribe_chunks(
+            samples,
+            chunks,
+            lambda audio: _decode(model, key.backend, audio, language, words),
+            workers=workers,
+            checkpoint_dir=checkpoint_dir,
+            params=params,
+            on_progress=on_progress,
+            on_segment=on_segment,
+        )
+
+
+def _decode(
+    model, backend: str, audio: np.ndarray, language: Optional[str], words: bool = False
+) -> Iterator[DecodedSegment]:
+    if backend == "faster-whisper":
+        # El generador de faster-whisper es perezoso: cada segmento sale en cuanto se decodifica
+        segments, _ = model.transcribe(audio, language=language, word_timestamps=words)
+        for segment in segments:
+            yield DecodedSegment(
+                float(segment.start),
+                float(segment.end),
+                segment.text.strip(),
+                tuple(SegmentRow(float(word.start), float(word.end), "", word.word) for word in segment.words or ()),
             )
-            for segment in result.get("segments", [])
-        ]
-
-    duration = get_audio_duration(audio_path)
-    return [
-        Segment(
-            start=0.0,
-            end=duration,
-            speaker="",
-            text="[transcription unavailable - install faster-whisper]",
+        return
+    result = model.transcribe(audio, language=language, word_timestamps=words)
+    for segment in result.get("segments", []):
+        yield DecodedSegment(
+            float(segment["start"]),
+            float(segment["end"]),
+            segment["text"].strip(),
+            tuple(
+                SegmentRow(float(word["start"]), float(word["end"]), "", word["word"])
+                for word in segment.get("words") or ()
+            ),
         )
-    ]
+
+
+def transcribe_chunks(
+    samples: np.ndarray,
+    chunks: List[Tuple[int, int]],
+    decode: Callable[[np.ndarray], Iterable[DecodedSegment]],
+    workers: int = 1,
+    checkpoint_dir: Optional[Path] = None,
+    params: Optional[dict] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+    on_segment: Optional[Callable[[SegmentRow], None]] = None,
+) -> SegmentTable:
+    """Decode each ``(start, end)`` sample range and stitch the segments in time order.
+
+    ``decode`` yields segments relative to its chunk; they and their words,
+    if any, are shifted by the chunk offset and clipped to its end. Checkpoints are only reused
+    when the chunk plan and ``params`` match the ones they were written with.
+    ``on_progress`` receives the fraction of audio decoded so far and
+    ``on_segment`` each segment as it is produced, checkpointed ones first.
+    """
+    done = _read_checkpoints(checkpoint_dir, chunks, params or {}) if checkpoint_dir else {}
+    total = sum(end - start for start, end in chunks) / SAMPLE_RATE
+    decoded = {index: (chunks[index][1] - chunks[index][0]) / SAMPLE_RATE for index in done}
+    lock = threading.Lock()
+
+    def report(index: int, seconds: float) -> None:
+        if on_progress is None or not total:
+            return
+        with lock:
+            decoded[index] = seconds
+            fraction = sum(decoded.values()) / total
+        on_progress(fraction)
+
+    def run(index: int) -> SegmentTable:
+        start, end = chunks[index]
+        offset, limit = start / SAMPLE_RATE, end / SAMPLE_RATE
+        rows: List[SegmentRow] = []
+        words: List[SegmentRow] = []
+        counts: List[int] = []
+        for segment in decode(np.asarray(samples[start:end], dtype=np.float32)):
+            segment_words = getattr(segment, "words", ())
+            for word in segment_words:
+                words.append(
+                    SegmentRow(
+                        min(limit, offset + word.start), min(limit, offset + max(word.start, word.end)), "", word.text
+                    )
+                )
+            counts.append(len(segment_words))
+            rows.append(
+                SegmentRow(
+                    min(limit, offset + segment.start),
+                    min(limit, offset + max(segment.start, segment.end)),
+                    "",
+                    segment.text,
+                )
+            )
+            # El informe es punto de cancelación: un job abortado no publica más segmentos
+            report(index, rows[-1].end - offset)
+            if on_segment is not None:
+                on_segment(rows[-1])
+        report(index, limit - offset)
+        table = SegmentTable.from_rows(rows)
+        if words:
+            table = table.with_words(SegmentTable.from_rows(words), counts)
+        if checkpoint_dir is not None:
+            _write_json(checkpoint_dir / f"chunk_{index:05d}.json", table.to_records())
+        return table
+
+    pending = [index for index in range(len(chunks)) if index not in done]
+    if on_segment is not None:
+        for index in sorted(done):
+            for row in done[index]:
+                on_segment(row)
+    if done and on_progress is not None and total:
+        # Lo recuperado de checkpoints cuenta como ya decodificado
+        on_progress(sum(decoded.values()) / total)
+    if workers <= 1 or len(pending) <= 1:
+        for index in pending:
+            done[index] = run(index)
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(workers, len(pending)), thread_name_prefix="asr")
+        try:
+            futures = {executor.submit(run, index): index for index in pending}
+            for future in as_completed(futures):
+                done[futures[future]] = future.result()
+        finally:
+            # Ante un fallo no se empiezan más trozos; los que ya corren dejan su checkpoint
+            executor.shutdown(wait=True, cancel_futures=True)
+    return SegmentTable.concat([done[index] for index in range(len(chunks))])
+
+
+def _read_checkpoints(checkpoint_dir: Path, chunks: List[Tuple[int, int]], params: dict) -> Dict[int, SegmentTable]:
+    plan = {"chunks": [list(chunk) for chunk in chunks], "params": params}
+    plan_path = checkpoint_dir / "plan.json"
+    try:
+        previous = json.loads(plan_path.read_text())
+    except (OSError, ValueError):
+        previous = None
+    if previous != plan:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        _write_json(plan_path, plan)
+        return {}
+    done: Dict[int, SegmentTable] = {}
+    for index in range(len(chunks)):
+        try:
+            records = json.loads((checkpoint_dir / f"chunk_{index:05d}.json").read_text())
+            # Los checkpoints anteriores a las tablas son listas de segmentos
+            done[index] = SegmentTable.from_records(records)
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+    return done
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload))
+    os.replace(tmp_path, path)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+
+from pipeline.steps.extract_audio import SAMPLE_RATE
+
+FRAME = SAMPLE_RATE * 30 // 1000
+# Ventana de suavizado: un corte necesita ~0,3 s de silencio, no una pausa entre sílabas
+SMOOTH_FRAMES = 10
+BLOCK_FRAMES = 100_000
+# Versión del reparto en trozos: forma parte de la clave de caché de ASR
+PLAN_VERSION = 2
+
+
+def frame_energy(samples: np.ndarray) -> np.ndarray:
+    """RMS of consecutive 30 ms frames, computed block by block so memmaps stay on disk."""
+    count = len(samples) // FRAME
+    energy = np.empty(count, dtype=np.float32)
+    for start in range(0, count, BLOCK_FRAMES):
+        stop = min(count, start + BLOCK_FRAMES)
+        frames = np.asarray(samples[start * FRAME : stop * FRAME], dtype=np.float32).reshape(-1, FRAME)
+        energy[start:stop] = np.sqrt(np.mean(frames * frames, axis=1))
+    if len(energy) >= SMOOTH_FRAMES:
+        kernel = np.ones(SMOOTH_FRAMES, dtype=np.float32) / SMOOTH_FRAMES
+        energy = np.convolve(energy, kernel, mode="same")
+    return energy
+
+
+def plan_chunks(samples: np.ndarray, max_seconds: float, use_vad: bool = True) -> List[Tuple[int, int]]:
+    """Split audio into ``(start, end)`` sample ranges of at most ``max_seconds``.
+
+    With VAD each cut lands on the quietest stretch in the second half of
+    the window, so words are not split between chunks. Without VAD the
+    audio is cut at fixed intervals. Either way the chunks cover the whole
+    recording: deciding what is silence is left to the decoder, since an
+    energy threshold drops quiet speech in quiet or uniformly noisy audio.
+    """
+    total = len(samples)
+    limit = max(FRAME, int(max_seconds * SAMPLE_RATE))
+    if not use_vad:
+        return [(start, min(total, start + limit)) for start in range(0, total, limit)]
+
+    energy = frame_energy(samples)
+    chunks: List[Tuple[int, int]] = []
+    start = 0
+    while start < total:
+        if total - start <= limit:
+            end = total
+        else:
+            low = (start + limit // 2) // FRAME
+            high = max(low + 1, (start + limit) // FRAME)
+            end = (low + int(np.argmin(energy[low:high]))) * FRAME + FRAME // 2
+        chunks.append((start, end))
+        start = end
+    return chunks
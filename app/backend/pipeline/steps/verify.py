@@ -1,21 +1,17 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, List
 
 from core.models import Citation, Claim, Verification
 from indexing.vectorstore import VectorStore
 
 
 def verify_claims(claims: List[Claim], store: VectorStore) -> List[Verification]:
-    verifications: List[Verification] = []
-    for claim in claims:
-        matches = store.search(claim.text, k=5)
-        if not matches:
-            verifications.append(
-                Verification(claim_id=claim.id, status="insufficient", confidence=0.2)
-            )
-            continue
-        citations = [
+    # Una sola búsqueda por lotes; los claims con el mismo texto comparten citas
+    texts = list(dict.fromkeys(claim.text for claim in claims))
+    citations_by_text: Dict[str, List[Citation]] = {}
+    for text, matches in zip(texts, store.search_many(texts, k=5)):
+        citations_by_text[text] = [
             Citation(
                 source_title=match["title"],
                 source_ref=match["source"],
@@ -25,6 +21,15 @@ def verify_claims(claims: List[Claim], store: VectorStore) -> List[Verification]
             )
             for match in matches
         ]
+
+    verifications: List[Verification] = []
+    for claim in claims:
+        citations = citations_by_text[claim.text]
+        if not citations:
+            verifications.append(
+                Verification(claim_id=claim.id, status="insufficient", confidence=0.2)
+            )
+            continue
         verifications.append(
             Verification(
                 claim_id=claim.id,
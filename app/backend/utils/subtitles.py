@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+
+ARROW = " --> "
+
+
+def to_milliseconds(seconds: float) -> int:
+    """Seconds rounded to the nearest whole millisecond, never negative."""
+    return max(0, round(seconds * 1000))
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """``HH:MM:SS,mmm`` (SRT) or, with ``separator="."``, ``HH:MM:SS.mmm`` (WebVTT)."""
+    hours, rest = divmod(to_milliseconds(seconds), 3_600_000)
+    minutes, rest = divmod(rest, 60_000)
+    secs, millis = divmod(rest, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{separator}{millis:03}"
+
+
+def _milliseconds(seconds: Sequence[float]) -> np.ndarray:
+    # np.rint redondea igual que round(): al par en los empates exactos
+    values = np.rint(np.asarray(seconds, dtype=np.float64) * 1000)
+    return np.maximum(values, 0).astype(np.int64)
+
+
+def _hour_digits(milliseconds: np.ndarray) -> np.ndarray:
+    # Dos dígitos como mínimo, más solo a partir de las 100 horas
+    hours = milliseconds // 3_600_000
+    digits = np.full(len(hours), 2, dtype=np.int64)
+    threshold = 100
+    while len(hours) and hours.max() >= threshold:
+        digits += hours >= threshold
+        threshold *= 10
+    return digits
+
+
+def _write_stamps(out: np.ndarray, milliseconds: np.ndarray, separator: str, hour_digits: int) -> None:
+    """Write ``H…H:MM:SS,mmm`` into the (n, hour_digits + 10) uint8 block ``out``."""
+    hours, rest = np.divmod(milliseconds, 3_600_000)
+    minutes, rest = np.divmod(rest, 60_000)
+    secs, millis = np.divmod(rest, 1000)
+    zero = ord("0")
+    for column in range(hour_digits):
+        out[:, column] = hours // 10 ** (hour_digits - 1 - column) % 10 + zero
+    tail = out[:, hour_digits:]
+    tail[:, 0] = tail[:, 3] = ord(":")
+    tail[:, 1] = minutes // 10 + zero
+    tail[:, 2] = minutes % 10 + zero
+    tail[:, 4] = secs // 10 + zero
+    tail[:, 5] = secs % 10 + zero
+    tail[:, 6] = ord(separator)
+    tail[:, 7] = millis // 100 + zero
+    tail[:, 8] = millis // 10 % 10 + zero
+    tail[:, 9] = millis % 10 + zero
+
+
+def _format(columns: List[np.ndarray], separator: str) -> List[str]:
+    """One line per row: the timestamps of every column joined by ``ARROW``.
+
+    Digits are written straight into a fixed-width byte block and turned
+    into strings in one conversion. Rows are grouped by hour width, so in
+    practice there is a single block.
+    """
+    count = len(columns[0])
+    digits = [_hour_digits(milliseconds) for milliseconds in columns]
+    # Una clave entera por combinación de anchos: casi siempre hay una sola
+    groups = np.zeros(count, dtype=np.int64)
+    for column in digits:
+        groups = groups * 32 + column
+    arrow = np.frombuffer(ARROW.encode("ascii"), dtype=np.uint8)
+    lines: List[str] = [""] * count
+    for group in ([groups[0]] if count and groups.min() == groups.max() else np.unique(groups)):
+        rows = np.flatnonzero(groups == group)
+        first = rows[0]
+        stamp_widths = [int(column[first]) + 10 for column in digits]
+        out = np.empty((len(rows), sum(stamp_widths) + len(ARROW) * (len(columns) - 1)), dtype=np.uint8)
+        offset = 0
+        for index, (milliseconds, width) in enumerate(zip(columns, stamp_widths)):
+            if index:
+                out[:, offset : offset + len(ARROW)] = arrow
+                offset += len(ARROW)
+            _write_stamps(out[:, offset : offset + width], milliseconds[rows], separator, width - 10)
+            offset += width
+        decoded = out.view(f"S{out.shape[1]}").ravel().astype(str).tolist()
+        if len(rows) == count:
+            return decoded
+        for row, line in zip(rows.tolist(), decoded):
+            lines[row] = line
+    return lines
+
+
+def format_timestamps(seconds: Sequence[float], separator: str = ",") -> List[str]:
+    """:func:`format_timestamp` for a whole array at once, computed digit-wise in NumPy."""
+    return _format([_milliseconds(seconds)], separator)
+
+
+def format_cue_times(starts: Sequence[float], ends: Sequence[float], separator: str = ",") -> List[str]:
+    """``start --> end`` timing lines for whole cue arrays, as used by SRT and WebVTT."""
+    return _format([_milliseconds(starts), _milliseconds(ends)], separator)
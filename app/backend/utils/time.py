@@ -1,23 +1,11 @@
 from __future__ import annotations
 
-import datetime
+from utils.subtitles import format_timestamp
 
 
 def seconds_to_timestamp(seconds: float) -> str:
-    delta = datetime.timedelta(seconds=seconds)
-    total_seconds = int(delta.total_seconds())
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-    millis = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
+    return format_timestamp(seconds, ",")
 
 
 def seconds_to_vtt(seconds: float) -> str:
-    delta = datetime.timedelta(seconds=seconds)
-    total_seconds = int(delta.total_seconds())
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-    millis = int((seconds - int(seconds)) * 1000)
-    return f"{hours:02}:{minutes:02}:{secs:02}.{millis:03}"
+    return format_timestamp(seconds, ".")
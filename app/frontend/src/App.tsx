@@ -1,5 +1,5 @@
-import { useEffect, useState } from "react";
-import { createJob, getJobStatus, getResult, saveEdits, pickFile } from "./api/client";
+import { useEffect, useRef, useState } from "react";
+import { appendEdits, cancelJob, createJob, getJobStatus, getPartial, getResult, pickFile, subscribeJobEvents } from "./api/client";
 import type { JobResult, Segment } from "./types/models";
 import "./app.css";
 
@@ -12,33 +12,71 @@ export default function App() {
   const [progress, setProgress] = useState(0);
   const [logs, setLogs] = useState<string[]>([]);
   const [result, setResult] = useState<JobResult | null>(null);
+  const [partialSegments, setPartialSegments] = useState<Segment[]>([]);
+  const partialCursor = useRef(0);
+  const partialLoading = useRef(false);
   const [selectedSpeaker, setSelectedSpeaker] = useState<string>("");
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    let timer: number | undefined;
-    if (jobId && status !== "completed" && status !== "failed") {
-      timer = window.setInterval(async () => {
+    if (!jobId) {
+      return;
+    }
+    // El backend empuja el progreso por SSE; sin sondeo periódico
+    return subscribeJobEvents(
+      jobId,
+      (event) => {
+        setStatus(event.status);
+        if (event.progress !== undefined) {
+          setProgress(event.progress);
+        }
+        if (event.message) {
+          setLogs((previous) => [...previous, event.message as string].slice(-200));
+        }
+        if (event.stage === "asr" && !partialLoading.current) {
+          // Segmentos nuevos desde el último cursor: no se reenvía lo ya recibido
+          partialLoading.current = true;
+          getPartial(jobId, partialCursor.current)
+            .then((partial) => {
+              partialCursor.current = partial.next;
+              if (partial.segments.length) {
+                setPartialSegments((previous) =>
+                  [...previous, ...partial.segments].sort((a, b) => a.start - b.start),
+                );
+              }
+            })
+            .catch((e) => console.error("Error fetching partial transcript:", e))
+            .finally(() => {
+              partialLoading.current = false;
+            });
+        }
+      },
+      async () => {
         try {
           const data = await getJobStatus(jobId);
           setStatus(data.status);
-          setProgress(data.progress);
-          setLogs(data.logs);
           if (data.status === "completed") {
             const jobResult = await getResult(jobId);
             setResult(jobResult);
           }
         } catch (e) {
-          console.error("Error polling status:", e);
+          console.error("Error fetching job result:", e);
         }
-      }, 1500);
+      },
+    );
+  }, [jobId]);
+
+  const handleCancel = async () => {
+    if (!jobId) {
+      return;
     }
-    return () => {
-      if (timer) {
-        window.clearInterval(timer);
-      }
-    };
-  }, [jobId, status]);
+    try {
+      const { status: next } = await cancelJob(jobId);
+      setStatus(next);
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Error al cancelar el job");
+    }
+  };
 
   const handlePickFile = async () => {
     try {
@@ -64,6 +102,10 @@ export default function App() {
       });
       setJobId(response.job_id);
       setStatus("queued");
+      setProgress(0);
+      setLogs([]);
+      setPartialSegments([]);
+      partialCursor.current = 0;
       setResult(null);
     } catch (err) {
       console.error(err);
@@ -77,14 +119,14 @@ export default function App() {
 
   const handleRename = async (speaker: string, newName: string) => {
     if (!jobId) return;
-    await saveEdits(jobId, [{ action: "rename", old: speaker, new: newName }]);
+    await appendEdits(jobId, [{ action: "rename", old: speaker, new: newName }]);
     const updated = await getResult(jobId);
     setResult(updated);
   };
 
   const handleAssign = async (segment: Segment, speaker: string) => {
     if (!jobId) return;
-    await saveEdits(jobId, [
+    await appendEdits(jobId, [
       { action: "assign", start: segment.start, end: segment.end, speaker },
     ]);
     const updated = await getResult(jobId);
@@ -196,7 +238,17 @@ export default function App() {
               <p className="text-slate-300">
                 Estado: <span className="font-semibold text-white capitalize">{status}</span>
               </p>
-              <span className="text-slate-400">{Math.round(progress * 100)}%</span>
+              <div className="flex items-center gap-3">
+                {(status === "queued" || status === "running") && (
+                  <button
+                    onClick={handleCancel}
+                    className="px-3 py-1 rounded-lg bg-slate-800 text-slate-300 hover:bg-red-600/80 hover:text-white transition-colors"
+                  >
+                    Cancelar
+                  </button>
+                )}
+                <span className="text-slate-400">{Math.round(progress * 100)}%</span>
+              </div>
             </div>
             <div className="bg-slate-950/50 rounded-xl p-4 max-h-48 overflow-y-auto border border-slate-800/50 font-mono text-xs text-slate-400">
               <ul className="space-y-1">
@@ -205,6 +257,19 @@ export default function App() {
                 ))}
               </ul>
             </div>
+            {!result && partialSegments.length > 0 && (
+              <div className="mt-6">
+                <h3 className="text-lg font-medium text-white mb-4">Transcripción en curso</h3>
+                <div className="space-y-2 max-h-72 overflow-y-auto pr-2">
+                  {partialSegments.map((segment, idx) => (
+                    <div key={`${segment.start}-${idx}`} className="bg-slate-900/40 border border-white/5 rounded-xl p-3">
+                      <span className="text-xs text-slate-500 font-mono mr-2">{segment.start.toFixed(1)}s</span>
+                      <span className="text-slate-300">{segment.text}</span>
+                    </div>
+                  ))}
+                </div>
+              </div>
+            )}
           </section>
         )}
 
@@ -1,4 +1,4 @@
-import type { JobResult } from "../types/models";
+import type { Claim, JobResult, Segment } from "../types/models";
 
 const API_BASE = "http://localhost:8000";
 
@@ -33,6 +33,50 @@ export async function getJobStatus(jobId: string): Promise<{
   return response.json();
 }
 
+export async function cancelJob(jobId: string): Promise<{ status: string }> {
+  const response = await fetch(`${API_BASE}/api/jobs/${jobId}`, { method: "DELETE" });
+  if (!response.ok) {
+    throw new Error("Failed to cancel job");
+  }
+  return response.json();
+}
+
+export interface JobEvent {
+  id: number;
+  status: string;
+  stage: string;
+  progress?: number;
+  stage_progress?: number;
+  message?: string;
+}
+
+export function subscribeJobEvents(
+  jobId: string,
+  onEvent: (event: JobEvent) => void,
+  onEnd: () => void,
+): () => void {
+  const source = new EventSource(`${API_BASE}/api/jobs/${jobId}/events`);
+  source.addEventListener("progress", (message) => {
+    onEvent(JSON.parse((message as MessageEvent<string>).data));
+  });
+  source.addEventListener("end", () => {
+    source.close();
+    onEnd();
+  });
+  return () => source.close();
+}
+
+export async function getPartial(
+  jobId: string,
+  after: number,
+): Promise<{ status: string; next: number; segments: Segment[]; claims: Claim[] }> {
+  const response = await fetch(`${API_BASE}/api/jobs/${jobId}/partial?after=${after}`);
+  if (!response.ok) {
+    throw new Error("Failed to fetch partial transcript");
+  }
+  return response.json();
+}
+
 export async function getResult(jobId: string): Promise<JobResult> {
   const response = await fetch(`${API_BASE}/api/jobs/${jobId}/result?apply_edits=true`);
   if (!response.ok) {
@@ -53,6 +97,18 @@ export async function saveEdits(jobId: string, edits: Array<Record<string, unkno
   return response.json();
 }
 
+export async function appendEdits(jobId: string, edits: Array<Record<string, unknown>>) {
+  const response = await fetch(`${API_BASE}/api/jobs/${jobId}/edits`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ edits }),
+  });
+  if (!response.ok) {
+    throw new Error("Failed to save edits");
+  }
+  return response.json();
+}
+
 export async function pickFile(): Promise<{ path: string }> {
   const response = await fetch(`${API_BASE}/api/utils/pick-file`);
   if (!response.ok) {
@@ -0,0 +1,126 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.columnar import SegmentRow
+from core.models import Segment
+from pipeline.steps.extract_audio import SAMPLE_RATE
+from pipeline.steps.transcribe import DecodedSegment, transcribe_chunks
+from pipeline.steps.vad import plan_chunks
+
+
+def _speech_with_pauses(bursts: int, speech_seconds: float, pause_seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    tone = 0.3 * np.sin(np.arange(int(speech_seconds * SAMPLE_RATE)) * 0.1)
+    pause = rng.standard_normal(int(pause_seconds * SAMPLE_RATE)) * 0.001
+    return np.concatenate([np.concatenate([tone, pause]) for _ in range(bursts)]).astype(np.float32)
+
+
+def test_plan_chunks_cuts_inside_pauses():
+    samples = _speech_with_pauses(bursts=20, speech_seconds=7, pause_seconds=1)
+    chunks = plan_chunks(samples, max_seconds=20)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(samples)
+    for (_, end), (start, _) in zip(chunks, chunks[1:]):
+        assert end == start
+        # Every cut falls in the pause that follows a 7 s burst
+        assert (end / SAMPLE_RATE) % 8 >= 7
+    assert all(end - start <= 20 * SAMPLE_RATE for start, end in chunks)
+    # Silence is not dropped: quiet speech below any energy threshold still reaches the decoder
+    silent = plan_chunks(np.zeros(100 * SAMPLE_RATE, dtype=np.float32), max_seconds=20)
+    assert silent[0][0] == 0 and silent[-1][1] == 100 * SAMPLE_RATE
+    assert plan_chunks(samples, max_seconds=50, use_vad=False)[1] == (50 * SAMPLE_RATE, 100 * SAMPLE_RATE)
+
+
+def _fake_decode(calls, barrier=None, fail_on=None):
+    def decode(audio: np.ndarray):
+        if barrier is not None:
+            barrier.wait()
+        if fail_on is not None and len(audio) == fail_on:
+            raise RuntimeError("decoder crashed")
+        calls.append(len(audio))
+        return [Segment(start=0.5, end=len(audio) / SAMPLE_RATE + 1.0, speaker="", text=f"{len(audio)}")]
+
+    return decode
+
+
+def test_transcribe_chunks_stitches_timestamps_in_parallel():
+    samples = np.zeros(6 * SAMPLE_RATE, dtype=np.float32)
+    chunks = [(0, SAMPLE_RATE), (SAMPLE_RATE, 3 * SAMPLE_RATE), (3 * SAMPLE_RATE, 6 * SAMPLE_RATE)]
+    calls = []
+    segments = transcribe_chunks(samples, chunks, _fake_decode(calls, threading.Barrier(3, timeout=5)), workers=3)
+    assert [(s.start, s.end, s.text) for s in segments] == [
+        (0.5, 1.0, str(SAMPLE_RATE)),
+        (1.5, 3.0, str(2 * SAMPLE_RATE)),
+        (3.5, 6.0, str(3 * SAMPLE_RATE)),
+    ]
+
+
+def test_transcribe_chunks_resumes_from_checkpoints(tmp_path: Path):
+    samples = np.zeros(6 * SAMPLE_RATE, dtype=np.float32)
+    chunks = [(0, SAMPLE_RATE), (SAMPLE_RATE, 3 * SAMPLE_RATE), (3 * SAMPLE_RATE, 6 * SAMPLE_RATE)]
+    checkpoints = tmp_path / "asr"
+    calls = []
+    with pytest.raises(RuntimeError, match="decoder crashed"):
+        transcribe_chunks(samples, chunks, _fake_decode(calls, fail_on=3 * SAMPLE_RATE), checkpoint_dir=checkpoints)
+    assert calls == [SAMPLE_RATE, 2 * SAMPLE_RATE]
+
+    calls.clear()
+    segments = transcribe_chunks(samples, chunks, _fake_decode(calls), checkpoint_dir=checkpoints)
+    assert calls == [3 * SAMPLE_RATE]
+    assert [s.start for s in segments] == [0.5, 1.5, 3.5]
+
+    # A different plan invalidates the checkpoints
+    calls.clear()
+    transcribe_chunks(samples, chunks, _fake_decode(calls), checkpoint_dir=checkpoints, params={"model": "large"})
+    assert len(calls) == 3
+
+
+def test_transcribe_chunks_reports_segments_and_progress(tmp_path: Path):
+    samples = np.zeros(6 * SAMPLE_RATE, dtype=np.float32)
+    chunks = [(0, 2 * SAMPLE_RATE), (2 * SAMPLE_RATE, 6 * SAMPLE_RATE)]
+    seen, fractions = [], []
+    transcribe_chunks(
+        samples,
+        chunks,
+        _fake_decode([]),
+        on_progress=fractions.append,
+        on_segment=lambda segment: seen.append(segment.start),
+    )
+    assert seen == [0.5, 2.5]
+    assert fractions == sorted(fractions) and fractions[-1] == 1.0
+
+    # Chunks restored from checkpoints are replayed to on_segment before decoding
+    checkpoints = tmp_path / "asr"
+    transcribe_chunks(samples, chunks, _fake_decode([]), checkpoint_dir=checkpoints)
+    seen.clear()
+    calls = []
+    transcribe_chunks(
+        samples, chunks, _fake_decode(calls), checkpoint_dir=checkpoints, on_segment=lambda s: seen.append(s.start)
+    )
+    assert calls == [] and seen == [0.5, 2.5]
+
+
+def test_transcribe_chunks_keeps_word_timestamps(tmp_path: Path):
+    samples = np.zeros(4 * SAMPLE_RATE, dtype=np.float32)
+    chunks = [(0, 2 * SAMPLE_RATE), (2 * SAMPLE_RATE, 4 * SAMPLE_RATE)]
+
+    def decode(audio: np.ndarray):
+        # Solo el segundo trozo trae palabras; la última se sale del trozo y se recorta
+        if len(audio) and not audio.any() and decode.calls:
+            words = (SegmentRow(0.1, 0.4, "", " hola"), SegmentRow(0.5, 2.5, "", " mundo"))
+        else:
+            words = ()
+        decode.calls += 1
+        return [DecodedSegment(0.0, 1.0, "hola mundo" if words else "eh", words)]
+
+    decode.calls = 0
+    checkpoints = tmp_path / "asr"
+    table = transcribe_chunks(samples, chunks, decode, checkpoint_dir=checkpoints)
+    assert table.word_counts().tolist() == [0, 2]
+    assert list(table.words) == [(2.1, 2.4, "", " hola"), (2.5, 4.0, "", " mundo")]
+    # Las palabras sobreviven al checkpoint
+    restored = transcribe_chunks(samples, chunks, decode, checkpoint_dir=checkpoints)
+    assert decode.calls == 2
+    assert restored.to_records() == table.to_records()
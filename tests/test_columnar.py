@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+
+from benchmarks.bench_merge import random_timeline
+from core.columnar import SegmentRow, SegmentTable
+from core.models import JobMetadata, JobResult, Segment
+from pipeline.steps.claims import extract_claims
+from pipeline.steps.merge import merge_segments, merge_tables
+
+
+def test_segment_table_interns_speakers_and_roundtrips():
+    segments = [
+        Segment(start=0.0, end=1.5, speaker="A", text="hola"),
+        Segment(start=1.5, end=3.0, speaker="B", text=""),
+        Segment(start=3.0, end=4.0, speaker="A", text="adiós, son 3"),
+    ]
+    table = SegmentTable.from_segments(segments)
+    assert table.speakers == ["A", "B"] and table.codes.tolist() == [0, 1, 0]
+    assert table.starts.dtype == np.float64 and len(table) == 3
+    assert table[-1] == SegmentRow(3.0, 4.0, "A", "adiós, son 3")
+    assert table.to_segments() == segments
+    assert table.speaker_count() == 2
+
+    records = json.loads(json.dumps(table.to_records()))
+    assert list(SegmentTable.from_records(records)) == list(table)
+    # Stage cache entries and checkpoints written before the table are segment lists
+    legacy = [segment.model_dump() for segment in segments]
+    assert list(SegmentTable.from_records(legacy)) == list(table)
+
+    joined = SegmentTable.concat([SegmentTable.from_rows([SegmentRow(9.0, 9.5, "C", "x")]), table])
+    assert joined.speaker_names() == ["C", "A", "B", "A"]
+    assert joined.texts() == ["x", "hola", "", "adiós, son 3"]
+    assert len(SegmentTable.concat([])) == 0
+
+
+def test_merge_tables_matches_merge_segments():
+    for seed in range(10):
+        diarized = random_timeline(60, 300.0, speakers=3, seed=seed)
+        transcribed = random_timeline(80, 320.0, speakers=1, seed=seed + 100)
+        merged = merge_tables(SegmentTable.from_segments(diarized), SegmentTable.from_segments(transcribed))
+        assert merged.to_segments() == merge_segments(diarized, transcribed)
+
+    transcribed = SegmentTable.from_segments(random_timeline(5, 10.0, speakers=1, seed=0))
+    assert merge_tables(SegmentTable.from_rows([]), transcribed).speaker_names() == ["SPEAKER_00"] * 5
+
+
+def test_claims_from_table_serialize_like_validated_models():
+    table = SegmentTable.from_rows(
+        [SegmentRow(0.0, 2.0, "A", "El paro fue del 12 por ciento"), SegmentRow(2.0, 3.0, "B", "vale")]
+    )
+    claims = extract_claims(table)
+    assert [(claim.speaker, claim.text) for claim in claims] == [("A", "El paro fue del 12 por ciento")]
+
+    metadata = JobMetadata(job_id="j", video_path="v.mp4", language="es", num_speakers=None)
+    result = JobResult(metadata=metadata, transcript=table.to_transcript(), claims=claims)
+    assert JobResult.model_validate_json(result.model_dump_json()) == result
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import numpy as np
+
+from core.settings import SETTINGS
+from indexing.ann import DenseIndex
+from indexing.embeddings import HashingEmbedder, tokenize
+from indexing.vectorstore import VectorStore
+
+
+def test_tokenize_keeps_numbers():
+    assert tokenize("El PIB creció 3,5% en 2023") == ["el", "pib", "creció", "3,5", "en", "2023"]
+
+
+def test_ivf_with_all_lists_probed_is_exact(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(SETTINGS, "packs_dir", tmp_path / "packs")
+    monkeypatch.setattr(SETTINGS, "retrieval_backend", "dense")
+    monkeypatch.setattr(SETTINGS, "embedding_backend", "hashing")
+    monkeypatch.setattr(SETTINGS, "embedding_dim", 64)
+    rng = np.random.default_rng(3)
+    words = [f"palabra{i}" for i in range(200)]
+    pack = tmp_path / "packs" / "demo"
+    pack.mkdir(parents=True)
+    for document in range(100):
+        (pack / f"{document:03}.txt").write_text(" ".join(rng.choice(words, size=12)))
+
+    # Se prueba el índice denso tal como lo escribe el build, no una ruta de guardado aparte
+    store = VectorStore.from_pack("demo")
+    store.build()
+    store.close()
+    assert not list((tmp_path / "data" / "db").glob("*.tmp"))
+    loaded = DenseIndex.load(store.dense_vectors_path, store.dense_ivf_path)
+    assert loaded.nlist > 1 and len(loaded) == 100
+
+    vectors = np.asarray(loaded.vectors)
+    queries = vectors[:10]
+    for query, matches in zip(queries, loaded.search_many(queries, k=3, nprobe=loaded.nlist)):
+        expected = [loaded.keys[i] for i in np.argsort(-(vectors @ query), kind="stable")[:3]]
+        assert [key for key, _ in matches] == expected
+
+
+def test_hashing_embedder_matches_numeric_claims():
+    embedder = HashingEmbedder(dim=256)
+    chunks = embedder.embed(["La inflación fue 4,2 en 2022", "La inflación fue 7,1 en 2023"])
+    query = embedder.embed(["inflación 7,1 2023"])[0]
+    scores = chunks @ query
+    assert scores[1] > scores[0]
@@ -0,0 +1,56 @@
+import json
+import random
+from pathlib import Path
+
+from core.models import Segment, Transcript
+from pipeline.edit_log import EditLog
+from pipeline.steps.edits import EditedTranscript, replay_edits
+
+
+def _random_edit(rng: random.Random) -> dict:
+    action = rng.choice(["rename", "assign", "split", "merge"])
+    speaker = rng.choice(["A", "B", "C"])
+    start = rng.randint(0, 40) / 2
+    if action == "rename":
+        return {"action": action, "old": rng.choice(["A", "B", "C"]), "new": speaker}
+    if action == "split":
+        return {"action": action, "time": start + rng.random(), "speaker": rng.choice([speaker, None])}
+    edit = {"action": action, "start": start, "end": start + rng.uniform(0, 6)}
+    if action == "assign":
+        edit["speaker"] = speaker
+    return edit
+
+
+def test_incremental_edits_match_a_full_replay():
+    rng = random.Random(7)
+    for trial in range(200):
+        segments, cursor = [], 0.0
+        for index in range(rng.randint(0, 15)):
+            # Una de cada cuatro transcripciones se solapa y usa la réplica lineal
+            start = cursor + rng.choice([0.0, 0.5, 1.0]) - (rng.random() if trial % 4 == 0 else 0.0)
+            end = start + rng.choice([0.0, 1.0, 2.5])
+            segments.append(Segment(start=start, end=end, speaker="ABC"[index % 3], text=f"t{index}"))
+            cursor = segments[-1].end
+        transcript = Transcript(segments=segments)
+        edited = EditedTranscript(transcript)
+        log: list = []
+        for _ in range(5):
+            if log and rng.random() < 0.2:
+                # Un log que no extiende al anterior se reaplica desde la base
+                log = log[: rng.randint(0, len(log))]
+            log = log + [_random_edit(rng) for _ in range(rng.randint(0, 4))]
+            assert edited.update(log).model_dump() == replay_edits(transcript, log).model_dump()
+        assert transcript.model_dump() == Transcript(segments=segments).model_dump()
+
+
+def test_edit_log_appends_and_migrates_legacy_edits(tmp_path: Path):
+    legacy = tmp_path / "edits.json"
+    legacy.write_text(json.dumps([{"action": "rename", "old": "A", "new": "B"}]))
+    log = EditLog(tmp_path / "edits.jsonl", legacy)
+    assert log.read() == [{"action": "rename", "old": "A", "new": "B"}]
+    before = log.version()
+
+    assert log.append([{"action": "split", "time": 1.5}]) == 2
+    assert not legacy.exists() and log.version() != before
+    assert log.read()[1] == {"action": "split", "time": 1.5}
+    assert log.replace([]) == 0 and log.read() == []
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from core.engine import _run_concurrently
+from pipeline.progress import JobCancelled, ProgressTracker
+
+
+def test_run_concurrently_overlaps_stages():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def stage(value):
+        barrier.wait()
+        return value
+
+    assert _run_concurrently(lambda: stage("diarized"), lambda: stage("transcribed")) == (
+        "diarized",
+        "transcribed",
+    )
+
+
+def test_run_concurrently_propagates_first_failure():
+    release = threading.Event()
+
+    def failing():
+        raise RuntimeError("diarization failed")
+
+    def slow():
+        release.wait(5)
+        return "transcribed"
+
+    with pytest.raises(RuntimeError, match="diarization failed"):
+        _run_concurrently(failing, slow, cancel=release.set)
+
+
+def test_run_concurrently_stops_sibling_and_releases_its_slot():
+    progress = ProgressTracker()
+    slot = threading.Semaphore(1)
+    started = threading.Event()
+    reports = []
+
+    def failing():
+        started.wait(5)
+        raise RuntimeError("diarization failed")
+
+    def sibling():
+        # Como ASR: ocupa su plaza del pool e informa del progreso en cada segmento
+        with slot:
+            started.set()
+            for index in range(10_000):
+                progress.update("asr", index / 10_000)
+                reports.append(index)
+                threading.Event().wait(0.001)
+        return "transcribed"
+
+    with pytest.raises(RuntimeError, match="diarization failed"):
+        _run_concurrently(failing, sibling, cancel=progress.abort)
+    # El hermano ya ha terminado al propagarse el fallo: no sigue informando y su plaza está libre
+    stopped_at = len(reports)
+    threading.Event().wait(0.05)
+    assert len(reports) == stopped_at < 10_000
+    assert slot.acquire(blocking=False)
+    with pytest.raises(JobCancelled):
+        progress.update("asr", 0.5)
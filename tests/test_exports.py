@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes_jobs import router
+from core.models import JobMetadata, JobResult, Segment, Transcript
+from core.settings import SETTINGS
+from pipeline.job_manager import JOB_MANAGER, JobStatus
+
+
+def _client(tmp_path: Path, monkeypatch) -> TestClient:
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    result_path = tmp_path / "jobs" / "job" / "result.json"
+    result_path.parent.mkdir(parents=True)
+    result = JobResult(
+        metadata=JobMetadata(job_id="job", video_path="video.mp4", language="es", num_speakers=None),
+        transcript=Transcript(
+            segments=[
+                Segment(start=0.0, end=1.5, speaker="SPEAKER_00", text="hola"),
+                Segment(start=3661.25, end=3662.0, speaker="SPEAKER_01", text="adiós"),
+            ]
+        ),
+    )
+    result_path.write_text(result.model_dump_json())
+    monkeypatch.setitem(JOB_MANAGER._jobs, "job", JobStatus(job_id="job", status="completed", result_path=result_path))
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_exports_stream_once_and_are_served_from_disk(tmp_path: Path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+
+    first = client.get("/api/jobs/job/export/srt")
+    assert first.status_code == 200
+    assert first.text == (
+        "1\n00:00:00,000 --> 00:00:01,500\nSPEAKER_00: hola\n"
+        "\n2\n01:01:01,250 --> 01:01:02,000\nSPEAKER_01: adiós\n"
+    )
+    cached = list((tmp_path / "jobs" / "job" / "exports").glob("transcript-*.srt"))
+    assert len(cached) == 1 and cached[0].read_text() == first.text
+
+    again = client.get("/api/jobs/job/export/srt")
+    assert again.text == first.text and again.headers["etag"] == first.headers["etag"]
+    assert client.get("/api/jobs/job/export/srt", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    vtt = client.get("/api/jobs/job/export/vtt")
+    assert vtt.text.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:01.500\nSPEAKER_00: hola\n")
+
+
+def test_exports_follow_the_edit_log(tmp_path: Path, monkeypatch):
+    client = _client(tmp_path, monkeypatch)
+    before = client.get("/api/jobs/job/export/vtt")
+
+    client.post("/api/jobs/job/edits", json={"edits": [{"action": "rename", "old": "SPEAKER_00", "new": "Ana"}]})
+    after = client.get("/api/jobs/job/export/vtt")
+    assert "Ana: hola" in after.text and after.headers["etag"] != before.headers["etag"]
+    # La versión anterior se borra al completar la nueva
+    assert len(list((tmp_path / "jobs" / "job" / "exports").glob("transcript-*.vtt"))) == 1
+
+    raw = client.get("/api/jobs/job/export/json", params={"apply_edits": False})
+    assert raw.json()["transcript"]["segments"][0]["speaker"] == "SPEAKER_00"
+    # Editado y sin editar conviven: descargar uno no borra la caché del otro
+    raw_vtt = client.get("/api/jobs/job/export/vtt", params={"apply_edits": False})
+    assert "SPEAKER_00: hola" in raw_vtt.text
+    client.get("/api/jobs/job/export/vtt")
+    exports = tmp_path / "jobs" / "job" / "exports"
+    assert len(list(exports.glob("transcript-edited-*.vtt"))) == 1
+    assert len(list(exports.glob("transcript-raw-*.vtt"))) == 1
+    assert client.get("/api/jobs/job/export/pdf").status_code == 400
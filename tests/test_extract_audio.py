@@ -0,0 +1,49 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pipeline.steps.extract_audio import decode_audio
+
+FAKE_FFMPEG = """#!{python}
+import sys
+import numpy as np
+
+if "missing.mp4" in sys.argv:
+    sys.stderr.write("missing.mp4: No such file or directory\\n")
+    sys.exit(1)
+sys.stdout.buffer.write(np.arange({count}, dtype=np.float32).tobytes())
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path: Path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable, count=300_000))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_decode_audio_keeps_short_inputs_in_memory(fake_ffmpeg, tmp_path: Path):
+    spill = tmp_path / "audio.f32"
+    samples = decode_audio(Path("video.mp4"), spill, max_memory_bytes=10 << 20)
+    assert not isinstance(samples, np.memmap)
+    assert np.array_equal(samples, np.arange(300_000, dtype=np.float32))
+    assert not spill.exists()
+
+
+def test_decode_audio_spills_long_inputs_to_a_memmap(fake_ffmpeg, tmp_path: Path):
+    spill = tmp_path / "audio.f32"
+    samples = decode_audio(Path("video.mp4"), spill, max_memory_bytes=64 * 1024)
+    assert isinstance(samples, np.memmap)
+    assert np.array_equal(samples, np.arange(300_000, dtype=np.float32))
+    assert spill.stat().st_size == 300_000 * 4
+
+
+def test_decode_audio_reports_ffmpeg_errors(fake_ffmpeg, tmp_path: Path):
+    with pytest.raises(RuntimeError, match="No such file"):
+        decode_audio(Path("missing.mp4"), tmp_path / "audio.f32")
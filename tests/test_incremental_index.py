@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+
+from core.settings import SETTINGS
+from indexing.vectorstore import VectorStore
+
+
+def _store() -> VectorStore:
+    return VectorStore.from_pack("demo")
+
+
+def test_build_only_reprocesses_changed_files(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(SETTINGS, "packs_dir", tmp_path / "packs")
+    pack = tmp_path / "packs" / "demo"
+    pack.mkdir(parents=True)
+    (pack / "a.txt").write_text("el desempleo bajo este trimestre")
+    (pack / "b.md").write_text("la inflacion subio durante el invierno")
+
+    assert _store().build() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+    a_keys = {key for key, meta in _store()._metadata.items() if meta["title"] == "a.txt"}
+
+    # Same content with a new mtime is detected through the content hash
+    os.utime(pack / "a.txt", ns=(1, 1))
+    assert _store().build() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2, "failed": 0}
+
+    (pack / "b.md").unlink()
+    (pack / "c.txt").write_text("la deuda publica crecio")
+    store = _store()
+    assert store.build() == {"added": 1, "updated": 0, "removed": 1, "unchanged": 1, "failed": 0}
+    assert [match["title"] for match in store.search("desempleo")] == ["a.txt"]
+    assert [match["title"] for match in store.search("deuda")] == ["c.txt"]
+    assert store.search("inflacion") == []
+    # Chunks of untouched files keep their keys
+    assert a_keys and a_keys <= set(store._metadata)
+    store.close()
+
+
+def test_interrupted_build_resumes_from_spool(tmp_path: Path, monkeypatch):
+    import indexing.vectorstore as vectorstore
+
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path / "data")
+    monkeypatch.setattr(SETTINGS, "packs_dir", tmp_path / "packs")
+    monkeypatch.setattr(SETTINGS, "ingest_workers", 1)
+    monkeypatch.setattr(SETTINGS, "index_batch_chunks", 1)
+    pack = tmp_path / "packs" / "demo"
+    pack.mkdir(parents=True)
+    (pack / "a.txt").write_text("el desempleo bajo este trimestre")
+    (pack / "b.txt").write_text("la inflacion subio durante el invierno")
+
+    real_iter_documents = vectorstore.iter_documents
+    parsed = []
+
+    def crashing(paths):
+        for doc in real_iter_documents(paths):
+            parsed.append(doc["path"].name)
+            yield doc
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(vectorstore, "iter_documents", crashing)
+    try:
+        _store().build()
+    except KeyboardInterrupt:
+        pass
+    assert parsed == ["a.txt"] or parsed == ["b.txt"]
+    assert not (tmp_path / "data" / "db" / "demo_index.bin").exists()
+
+    def recording(paths):
+        for doc in real_iter_documents(paths):
+            parsed.append(doc["path"].name)
+            yield doc
+
+    monkeypatch.setattr(vectorstore, "iter_documents", recording)
+    store = _store()
+    assert store.build() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+    # The file spooled before the interruption is not parsed again
+    assert sorted(parsed) == ["a.txt", "b.txt"]
+    assert [match["title"] for match in store.search("desempleo")] == ["a.txt"]
+    assert [match["title"] for match in store.search("inflacion")] == ["b.txt"]
+    assert not (tmp_path / "data" / "db" / "demo_build").exists()
+    store.close()
@@ -1,4 +1,4 @@
-from indexing.chunking import chunk_text
+from indexing.chunking import chunk_spans, chunk_text
 
 
 def test_chunking_is_stable():
@@ -7,3 +7,35 @@ def test_chunking_is_stable():
     assert len(chunks) == 3
     assert chunks[0] == "a" * 500
     assert chunks[1].startswith("a" * 50)
+
+
+def test_chunk_spans_break_on_sentences_and_tokens():
+    text = "El paro bajó un 3,5 % en 2024. La inflación subió a 1.000 puntos! " * 40
+    spans = chunk_spans(text, chunk_size=120, overlap=20)
+    assert spans[0].start == 0
+    assert spans[-1].end == len(text.rstrip())
+    for previous, span in zip(spans, spans[1:]):
+        assert span.start > previous.start
+        # Consecutive windows overlap or touch, so no text is lost
+        assert span.start <= previous.end
+    for span in spans:
+        chunk = span.text(text)
+        assert len(chunk) <= 120
+        assert chunk == chunk.strip()
+        # Never cut inside a word or number
+        assert span.start == 0 or text[span.start - 1].isspace()
+        assert span.end == len(text) or text[span.end].isspace()
+
+
+def test_chunk_spans_fall_back_to_hard_cuts_for_long_tokens():
+    text = "a" * 1200
+    spans = chunk_spans(text, chunk_size=500, overlap=50)
+    assert [(span.start, span.end) for span in spans] == [(0, 500), (450, 950), (900, 1200)]
+
+
+def test_chunk_spans_track_pages():
+    text = "primera pagina con texto.\nsegunda pagina con mas texto."
+    pages = [0, text.index("segunda")]
+    spans = chunk_spans(text, chunk_size=30, overlap=0, pages=pages)
+    assert [span.page for span in spans] == [1, 2]
+    assert spans[1].text(text).startswith("segunda")
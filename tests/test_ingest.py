@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+from indexing.chunking import page_at
+from indexing.ingest import iter_documents
+
+
+def test_iter_documents_isolates_broken_files(tmp_path: Path):
+    good = tmp_path / "good.txt"
+    good.write_text("hola mundo")
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    docs = {doc["path"].name: doc for doc in iter_documents([good, broken], workers=2, timeout=60)}
+    assert docs["good.txt"]["content"] == "hola mundo"
+    assert "error" in docs["broken.pdf"]
+
+
+def test_page_at_maps_offsets_to_pages():
+    pages = [0, 120, 300]
+    assert page_at(pages, 0) == 1
+    assert page_at(pages, 119) == 1
+    assert page_at(pages, 120) == 2
+    assert page_at(pages, 5000) == 3
+    assert page_at(None, 10) is None
+
+
+def test_iter_documents_replaces_only_the_hung_worker(tmp_path: Path):
+    # Leer un FIFO sin escritor bloquea para siempre, como un parser colgado
+    hung = tmp_path / "hung.txt"
+    os.mkfifo(hung)
+    files = [hung]
+    for index in range(4):
+        files.append(tmp_path / f"doc{index}.txt")
+        files[-1].write_text(f"documento {index}")
+
+    docs = {doc["path"].name: doc for doc in iter_documents(files, workers=2, timeout=2)}
+    assert docs["hung.txt"]["error"] == "timed out after 2s"
+    assert [docs[f"doc{index}.txt"]["content"] for index in range(4)] == [f"documento {index}" for index in range(4)]
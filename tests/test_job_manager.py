@@ -0,0 +1,200 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pipeline.job_manager as job_manager_module
+from core.models import JobMetadata, JobResult, Transcript
+from core.settings import SETTINGS
+from pipeline.job_manager import JobManager
+
+
+def _fake_result(job_id: str, video_path: str, language: str, num_speakers, pack_name, verify) -> JobResult:
+    return JobResult(
+        metadata=JobMetadata(
+            job_id=job_id,
+            video_path=video_path,
+            language=language,
+            num_speakers=num_speakers,
+            pack_name=pack_name,
+            verify=verify,
+        ),
+        transcript=Transcript(segments=[]),
+    )
+
+
+def test_workers_run_jobs_concurrently(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_pipeline(progress=None, **job):
+        # Both jobs must be inside the pipeline at the same time to pass the barrier
+        barrier.wait()
+        (tmp_path / "jobs" / job["job_id"]).mkdir(parents=True, exist_ok=True)
+        return _fake_result(**job)
+
+    monkeypatch.setattr(job_manager_module, "run_pipeline", fake_pipeline)
+
+    async def scenario():
+        manager = JobManager()
+        manager.start(workers=2)
+        ids = [manager.submit(str(video), "es", None, None, False) for _ in range(2)]
+        await asyncio.wait_for(manager._queue.join(), timeout=10)
+        return [manager.get_status(job_id).status for job_id in ids]
+
+    assert asyncio.run(scenario()) == ["completed", "completed"]
+
+
+def test_job_events_stream_progress_until_completion(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+
+    def fake_pipeline(progress, **job):
+        (tmp_path / "jobs" / job["job_id"]).mkdir(parents=True, exist_ok=True)
+        progress.update("extract", 1.0, "Decoded 60s of audio")
+        progress.update("asr", 0.5)
+        progress.update("asr", 1.0, "Transcribed 3 segments", segments=3)
+        return _fake_result(**job)
+
+    monkeypatch.setattr(job_manager_module, "run_pipeline", fake_pipeline)
+
+    async def scenario():
+        manager = JobManager()
+        job_id = manager.submit(str(video), "es", None, None, False)
+        events = []
+
+        async def collect():
+            async for event in manager.events(job_id):
+                events.append(event)
+
+        collector = asyncio.create_task(collect())
+        manager.start(workers=1)
+        await asyncio.wait_for(collector, timeout=10)
+        resumed = [event async for event in manager.events(job_id, after=events[2]["id"])]
+        return manager.get_status(job_id), events, resumed
+
+    status, events, resumed = asyncio.run(scenario())
+    assert status.status == "completed" and status.progress == 1.0
+    assert [event["stage"] for event in events] == ["pipeline", "extract", "asr", "asr", "save", "done"]
+    progress = [event["progress"] for event in events]
+    assert progress == sorted(progress)
+    assert events[3]["segments"] == 3
+    assert list(status.logs)[-1] == "Completed pipeline"
+    assert resumed == events[3:]
+
+
+def test_jobs_survive_a_restart(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+
+    def fake_pipeline(progress=None, **job):
+        (tmp_path / "jobs" / job["job_id"]).mkdir(parents=True, exist_ok=True)
+        return _fake_result(**job)
+
+    monkeypatch.setattr(job_manager_module, "run_pipeline", fake_pipeline)
+
+    async def first_process():
+        manager = JobManager()
+        manager.start(workers=1)
+        done = manager.submit(str(video), "es", None, None, False)
+        await asyncio.wait_for(manager._queue.join(), timeout=10)
+        manager.close()
+        # Submitted but never picked up: the process dies with it queued
+        pending = JobManager()
+        queued = pending.submit(str(video), "en", 2, None, False)
+        pending.close()
+        return done, queued
+
+    done, queued = asyncio.run(first_process())
+
+    async def second_process():
+        manager = JobManager()
+        assert manager.get_status(done).status == "completed"
+        assert manager.get_result(done).metadata.language == "es"
+        assert manager.get_status(queued).status == "queued"
+        manager.start(workers=1)
+        await asyncio.wait_for(manager._queue.join(), timeout=10)
+        result = manager.get_result(queued)
+        manager.close()
+        return manager.get_status("missing"), result
+
+    missing, result = asyncio.run(second_process())
+    assert missing is None
+    assert result.metadata.language == "en" and result.metadata.num_speakers == 2
+
+
+def test_job_store_imports_results_written_before_it_existed(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    result_path = tmp_path / "jobs" / "old-job" / "result.json"
+    result_path.parent.mkdir(parents=True)
+    result_path.write_text(_fake_result("old-job", "v.mp4", "es", None, None, False).model_dump_json())
+
+    manager = JobManager()
+    assert manager.get_status("old-job").status == "completed"
+    assert manager.get_result("old-job").metadata.video_path == "v.mp4"
+    manager.close()
+
+
+def test_queue_runs_interactive_then_shortest_jobs_first(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+    order = []
+
+    def fake_pipeline(progress=None, **job):
+        order.append(job["job_id"])
+        (tmp_path / "jobs" / job["job_id"]).mkdir(parents=True, exist_ok=True)
+        return _fake_result(**job)
+
+    monkeypatch.setattr(job_manager_module, "run_pipeline", fake_pipeline)
+
+    async def scenario():
+        manager = JobManager()
+        long_batch = manager.submit(str(video), "es", None, None, False, duration=7200.0)
+        unknown = manager.submit(str(video), "es", None, None, False, priority="interactive")
+        long_interactive = manager.submit(str(video), "es", None, None, False, priority="interactive", duration=600.0)
+        short = manager.submit(str(video), "es", None, None, False, duration=30.0)
+        short_batch = manager.submit(str(video), "es", None, None, False, priority="batch", duration=10.0)
+        manager.start(workers=1)
+        await asyncio.wait_for(manager._queue.join(), timeout=10)
+        return [short, long_interactive, unknown, short_batch, long_batch]
+
+    assert order == asyncio.run(scenario())
+
+
+def test_cancel_skips_queued_jobs_and_stops_running_ones(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+    started = threading.Event()
+    ran = []
+
+    def fake_pipeline(progress, **job):
+        ran.append(job["job_id"])
+        started.set()
+        # Un pipeline largo que informa progreso hasta que lo cancelan
+        for step in range(500):
+            progress.update("asr", step / 500)
+            threading.Event().wait(0.01)
+        return _fake_result(**job)
+
+    monkeypatch.setattr(job_manager_module, "run_pipeline", fake_pipeline)
+
+    async def scenario():
+        manager = JobManager()
+        running = manager.submit(str(video), "es", None, None, False, duration=10.0)
+        queued = manager.submit(str(video), "es", None, None, False, duration=20.0)
+        manager.start(workers=1)
+        await asyncio.to_thread(started.wait, 5)
+        replies = [manager.cancel(queued), manager.cancel(running), manager.cancel("missing")]
+        await asyncio.wait_for(manager._queue.join(), timeout=10)
+        return running, queued, replies, manager
+
+    running, queued, replies, manager = asyncio.run(scenario())
+    assert replies == ["cancelled", "cancelling", None]
+    assert ran == [running]
+    assert manager.get_status(running).status == "cancelled"
+    assert JobManager().get_status(queued).status == "cancelled"
@@ -1,5 +1,8 @@
+import random
+
+from core.columnar import SegmentTable
 from core.models import Segment
-from pipeline.steps.merge import merge_segments
+from pipeline.steps.merge import _indexed_turns, _sweep_turns, merge_segments, merge_tables
 
 
 def test_merge_overlap_assigns_best_speaker():
@@ -14,3 +17,75 @@ def test_merge_overlap_assigns_best_speaker():
     merged = merge_segments(diarized, transcribed)
     assert merged[0].speaker == "A"
     assert merged[1].speaker == "B"
+
+
+def test_merge_matches_pairwise_scan_on_random_timelines():
+    from benchmarks.bench_merge import random_timeline, reference_merge
+
+    for seed in range(20):
+        diarized = random_timeline(60, 300.0, speakers=3, seed=seed)
+        transcribed = random_timeline(80, 320.0, speakers=1, seed=seed + 100)
+        expected = reference_merge(diarized, transcribed)
+        actual = merge_segments(diarized, transcribed)
+        assert [s.speaker for s in actual] == [s.speaker for s in expected]
+
+
+def test_merge_ties_and_fallback_follow_input_order():
+    diarized = [
+        Segment(start=10.0, end=20.0, speaker="LATE", text=""),
+        Segment(start=0.0, end=2.0, speaker="A", text=""),
+        Segment(start=2.0, end=4.0, speaker="B", text=""),
+    ]
+    transcribed = [
+        Segment(start=1.0, end=3.0, speaker="", text="tie"),
+        Segment(start=30.0, end=31.0, speaker="", text="gap"),
+    ]
+    merged = merge_segments(diarized, transcribed)
+    assert [s.speaker for s in merged] == ["A", "LATE"]
+
+
+def test_indexed_join_matches_sweep_and_pairwise_scan():
+    from benchmarks.bench_merge import nested_timeline, random_timeline, reference_merge
+
+    rng = random.Random(4)
+    for seed in range(20):
+        # Turnos anidados y tiempos en rejilla: muchos empates y solapes largos
+        diarized = nested_timeline(40, 100.0, seed=seed) + [
+            Segment(start=start, end=start + rng.choice([0.0, 1.0, 5.0]), speaker="GRID", text="")
+            for start in (float(rng.randrange(100)) for _ in range(20))
+        ]
+        transcribed = random_timeline(60, 110.0, speakers=1, seed=seed + 50)
+        expected = [s.speaker for s in reference_merge(diarized, transcribed)]
+        starts, ends = [s.start for s in diarized], [s.end for s in diarized]
+        spans = [(s.start, s.end) for s in transcribed]
+        for join in (_sweep_turns, _indexed_turns):
+            assert [diarized[index].speaker for index in join(starts, ends, spans)] == expected
+    # Con turnos largos anidados merge_segments pasa por el índice y da lo mismo
+    diarized = nested_timeline(400, 1000.0, seed=1)
+    transcribed = random_timeline(300, 1000.0, speakers=1, seed=2)
+    assert [s.speaker for s in merge_segments(diarized, transcribed)] == [
+        s.speaker for s in reference_merge(diarized, transcribed)
+    ]
+
+
+def test_merge_tables_splits_segments_where_the_word_speaker_changes():
+    diarized = SegmentTable.from_rows([(0.0, 2.0, "A", ""), (2.0, 5.0, "B", ""), (5.0, 9.0, "A", "")])
+    transcribed = SegmentTable.from_rows([(0.0, 4.5, "", "hola que tal"), (5.0, 8.0, "", "bien gracias")])
+    words = SegmentTable.from_rows(
+        [
+            (0.1, 0.5, "", " hola"),
+            (0.6, 1.0, "", " que"),
+            (2.2, 3.9, "", " tal"),
+            (5.2, 6.0, "", " bien"),
+            (6.1, 7.5, "", " gracias"),
+        ]
+    )
+    merged = merge_tables(diarized, transcribed.with_words(words, [3, 2]))
+    # El primer segmento cae casi todo en B, pero sus dos primeras palabras son de A
+    assert list(merged) == [
+        (0.0, 2.2, "A", "hola que"),
+        (2.2, 4.5, "B", "tal"),
+        (5.0, 8.0, "A", "bien gracias"),
+    ]
+    # Sin palabras se asigna por segmento, como siempre
+    assert merge_tables(diarized, transcribed).speaker_names() == ["B", "A"]
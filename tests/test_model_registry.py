@@ -0,0 +1,27 @@
+from pipeline.model_registry import ModelKey, ModelRegistry
+
+
+def test_registry_loads_once_and_respects_budget():
+    loads = []
+    registry = ModelRegistry(max_bytes=1, idle_timeout=60.0)
+    registry.register_loader("fake", lambda key: loads.append(key.name) or object())
+
+    first = ModelKey("fake", "a")
+    second = ModelKey("fake", "b")
+    with registry.acquire(first) as model_a:
+        assert registry.get(first) is model_a
+        # "a" is in use, so loading "b" over budget evicts "b" instead
+        registry.get(second)
+        assert [entry["name"] for entry in registry.stats()] == ["a"]
+    assert registry.stats() == []
+    assert loads == ["a", "b"]
+
+
+def test_registry_unloads_idle_models():
+    registry = ModelRegistry(max_bytes=10**12, idle_timeout=60.0)
+    registry.register_loader("fake", lambda key: object())
+    key = ModelKey("fake", "a")
+    model = registry.get(key)
+    assert registry.get(key) is model
+    assert registry.evict_idle() == []
+    assert registry.evict_idle(now=float("inf")) == [key]
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+from api import routes_packs
+
+
+class _FakeStore:
+    running = {}
+    overlaps = []
+    lock = threading.Lock()
+
+    def __init__(self, pack_name: str) -> None:
+        self.pack_name = pack_name
+
+    @classmethod
+    def from_pack(cls, pack_name: str) -> "_FakeStore":
+        return cls(pack_name)
+
+    def build(self) -> int:
+        with self.lock:
+            if self.running.get(self.pack_name):
+                self.overlaps.append(self.pack_name)
+            self.running[self.pack_name] = True
+        time.sleep(0.05)
+        with self.lock:
+            self.running[self.pack_name] = False
+        return 1
+
+
+def test_index_pack_runs_one_build_per_pack_at_a_time(monkeypatch):
+    monkeypatch.setattr(routes_packs, "VectorStore", _FakeStore)
+    monkeypatch.setattr(routes_packs, "_build_locks", {})
+
+    async def main():
+        await asyncio.gather(
+            routes_packs.index_pack({"pack_name": "a"}),
+            routes_packs.index_pack({"pack_name": "a"}),
+            routes_packs.index_pack({"pack_name": "b"}),
+        )
+
+    asyncio.run(main())
+    # Los dos builds de "a" van uno tras otro
+    assert _FakeStore.overlaps == []
+    assert _FakeStore.running == {"a": False, "b": False}
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from core.models import Segment
+from pipeline.partial import PartialTranscript
+
+
+def test_partial_transcript_reads_only_new_complete_lines(tmp_path: Path):
+    partial = PartialTranscript(tmp_path / "partial.jsonl")
+    partial.reset()
+    assert partial.read() == ([], 0)
+
+    partial.append(Segment(start=5.0, end=6.0, speaker="", text="segundo"))
+    partial.append(Segment(start=0.0, end=1.0, speaker="", text="primero"))
+    segments, cursor = partial.read()
+    assert [segment.text for segment in segments] == ["segundo", "primero"]
+
+    # A line still being written is left for the next read
+    with partial.path.open("ab") as handle:
+        handle.write(b'{"start": 7.0, "end"')
+    assert partial.read(cursor) == ([], cursor)
+    with partial.path.open("ab") as handle:
+        handle.write(b': 8.0, "speaker": "", "text": "tercero"}\n')
+    segments, next_cursor = partial.read(cursor)
+    assert [segment.text for segment in segments] == ["tercero"]
+    assert next_cursor == partial.path.stat().st_size
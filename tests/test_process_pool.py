@@ -0,0 +1,53 @@
+import os
+import signal
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.settings import SETTINGS
+from pipeline.process_pool import PipelineProcessPool, WorkerCrashed
+
+PARAMS = {"language": "es", "num_speakers": None, "pack_name": None, "verify": False}
+
+
+@pytest.fixture
+def pool(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    monkeypatch.setattr(SETTINGS, "stage_cache_enabled", False)
+    pool = PipelineProcessPool(size=1, max_jobs=2)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def test_failed_jobs_keep_the_worker_until_it_is_recycled(pool, tmp_path: Path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"not a video")
+    events = []
+    first = pool.pids()
+
+    with pytest.raises(RuntimeError):
+        pool.run("job", {"video_path": str(video), **PARAMS}, events.append)
+    # El fallo ocurre en el worker: el pool sigue con el mismo proceso
+    assert pool.pids() == first
+
+    with pytest.raises(RuntimeError):
+        pool.run("job", {"video_path": str(video), **PARAMS}, events.append)
+
+    assert events[0]["stage"] == "extract"
+    # max_jobs=2: tras el segundo job el worker se sustituye por uno nuevo
+    assert pool.pids() != first and len(pool.pids()) == 1
+
+
+def test_dead_workers_are_replaced(pool, tmp_path: Path):
+    pid = pool.pids()[0]
+    os.kill(pid, signal.SIGKILL)
+    threading.Event().wait(0.5)
+
+    assert pool.check(timeout=5.0) == 1
+    assert pool.pids() != [pid]
+
+    with pytest.raises(RuntimeError) as error:
+        pool.run("job", {"video_path": str(tmp_path / "missing.mp4"), **PARAMS}, lambda event: None)
+    assert not isinstance(error.value, WorkerCrashed)
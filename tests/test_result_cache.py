@@ -0,0 +1,76 @@
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes_jobs import router
+from core.models import JobMetadata, JobResult, Segment, Transcript
+from core.settings import SETTINGS
+from pipeline.edit_log import EditLog
+from pipeline.job_manager import JOB_MANAGER, JobStatus
+from pipeline.result_cache import ResultCache
+from pipeline.steps.edits import EditedTranscript
+
+
+def _write_result(path: Path) -> None:
+    result = JobResult(
+        metadata=JobMetadata(job_id="job", video_path="video.mp4", language="es", num_speakers=None),
+        transcript=Transcript(
+            segments=[
+                Segment(start=0.0, end=1.0, speaker="SPEAKER_00", text="hola"),
+                Segment(start=1.0, end=2.0, speaker="SPEAKER_01", text="adiós"),
+            ]
+        ),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(result.model_dump_json())
+
+
+def test_edited_results_are_memoized_until_the_edits_change(tmp_path: Path, monkeypatch):
+    result_path = tmp_path / "result.json"
+    _write_result(result_path)
+    edits = EditLog(tmp_path / "edits.jsonl")
+    edits.append([{"action": "rename", "old": "SPEAKER_00", "new": "Ana"}])
+    applied = []
+    original = EditedTranscript._apply
+    monkeypatch.setattr(EditedTranscript, "_apply", lambda self, edit: applied.append(edit) or original(self, edit))
+    cache = ResultCache(max_entries=8)
+    loads = []
+    monkeypatch.setattr(cache, "_load", lambda path: loads.append(path) or ResultCache._load(path))
+
+    first = cache.get("job", result_path, edits)
+    assert cache.get("job", result_path, edits) is first
+    assert first.result.transcript.segments[0].speaker == "Ana"
+
+    edits.append([{"action": "assign", "start": 1.0, "end": 2.0, "speaker": "Ana"}])
+    second = cache.get("job", result_path, edits)
+    assert second.etag != first.etag
+    assert [segment.speaker for segment in second.result.transcript.segments] == ["Ana", "Ana"]
+    # El resultado anterior no cambia y solo se aplicó la edición nueva
+    assert first.result.transcript.segments[1].speaker == "SPEAKER_01"
+    assert len(applied) == 2
+    # result.json se parsea una vez para todas las versiones del log
+    assert cache.get("job", result_path).result.transcript.segments[0].speaker == "SPEAKER_00"
+    assert len(loads) == 1 and len(cache) == 3
+
+
+def test_result_endpoint_answers_304_for_a_matching_etag(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "data_dir", tmp_path)
+    result_path = tmp_path / "jobs" / "job" / "result.json"
+    _write_result(result_path)
+    status = JobStatus(job_id="job", status="completed", result_path=result_path)
+    monkeypatch.setitem(JOB_MANAGER._jobs, "job", status)
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    response = client.get("/api/jobs/job/result")
+    assert response.status_code == 200
+    assert response.json()["transcript"]["segments"][1]["text"] == "adiós"
+    etag = response.headers["etag"]
+
+    assert client.get("/api/jobs/job/result", headers={"If-None-Match": etag}).status_code == 304
+    client.post("/api/jobs/job/edits", json={"edits": [{"action": "rename", "old": "SPEAKER_01", "new": "Ana"}]})
+    edited = client.get("/api/jobs/job/result", headers={"If-None-Match": etag})
+    assert edited.status_code == 200 and edited.headers["etag"] != etag
+    assert edited.json()["transcript"]["segments"][1]["speaker"] == "Ana"
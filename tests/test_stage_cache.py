@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+
+from pipeline.stage_cache import StageCache
+
+
+def test_stage_cache_roundtrip_and_purge(tmp_path: Path):
+    cache = StageCache(max_bytes=10**9, root=tmp_path / "cache")
+    key = StageCache.key("asr", "abc", language="es", model="small")
+    assert key != StageCache.key("asr", "abc", language="en", model="small")
+    assert cache.get_json("asr", key) is None
+
+    cache.put_json("asr", key, [{"start": 0.0, "end": 1.0}], input_hash="abc")
+    assert cache.get_json("asr", key) == [{"start": 0.0, "end": 1.0}]
+
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF" * 100)
+    cache.put_file("extract", "k1", audio)
+    target = tmp_path / "job" / "audio.wav"
+    assert cache.get_file("extract", "k1", "audio.wav", target)
+    assert target.read_bytes() == audio.read_bytes()
+
+    assert {entry["stage"] for entry in cache.entries()} == {"asr", "extract"}
+    assert cache.purge(stage="asr") == 1
+    assert cache.get_json("asr", key) is None
+
+
+def test_stage_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = StageCache(max_bytes=10**9, root=tmp_path / "cache")
+    cache.put_json("asr", "old", "x" * 1000)
+    cache.put_json("asr", "new", "y" * 1000)
+    os.utime(tmp_path / "cache" / "asr" / "old" / "meta.json", (0, 0))
+    assert cache.evict(max_bytes=1500) == 1
+    assert [entry["key"] for entry in cache.entries()] == ["new"]
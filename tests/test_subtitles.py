@@ -0,0 +1,24 @@
+import random
+
+from utils.subtitles import format_cue_times, format_timestamp, format_timestamps
+from utils.time import seconds_to_timestamp, seconds_to_vtt
+
+
+def test_timestamps_use_whole_milliseconds():
+    # 1.001 * 1000 = 1000.9999…: truncar daba ",000"
+    assert seconds_to_timestamp(1.001) == "00:00:01,001"
+    assert seconds_to_vtt(3723.4567) == "01:02:03.457"
+    assert seconds_to_timestamp(59.9996) == "00:01:00,000"
+    assert seconds_to_timestamp(-0.2) == "00:00:00,000"
+    assert seconds_to_timestamp(100 * 3600 + 1.5) == "100:00:01,500"
+
+
+def test_bulk_formatting_matches_the_scalar_formatter():
+    rng = random.Random(3)
+    values = [rng.uniform(-1, 120 * 3600) for _ in range(2000)] + [0.0, 1.001, 0.0005, 0.0015, 359999.9995]
+    assert format_timestamps(values, ".") == [format_timestamp(value, ".") for value in values]
+    starts, ends = values[:-1], values[1:]
+    assert format_cue_times(starts, ends) == [
+        f"{format_timestamp(start)} --> {format_timestamp(end)}" for start, end in zip(starts, ends)
+    ]
+    assert format_timestamps([]) == []
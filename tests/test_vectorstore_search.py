@@ -0,0 +1,112 @@
+import json
+import random
+from pathlib import Path
+
+from indexing import packfile
+from indexing.packfile import PackIndex, PackIndexWriter, write_pack_index
+from indexing.sparse_index import SparseIndex
+from indexing.vectorstore import VectorStore, _cosine_similarity
+
+
+def _brute_force(vectors, query_vector, k):
+    scored = [(key, _cosine_similarity(query_vector, vector)) for key, vector in vectors.items()]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [(key, score) for key, score in scored[:k] if score > 0]
+
+
+def _random_vectors(rng):
+    vocabulary = [f"t{i}" for i in range(40)] + ["año", "niño"]
+    vectors = {}
+    for chunk in range(300):
+        terms = rng.sample(vocabulary, rng.randint(0, 8))
+        vectors[f"pack-{chunk}"] = {term: rng.randint(1, 3) for term in terms}
+    # Duplicated chunks force score ties, which must keep insertion order
+    vectors["pack-dup"] = dict(vectors["pack-1"])
+    return vocabulary, vectors
+
+
+def test_sparse_index_matches_brute_force_cosine():
+    rng = random.Random(7)
+    vocabulary, vectors = _random_vectors(rng)
+    index = SparseIndex.from_vectors(vectors)
+
+    for _ in range(50):
+        query = {term: rng.randint(1, 2) for term in rng.sample(vocabulary, rng.randint(1, 5))}
+        assert index.search(query, 5) == _brute_force(vectors, query, 5)
+    assert index.search({"unknown": 1}, 5) == []
+
+
+def test_binary_pack_index_matches_brute_force_cosine(tmp_path: Path, monkeypatch):
+    rng = random.Random(11)
+    vocabulary, vectors = _random_vectors(rng)
+    write_pack_index(tmp_path / "pack_index.bin", list(vectors), list(vectors.values()))
+    index = PackIndex(tmp_path / "pack_index.bin")
+
+    assert index.keys() == list(vectors)
+    assert index.vector(3) == vectors["pack-3"]
+    for _ in range(50):
+        query = {term: rng.randint(1, 2) for term in rng.sample(vocabulary, rng.randint(1, 5))}
+        assert index.search(query, 5) == _brute_force(vectors, query, 5)
+    assert index.search({"unknown": 1}, 5) == []
+
+    queries = [
+        {term: rng.randint(1, 2) for term in rng.sample(vocabulary, rng.randint(1, 5))}
+        for _ in range(40)
+    ] + [{}, {"unknown": 1}]
+    expected = [_brute_force(vectors, query, 5) for query in queries]
+    assert index.search_many(queries, 5) == expected
+    assert index.search_many(queries, 5, batch_size=8) == expected
+    # Con un búfer en el que no cabe ni una fila, cada consulta pasa por search
+    monkeypatch.setattr(packfile, "SCORE_BUFFER_BYTES", 8 * len(vectors) - 1)
+    assert index.search_many(queries, 5) == expected
+    index.close()
+
+
+def test_pack_writer_gives_the_same_file_with_small_sort_budgets(tmp_path: Path):
+    rng = random.Random(5)
+    vocabulary, vectors = _random_vectors(rng)
+    paths = []
+    for name, options in (("whole", {}), ("blocks", {"block_rows": 7, "sort_entries": 40})):
+        writer = PackIndexWriter(tmp_path / f"{name}.bin", buffer_rows=16, **options)
+        for key, vector in vectors.items():
+            writer.add(key, vector)
+        writer.close()
+        paths.append(tmp_path / f"{name}.bin")
+    # Filas por bloques de 7 chunks y postings en pasadas de 40 entradas: mismo fichero
+    assert paths[0].read_bytes() == paths[1].read_bytes()
+    index = PackIndex(paths[1])
+    assert [index.vector(chunk) for chunk in range(len(index))] == list(vectors.values())
+    index.close()
+
+
+def test_search_many_matches_per_query_search_on_stopwords(tmp_path: Path):
+    rng = random.Random(3)
+    stopwords = "de la que el en y a los se del las un por con no una su para es al".split()
+    vocabulary = [f"w{i}" for i in range(500)]
+    writer = PackIndexWriter(tmp_path / "pack_index.bin")
+    for chunk in range(500):
+        vector = {term: rng.randint(1, 4) for term in rng.sample(stopwords, 12)}
+        vector.update({term: rng.randint(1, 3) for term in rng.sample(vocabulary, 20)})
+        writer.add(f"pack-{chunk}", vector)
+    writer.close()
+    index = PackIndex(tmp_path / "pack_index.bin")
+    # Cada consulta arrastra las listas de postings de varias stopwords: casi todos los chunks por término
+    queries = [
+        {**{term: 1 for term in rng.sample(stopwords, 4)}, **{term: 1 for term in rng.sample(vocabulary, 3)}}
+        for _ in range(128)
+    ]
+    assert index.search_many(queries, 5) == [index.search(query, 5) for query in queries]
+    index.close()
+
+
+def test_legacy_json_vectors_are_migrated(tmp_path: Path):
+    db_path = tmp_path / "pack.json"
+    db_path.write_text(json.dumps({"pack-1": {"title": "a", "source": "a.txt", "excerpt": "hola"}}))
+    legacy = tmp_path / "pack_vectors.json"
+    legacy.write_text(json.dumps({"pack-1": {"hola": 2}}))
+
+    store = VectorStore("pack", db_path, tmp_path / "pack_index.bin")
+    store._load()
+    assert not legacy.exists()
+    assert [match["title"] for match in store.search("hola")] == ["a"]
+    store.close()